@@ -1,35 +1,39 @@
 # services/employee_service.py
 
 from connection import get_db_connection
-from employee import Employee
+from employee import Employee, EmployeeTable
+from query_cache import invalidate
+import changefeed
+from batch import DEFAULT_CHUNK_SIZE, execute_batch, execute_keyed_batch, summarize
 from mysql.connector import Error
 class EmployeeService:
+    SELECT_ALL_SQL = "SELECT EmployeeID, Name, DateOfBirth, DepartmentID FROM Employees"
+    INSERT_SQL = "INSERT INTO Employees (Name, DateOfBirth, DepartmentID) VALUES (%s, %s, %s)"
+    UPDATE_SQL = "UPDATE Employees SET Name=%s, DateOfBirth=%s, DepartmentID=%s WHERE EmployeeID=%s"
+    DELETE_SQL = "DELETE FROM Employees WHERE EmployeeID = %s"
+
+    @staticmethod
+    def _data(employee):
+        """Column values of an Employee for its change events."""
+        return {"Name": employee.name, "DateOfBirth": employee.date_of_birth,
+                "DepartmentID": employee.department_id}
+
     def get_all_employees(self):
         """
         [R]ead: Retrieves all employees from the database.
+        Returns an EmployeeTable (columnar); rows read like Employee objects.
         """
-        conn = get_db_connection()
-        employees = []
+        conn = get_db_connection(read_only=True)
+        employees = EmployeeTable()
         if conn is None:
             return employees
 
-        query = """
-        SELECT EmployeeID, Name, DateOfBirth, DepartmentID 
-        FROM Employees
-        """
+        query = self.SELECT_ALL_SQL
         cursor = conn.cursor()
         
         try:
             cursor.execute(query)
-            results = cursor.fetchall()
-            for row in results:
-                # Convert data from tuple to Employee object
-                employees.append(Employee(
-                    employee_id=row[0], 
-                    name=row[1], 
-                    date_of_birth=row[2], 
-                    department_id=row[3]
-                ))
+            employees.extend_from_cursor(cursor)
         except Error as e:
             print(f"Error fetching employees: {e}")
         finally:
@@ -47,16 +51,17 @@ class EmployeeService:
             return False
 
         # Use parameterized query to prevent SQL Injection
-        query = """
-        INSERT INTO Employees (Name, DateOfBirth, DepartmentID) 
-        VALUES (%s, %s, %s)
-        """
+        query = self.INSERT_SQL
         values = (employee_data.name, employee_data.date_of_birth, employee_data.department_id)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = changefeed.record(conn, changefeed.EmployeeCreated(
+                {"EmployeeID": cursor.lastrowid}, self._data(employee_data)))
             conn.commit()
+            invalidate("Employees")
+            changefeed.publish(events)
             print(f"✅ Employee {employee_data.name} created successfully.")
             return True
         except Error as e:
@@ -80,16 +85,18 @@ class EmployeeService:
         if conn is None:
             return False
 
-        query = """
-        UPDATE Employees SET Name=%s, DateOfBirth=%s, DepartmentID=%s 
-        WHERE EmployeeID=%s
-        """
+        query = self.UPDATE_SQL
         values = (new_data.name, new_data.date_of_birth, new_data.department_id, employee_id)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.EmployeeUpdated({"EmployeeID": employee_id}, self._data(new_data)))
             conn.commit()
+            invalidate("Employees")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -107,12 +114,17 @@ class EmployeeService:
         if conn is None:
             return False
         
-        query = "DELETE FROM Employees WHERE EmployeeID = %s"
-        cursor = conn.cursor()
+        query = self.DELETE_SQL
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, (employee_id,))
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.EmployeeDeleted({"EmployeeID": employee_id}))
             conn.commit()
+            invalidate("Employees")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -122,6 +134,56 @@ class EmployeeService:
             cursor.close()
             conn.close()
 
+    # -------------------------------------------------------------
+    # Bulk operations (one transaction, chunked)
+    # -------------------------------------------------------------
+
+    @staticmethod
+    def _describe_error(e, employee_data):
+        if e.errno == 1062:
+            return f"Error 1062: Employee {employee_data.employee_id} already exists."
+        if e.errno == 1452:
+            return f"Error 1452: DepartmentID {employee_data.department_id} does not exist."
+        return str(e)
+
+    def create_many(self, employees, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [C]reate (bulk): Inserts an iterable of Employee objects in chunks of
+        multi-row INSERTs inside one transaction.
+        Returns one BatchResult per employee (ok / error message).
+        """
+        query = self.INSERT_SQL
+        results = execute_batch(
+            query, employees,
+            lambda emp: (emp.name, emp.date_of_birth, emp.department_id),
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda emp: changefeed.EmployeeCreated(data=self._data(emp)),   # ids not known per row
+        )
+        return summarize(results, "employees created")
+
+    def update_many(self, employees, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [U]pdate (bulk): Updates an iterable of Employee objects (matched on employee_id)
+        inside one transaction. Rows with no matching EmployeeID are reported as failed.
+        """
+        results = execute_keyed_batch(
+            "Employees", employees, lambda emp: {"EmployeeID": emp.employee_id}, self._data,
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda emp: changefeed.EmployeeUpdated({"EmployeeID": emp.employee_id}, self._data(emp)),
+        )
+        return summarize(results, "employees updated")
+
+    def delete_many(self, employee_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [D]elete (bulk): Deletes an iterable of EmployeeIDs inside one transaction.
+        """
+        results = execute_keyed_batch(
+            "Employees", employee_ids, lambda emp_id: {"EmployeeID": emp_id},
+            chunk_size=chunk_size,
+            events=lambda emp_id: changefeed.EmployeeDeleted({"EmployeeID": emp_id}),
+        )
+        return summarize(results, "employees deleted")
+
 
 # =================================================================
 # Example usage (Uncomment to test)
@@ -0,0 +1,481 @@
+# analytics.py
+#
+# Columnar snapshot engine for the Queries page.
+#
+# The four tables are exported (one sequential streamed read each, all in
+# one read-only transaction on the primary, so they agree with each other and
+# include the latest writes) into a snapshot: Parquet files under
+# SNAPSHOT_DIR/<database> when pyarrow is installed, in memory otherwise.
+# The analysis queries - INNER / LEFT / multi-table joins
+# and above-global-average - then run in-process on the snapshot with pandas'
+# vectorized hash joins and group-bys, so flipping through the Queries page
+# never puts join load on the primary.
+#
+# Row-level change events from the change feed (changefeed.py) are applied
+# to the snapshot as they are committed - a patched copy replaces it, with
+# FK cascades emulated - so ordinary edits never trigger a re-export.
+#
+# A snapshot is refreshed in the background when it is older than max_age,
+# or when a write it could not apply (raw SQL, bulk loads) has bumped the
+# query cache version of one of its tables (no more often than every
+# min_interval seconds). Until the new snapshot is ready the previous one
+# keeps answering.
+
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+import changefeed
+import connection
+from exporter import write_chunks
+from query_cache import get_cache
+
+SNAPSHOT_DIR = os.path.join(tempfile.gettempdir(), "employee_manager_snapshots")
+EXPORT_CHUNK_SIZE = 5000      # rows per fetchmany() while exporting
+SNAPSHOT_MAX_AGE = 900.0      # seconds before a snapshot is refreshed regardless of writes
+MIN_REFRESH_INTERVAL = 30.0   # seconds between write-triggered refreshes
+KEEP_SNAPSHOTS = 2            # snapshot directories kept on disk
+
+# table -> (columns, primary key order)
+TABLES = {
+    "Departments": (["DepartmentID", "DepartmentName"], "DepartmentID"),
+    "Employees": (["EmployeeID", "Name", "DateOfBirth", "DepartmentID"], "EmployeeID"),
+    "Projects": (["ProjectID", "ProjectName", "ManagerEmployeeID"], "ProjectID"),
+    "Assignments": (["EmployeeID", "ProjectID", "Role", "Salary"], "EmployeeID, ProjectID"),
+}
+
+
+def parquet_available():
+    try:
+        import pyarrow.parquet  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def snapshot_dir(server=None):
+    """
+    Snapshot directory of `server` (default: the primary backend), or None
+    when it has no lasting identity (an in-memory database).
+    """
+    database_id = getattr(server or connection.backend, "database_id", None)
+    return os.path.join(SNAPSHOT_DIR, database_id) if database_id else None
+
+
+def _read_table(cursor, sql, chunk_size=EXPORT_CHUNK_SIZE):
+    """Chunks of one table's rows as DataFrames, read on an unbuffered cursor."""
+    cursor.execute(sql)
+    columns = list(cursor.column_names)
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def export_tables(directory=None):
+    """
+    Stream every table out of the database. With a `directory` (and pyarrow)
+    each table is written to <directory>/<table>.parquet and read back
+    column-wise; otherwise the chunks are concatenated in memory.
+
+    All tables are read on one primary connection inside one read-only
+    transaction: a write committed during the export can not leave e.g.
+    Assignments of an employee missing from Employees, and a replica can not
+    serve rows older than the query cache versions read before the export.
+    """
+    conn = connection.get_db_connection()
+    if conn is None:
+        raise ConnectionError("Cannot connect to MySQL")
+
+    frames = {}
+    try:
+        conn.start_transaction(consistent_snapshot=True, readonly=True)
+        for table, (columns, order) in TABLES.items():
+            sql = f"SELECT {', '.join(columns)} FROM employee_manager_db.{table} ORDER BY {order}"
+            cursor = conn.cursor(buffered=False)
+            try:
+                chunks = _read_table(cursor, sql)
+                if directory is not None:
+                    path = os.path.join(directory, f"{table}.parquet")
+                    write_chunks(chunks, path, "parquet")
+                    frames[table] = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(columns=columns)
+                else:
+                    parts = list(chunks)
+                    frames[table] = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=columns)
+            finally:
+                cursor.close()
+        conn.commit()
+    except Exception:
+        # a result may still be on the wire: discard the connection instead of draining it
+        conn.invalidate()
+        raise
+    finally:
+        conn.close()
+    return frames
+
+
+# Deleting a parent row: (child table, column) rows removed / set to NULL (schema (1).sql)
+CASCADE_DELETE = {"Employees": [("Assignments", "EmployeeID")], "Projects": [("Assignments", "ProjectID")]}
+SET_NULL = {"Employees": [("Projects", "ManagerEmployeeID")]}
+
+
+def _value(column, value):
+    # Outbox payloads are JSON: numbers may arrive as strings (DECIMAL)
+    if value is None:
+        return pd.NA if column.endswith("ID") else None
+    if column.endswith("ID"):
+        return int(value)
+    if column == "Salary":
+        return float(value)
+    return value
+
+
+def _matches(df, key_cols, keys):
+    """Boolean mask of the rows of `df` whose key_cols values are one of `keys` (tuples)."""
+    if len(key_cols) == 1:
+        mask = df[key_cols[0]].isin([key[0] for key in keys])
+    else:
+        mask = pd.Series(pd.MultiIndex.from_frame(df[list(key_cols)]).isin(keys), index=df.index)
+    return mask.fillna(False).astype(bool)
+
+
+def _typed(frames):
+    """Numeric key / salary columns, so joins and aggregates stay vectorized."""
+    frames = {table: df.copy() for table, df in frames.items()}
+    for table, df in frames.items():
+        for column in df.columns:
+            if column.endswith("ID"):
+                df[column] = pd.to_numeric(df[column]).astype("Int64")
+        if "Salary" in df.columns:
+            df["Salary"] = pd.to_numeric(df["Salary"]).astype("float64")
+    return frames
+
+
+class Snapshot:
+    """Immutable copy of the four tables plus the analysis queries over it."""
+
+    def __init__(self, frames, versions, created=None, path=None):
+        frames = _typed(frames)
+        self.departments = frames["Departments"]
+        self.employees = frames["Employees"]
+        self.projects = frames["Projects"]
+        self.assignments = frames["Assignments"]
+        self.versions = versions
+        self.created = created if created is not None else time.time()
+        self.path = path
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def age(self):
+        return time.time() - self.created
+
+    def rows(self):
+        return {"Departments": len(self.departments), "Employees": len(self.employees),
+                "Projects": len(self.projects), "Assignments": len(self.assignments)}
+
+    def apply(self, events):
+        """
+        A new Snapshot with change events applied, or None if one of them
+        can not be applied row by row (no key, or a new row without all its
+        columns). The new snapshot keeps this one's creation time.
+
+        Consecutive events of one table, action (write / delete) and key
+        columns are applied together: one vectorized match and at most one
+        copy of the frame, so a bulk write of N rows costs about one event.
+        """
+        frames = {"Departments": self.departments, "Employees": self.employees,
+                  "Projects": self.projects, "Assignments": self.assignments}
+        runs = itertools.groupby(events, key=lambda e: (e.table, e.action == "deleted", tuple(e.key)))
+        for (table, deleted, key_cols), run in runs:
+            columns = TABLES[table][0]
+            if not key_cols or not set(key_cols) <= set(columns):
+                return None
+            changes = {}   # key values -> new column values (later events win)
+            for event in run:
+                key = tuple(_value(c, event.key[c]) for c in key_cols)
+                changes.setdefault(key, {}).update(
+                    (c, _value(c, v)) for c, v in event.data.items() if c in columns)
+            df = frames[table]
+            mask = _matches(df, key_cols, list(changes))
+
+            if deleted:
+                removed = df.loc[mask, columns[0]] if table in CASCADE_DELETE or table in SET_NULL else None
+                frames[table] = df[~mask]
+                for child, column in CASCADE_DELETE.get(table, ()):
+                    frames[child] = frames[child][~frames[child][column].isin(removed)]
+                for child, column in SET_NULL.get(table, ()):
+                    child_df = frames[child].copy()
+                    child_df.loc[child_df[column].isin(removed), column] = pd.NA
+                    frames[child] = child_df
+                continue
+
+            present = set(df.loc[mask, list(key_cols)].itertuples(index=False, name=None))
+            if present:
+                df = df.copy()
+                for column in dict.fromkeys(c for values in changes.values() for c in values):
+                    updates = {key: values[column] for key, values in changes.items()
+                               if key in present and column in values}
+                    if not updates:
+                        continue
+                    rows = _matches(df, key_cols, list(updates))
+                    df.loc[rows, column] = [updates[key] for key in
+                                            df.loc[rows, list(key_cols)].itertuples(index=False, name=None)]
+            new_rows = []
+            for key, values in changes.items():
+                if key in present:
+                    continue
+                row = {**dict(zip(key_cols, key)), **values}
+                if set(row) != set(columns):
+                    return None
+                new_rows.append(row)
+            if new_rows:
+                df = pd.concat([df, pd.DataFrame(new_rows, columns=columns)], ignore_index=True)
+            frames[table] = df
+        return Snapshot(frames, self.versions, created=self.created, path=self.path)
+
+    def _memo(self, name, compute):
+        # The snapshot never changes, so each result is computed once
+        with self._lock:
+            if name not in self._results:
+                self._results[name] = compute()
+            return self._results[name].copy()
+
+    def _names(self, id_col="EmployeeID", name_col="EmployeeName"):
+        return self.employees[["EmployeeID", "Name"]].rename(columns={"EmployeeID": id_col, "Name": name_col})
+
+    def _assignments_with_names(self):
+        return (self.assignments
+                .merge(self._names(), on="EmployeeID")
+                .merge(self.projects, on="ProjectID")
+                .sort_values(["ProjectID", "EmployeeID"], kind="stable"))
+
+    def inner_join_per_project(self):
+        def compute():
+            df = self._assignments_with_names()
+            return df[["EmployeeName", "ProjectName", "Role", "Salary"]].reset_index(drop=True)
+        return self._memo("inner_join_per_project", compute)
+
+    def left_join_all_employees(self):
+        def compute():
+            df = (self.employees
+                  .merge(self.departments, on="DepartmentID", how="left")
+                  .merge(self.assignments, on="EmployeeID", how="left")
+                  .merge(self.projects[["ProjectID", "ProjectName"]], on="ProjectID", how="left")
+                  .sort_values(["EmployeeID", "ProjectID"], kind="stable"))
+            return df[["EmployeeID", "Name", "DepartmentName", "Role", "Salary", "ProjectName"]].reset_index(drop=True)
+        return self._memo("left_join_all_employees", compute)
+
+    def multi_table_join_with_manager(self):
+        def compute():
+            managers = self._names("ManagerEmployeeID", "ManagerName")
+            df = self._assignments_with_names().merge(managers, on="ManagerEmployeeID", how="left")
+            return df[["EmployeeName", "ProjectName", "Role", "Salary", "ManagerName"]].reset_index(drop=True)
+        return self._memo("multi_table_join_with_manager", compute)
+
+    def above_global_average(self):
+        def compute():
+            columns = ["EmployeeID", "EmployeeName", "EmpAverage"]
+            if self.assignments.empty:
+                return pd.DataFrame(columns=columns)
+            global_avg = self.assignments["Salary"].mean()
+            named = self.assignments.merge(self._names(), on="EmployeeID")
+            df = (named.groupby(["EmployeeID", "EmployeeName"], as_index=False, sort=False)["Salary"].mean()
+                  .rename(columns={"Salary": "EmpAverage"}))
+            df = df[df["EmpAverage"] > global_avg].sort_values("EmpAverage", ascending=False, kind="stable")
+            return df[columns].reset_index(drop=True)
+        return self._memo("above_global_average", compute)
+
+
+class AnalyticsEngine:
+    """
+    Holds the current Snapshot and refreshes it when stale.
+
+    `loader(directory)` returns {table: DataFrame}; directory is None when the
+    snapshot is kept in memory only.
+    """
+
+    def __init__(self, directory=None, max_age=SNAPSHOT_MAX_AGE,
+                 min_interval=MIN_REFRESH_INTERVAL, loader=export_tables, persist=None):
+        self._directory = directory   # None: snapshot_dir() of the current backend
+        self.max_age = max_age
+        self.min_interval = min_interval
+        self._loader = loader
+        self.persist = parquet_available() if persist is None else persist
+        self._snapshot = None
+        self._refreshing = None   # background Thread
+        self._dirty = False       # a change event could not be applied
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    # ---- state ----
+    @property
+    def directory(self):
+        """Where snapshots of this database are kept, or None to keep them in memory."""
+        if not self.persist:
+            return None
+        return self._directory if self._directory is not None else snapshot_dir()
+
+    def _versions(self):
+        return get_cache().versions(list(TABLES))
+
+    def is_stale(self, snapshot=None):
+        snapshot = snapshot or self._snapshot
+        if snapshot is None:
+            return True
+        age = snapshot.age()
+        if age >= self.max_age:
+            return True
+        return (self._dirty or snapshot.versions != self._versions()) and age >= self.min_interval
+
+    def status(self):
+        snapshot = self._snapshot
+        return {
+            "age_s": snapshot.age() if snapshot else None,
+            "rows": snapshot.rows() if snapshot else {},
+            "stale": self.is_stale(snapshot),
+            "refreshing": self._refreshing is not None,
+            "path": snapshot.path if snapshot else None,
+            "last_error": self.last_error,
+        }
+
+    # ---- building ----
+    def refresh(self):
+        """Build a new snapshot now (blocking) and make it current."""
+        self._dirty = False
+        versions = self._versions()   # read first: a write during the export leaves the snapshot stale
+        directory = None
+        if self.directory is not None:
+            directory = os.path.join(self.directory, f"snapshot-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+            os.makedirs(directory, exist_ok=True)
+        try:
+            snapshot = Snapshot(self._loader(directory), versions, path=directory)
+        except Exception as e:
+            self.last_error = str(e)
+            if directory is not None:
+                shutil.rmtree(directory, ignore_errors=True)
+            raise
+        if directory is not None:
+            with open(os.path.join(directory, "manifest.json"), "w") as f:
+                json.dump({"created": snapshot.created, "rows": snapshot.rows()}, f)
+        self.last_error = None
+        with self._lock:
+            self._snapshot = snapshot
+        self._cleanup()
+        return snapshot
+
+    def apply_changes(self, events):
+        """
+        Change feed subscriber: patch the current snapshot. It is then as
+        current as the query cache versions (the writer invalidated before
+        publishing); if an event can not be applied it is marked for refresh.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            return
+        try:
+            patched = snapshot.apply(events)
+        except (KeyError, ValueError, TypeError) as e:
+            print("❌ Cannot apply changes to the analytics snapshot:", e)
+            patched = None
+        with self._lock:
+            if self._snapshot is not snapshot:
+                return   # replaced by a refresh meanwhile
+            if patched is None:
+                self._dirty = True
+                return
+            if not self._dirty:
+                patched.versions = self._versions()
+            self._snapshot = patched
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print("❌ Analytics snapshot refresh failed:", e)
+        finally:
+            with self._lock:
+                self._refreshing = None
+
+    def _load_latest(self):
+        """Most recent snapshot of this database on disk younger than max_age (e.g. after a restart)."""
+        root = self.directory
+        if root is None or not os.path.isdir(root):
+            return None
+        for name in sorted((n for n in os.listdir(root) if n.startswith("snapshot-")), reverse=True):
+            path = os.path.join(root, name)
+            try:
+                with open(os.path.join(path, "manifest.json")) as f:
+                    created = json.load(f)["created"]
+                if time.time() - created >= self.max_age:
+                    return None
+                frames = {t: pd.read_parquet(os.path.join(path, f"{t}.parquet"))
+                          if os.path.exists(os.path.join(path, f"{t}.parquet")) else pd.DataFrame(columns=cols)
+                          for t, (cols, _) in TABLES.items()}
+                # Versions do not survive a restart: trust the files until max_age
+                return Snapshot(frames, self._versions(), created=created, path=path)
+            except (OSError, ValueError, KeyError):
+                continue
+        return None
+
+    def _cleanup(self):
+        root = self.directory
+        if root is None or not os.path.isdir(root):
+            return
+        names = sorted(n for n in os.listdir(root) if n.startswith("snapshot-"))
+        for name in names[:-KEEP_SNAPSHOTS]:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    # ---- access ----
+    def snapshot(self, wait=False):
+        """
+        The current snapshot. The first call builds one (or loads a recent one
+        from disk); later calls return immediately and, when the snapshot is
+        stale, start a background refresh (wait=True blocks for it instead).
+        """
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load_latest()
+                snapshot = self._snapshot
+            if snapshot is None:
+                return self.refresh()
+
+        if self.is_stale(snapshot):
+            if wait:
+                return self.refresh()
+            with self._lock:
+                if self._refreshing is None:
+                    self._refreshing = threading.Thread(
+                        target=self._refresh_in_background, name="analytics-refresh", daemon=True)
+                    self._refreshing.start()
+        return snapshot
+
+
+engine = AnalyticsEngine()
+changefeed.subscribe(engine.apply_changes)
+
+
+def inner_join_per_project():
+    return engine.snapshot().inner_join_per_project()
+
+
+def left_join_all_employees():
+    return engine.snapshot().left_join_all_employees()
+
+
+def multi_table_join_with_manager():
+    return engine.snapshot().multi_table_join_with_manager()
+
+
+def above_global_average():
+    return engine.snapshot().above_global_average()
@@ -1,7 +1,23 @@
 # Assignment.py
+
+from columnar import ColumnarTable, DecimalColumn, IntColumn, StrColumn
+
 class Assignment:
+    __slots__ = ("employee_id", "project_id", "role", "salary")
+
     def __init__(self, employee_id, project_id, role, salary):
         self.employee_id = employee_id
         self.project_id = project_id
         self.role = role
-        self.salary = salary
\ No newline at end of file
+        self.salary = salary
+
+
+class AssignmentTable(ColumnarTable):
+    """Columnar list of assignments returned by AssignmentService.get_all_assignments()."""
+    row_type = Assignment
+    schema = (
+        ("employee_id", IntColumn),
+        ("project_id", IntColumn),
+        ("role", StrColumn),
+        ("salary", DecimalColumn),
+    )
\ No newline at end of file
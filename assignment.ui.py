@@ -3,66 +3,61 @@
 elif page == "Assignments":
     st.header("Assignments")
 
-    # Load data safely
-    employees = qsvc.get_employees()
-    projects = qsvc.get_projects()
-
-    if employees.empty or projects.empty:
+    # Load data safely (both at once). Employees are not listed here: the
+    # employee picker searches the name index as the user types.
+    data = fetch_parallel({"projects": qsvc.get_projects, "counts": qsvc.count_all_tables})
+    projects, counts = data["projects"], data["counts"]
+    if data.errors:
+        st.error("Could not load: " + ", ".join(f"{k} ({v})" for k, v in data.errors.items()))
+
+    if projects.empty or counts.empty or int(counts["Employees"].iloc[0]) == 0:
         st.warning("Employees or Projects table is empty. Please add data first.")
         st.stop()
 
-    emp_idcol = safe_id_col(employees)
     proj_idcol = safe_id_col(projects)
-
-    emp_map = get_fk_map(employees, "Name", emp_idcol)
-    proj_map = get_fk_map(projects, "ProjectName", proj_idcol)
+    proj_map = fk_map(projects, "ProjectName", proj_idcol)
 
     # ----------------------- CREATE ASSIGNMENT -----------------------
+    st.subheader("Create assignment")
+    empid = employee_picker("Employee", key="create_assign_emp")
+    projid = project_picker("Project", key="create_assign_proj")
     with st.form("create_assign"):
-        st.subheader("Create assignment")
-
-        emp_choice = st.selectbox("Employee", [""] + list(emp_map.keys()))
-        proj_choice = st.selectbox("Project", [""] + list(proj_map.keys()))
         role = st.text_input("Role")
         salary = st.number_input("Salary", min_value=0.0)
 
         submit_create = st.form_submit_button("Create Assignment")
 
         if submit_create:
-            if not emp_choice or not proj_choice or not role:
+            if empid is None or projid is None or not role:
                 st.error("Employee, Project and Role are required")
             else:
-                empid = emp_map[emp_choice]
-                projid = proj_map[proj_choice]
-
-                try:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-
-                    sql = """
-                        INSERT INTO employee_manager_db.Assignments 
-                        (EmployeeID, ProjectID, Role, Salary)
-                        VALUES (%s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                            Role = VALUES(Role),
-                            Salary = VALUES(Salary);
-                    """
-                    cursor.execute(sql, (empid, projid, role, float(salary)))
-                    conn.commit()
-
+                sql = """
+                    INSERT INTO employee_manager_db.Assignments 
+                    (EmployeeID, ProjectID, Role, Salary)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        Role = VALUES(Role),
+                        Salary = VALUES(Salary);
+                """
+                ok, err = db_execute(sql, (empid, projid, role, float(salary)), events=lambda cursor: [
+                    changefeed.AssignmentUpdated({"EmployeeID": empid, "ProjectID": projid},
+                                                 {"Role": role, "Salary": float(salary)})])
+                if ok:
                     st.success("Assignment created or updated successfully!")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                else:
+                    st.error(f"❌ {err}")
 
     # ----------------------- VIEW ASSIGNMENTS -----------------------
-    df = qsvc.get_assignments()
+    fcols = st.columns(2)
+    proj_filter = fcols[0].selectbox("Filter by project", [""] + list(proj_map.keys()), key="assign_proj_filter")
+    role_filter = fcols[1].text_input("Filter by role", key="assign_role_filter")
+    df = paged_view(
+        "assignments_page", qsvc.get_assignments_page, ["EmployeeID", "ProjectID"],
+        project_id=int(proj_map[proj_filter]) if proj_filter else None,
+        role=role_filter or None,
+    )
     st.dataframe(df)
-    export_df_csv(df, "assignments.csv")
+    export_on_demand(qsvc.get_assignments, "assignments.csv", key="assignments_export")
 
     st.subheader("Edit or Delete Assignment")
 
@@ -77,14 +72,11 @@ elif page == "Assignments":
         st.stop()
 
     # ----------------------- EDIT + DELETE UI -----------------------
-    df["pair"] = df.apply(
-        lambda r: f"{r['EmployeeID']} — {r['EmployeeName']} — Project {r['ProjectID']} — {r['ProjectName']}",
-        axis=1
-    )
+    df["pair"] = label_column(df, "{EmployeeID} — {EmployeeName} — Project {ProjectID} — {ProjectName}")
 
     sel = st.selectbox("Select Assignment", df["pair"].tolist())
 
-    row = df[df["pair"] == sel].iloc[0]
+    row = row_index(df, "pair").row(sel)
     empid = int(row["EmployeeID"])
     projid = int(row["ProjectID"])
 
@@ -96,45 +88,54 @@ elif page == "Assignments":
         submit_edit = st.form_submit_button("Save")
 
         if submit_edit:
-            try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-
-                sql = """
-                    UPDATE employee_manager_db.Assignments
-                    SET Role=%s, Salary=%s
-                    WHERE EmployeeID=%s AND ProjectID=%s
-                """
-                cursor.execute(sql, (new_role, new_salary, empid, projid))
-                conn.commit()
-
-                st.success("Assignment updated successfully!")
-
-            except Exception as e:
-                st.error(f"❌ {e}")
-
-            finally:
-                cursor.close()
-                conn.close()
-
-    # --------- DELETE ---------
-    if st.button("Delete Assignment"):
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
             sql = """
-                DELETE FROM employee_manager_db.Assignments
+                UPDATE employee_manager_db.Assignments
+                SET Role=%s, Salary=%s
                 WHERE EmployeeID=%s AND ProjectID=%s
             """
-            cursor.execute(sql, (empid, projid))
-            conn.commit()
+            ok, err = db_execute(sql, (new_role, new_salary, empid, projid), events=lambda cursor: [
+                changefeed.AssignmentUpdated({"EmployeeID": empid, "ProjectID": projid},
+                                             {"Role": new_role, "Salary": new_salary})])
+            if ok:
+                st.success("Assignment updated successfully!")
+            else:
+                st.error(f"❌ {err}")
 
+    # --------- DELETE ---------
+    if st.button("Delete Assignment"):
+        sql = """
+            DELETE FROM employee_manager_db.Assignments
+            WHERE EmployeeID=%s AND ProjectID=%s
+        """
+        ok, err = db_execute(sql, (empid, projid), events=lambda cursor: [
+            changefeed.AssignmentDeleted({"EmployeeID": empid, "ProjectID": projid})])
+        if ok:
             st.success("Assignment deleted!")
-
-        except Exception as e:
-            st.error(f"❌ {e}")
-
-        finally:
-            cursor.close()
-            conn.close()
+        else:
+            st.error(f"❌ {err}")
+
+    # --------- BULK EDIT (one transaction) ---------
+    st.subheader("Bulk edit this page")
+    st.caption("Change roles and salaries or tick Delete, then save everything in one transaction.")
+    keys = ["EmployeeID", "ProjectID"]
+    grid = df[keys + ["Role", "Salary"]].reset_index(drop=True).assign(Delete=False)
+    edited = st.data_editor(grid, disabled=keys, hide_index=True, key="assign_bulk_editor")
+
+    if st.button("Save all changes"):
+        removed = edited[edited["Delete"]]
+        changed = edited[~edited["Delete"] & ((edited["Role"] != grid["Role"]) | (edited["Salary"] != grid["Salary"]))]
+        uow = UnitOfWork()
+        for r in changed.itertuples(index=False):
+            uow.update("Assignments", {"Role": r.Role, "Salary": float(r.Salary)},
+                       {"EmployeeID": int(r.EmployeeID), "ProjectID": int(r.ProjectID)})
+        for r in removed.itertuples(index=False):
+            uow.delete("Assignments", {"EmployeeID": int(r.EmployeeID), "ProjectID": int(r.ProjectID)})
+        if not len(uow):
+            st.info("Nothing changed")
+        else:
+            changes = len(uow)
+            ok, err = uow.flush()
+            if ok:
+                st.success(f"Saved {changes} changes in one transaction ({uow.statements} statements)")
+            else:
+                st.error(f"❌ {err}")
@@ -1,24 +1,42 @@
 # assignment_service.py
 
 from connection import get_db_connection
-from assignment import Assignment
+from assignment import Assignment, AssignmentTable
+from query_cache import invalidate
+import changefeed
+from batch import DEFAULT_CHUNK_SIZE, execute_batch, execute_keyed_batch, summarize
 from mysql.connector import Error
 
 class AssignmentService:
+    SELECT_ALL_SQL = "SELECT EmployeeID, ProjectID, Role, Salary FROM Assignments"
+    INSERT_SQL = "INSERT INTO Assignments (EmployeeID, ProjectID, Role, Salary) VALUES (%s, %s, %s, %s)"
+    UPDATE_SQL = "UPDATE Assignments SET Role=%s, Salary=%s WHERE EmployeeID=%s AND ProjectID=%s"
+    DELETE_SQL = "DELETE FROM Assignments WHERE EmployeeID = %s AND ProjectID = %s"
+
+    @staticmethod
+    def _key(emp_id, proj_id):
+        return {"EmployeeID": emp_id, "ProjectID": proj_id}
+
+    @staticmethod
+    def _describe_error(e, assignment_data):
+        if e.errno == 1062:
+            return "Error 1062: This assignment (EmployeeID, ProjectID) already exists. (PK violation)"
+        if e.errno == 1452:
+            return "Error 1452: EmployeeID or ProjectID does not exist."
+        return f"Error creating assignment: {e}"
 
     def get_all_assignments(self):
         """ [R]ead: Retrieves all assignments. """
-        conn = get_db_connection()
-        assignments = []
+        conn = get_db_connection(read_only=True)
+        assignments = AssignmentTable()
         if conn is None: return assignments
 
-        query = "SELECT EmployeeID, ProjectID, Role, Salary FROM Assignments"
+        query = self.SELECT_ALL_SQL
         cursor = conn.cursor()
         
         try:
             cursor.execute(query)
-            for row in cursor.fetchall():
-                assignments.append(Assignment(row[0], row[1], row[2], row[3]))
+            assignments.extend_from_cursor(cursor)
         except Error as e:
             print(f"Error fetching assignments: {e}")
         finally:
@@ -31,23 +49,23 @@ class AssignmentService:
         conn = get_db_connection()
         if conn is None: return False
 
-        query = "INSERT INTO Assignments (EmployeeID, ProjectID, Role, Salary) VALUES (%s, %s, %s, %s)"
+        query = self.INSERT_SQL
         values = (assignment_data.employee_id, assignment_data.project_id, assignment_data.role, assignment_data.salary)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = changefeed.record(conn, changefeed.AssignmentCreated(
+                self._key(assignment_data.employee_id, assignment_data.project_id),
+                {"Role": assignment_data.role, "Salary": assignment_data.salary}))
             conn.commit()
+            invalidate("Assignments")
+            changefeed.publish(events)
             print(f"✅ Assignment created for Emp {assignment_data.employee_id} on Proj {assignment_data.project_id}.")
             return True
         except Error as e:
             conn.rollback()
-            if e.errno == 1062:
-                print("❌ Error 1062: This assignment (EmployeeID, ProjectID) already exists. (PK violation)")
-            elif e.errno == 1452:
-                print("❌ Error 1452: EmployeeID or ProjectID does not exist.")
-            else:
-                print(f"❌ Error creating assignment: {e}")
+            print(f"❌ {self._describe_error(e, assignment_data)}")
             return False
         finally:
             cursor.close()
@@ -58,13 +76,19 @@ class AssignmentService:
         conn = get_db_connection()
         if conn is None: return False
 
-        query = "UPDATE Assignments SET Role=%s, Salary=%s WHERE EmployeeID=%s AND ProjectID=%s"
+        query = self.UPDATE_SQL
         values = (new_data.role, new_data.salary, emp_id, proj_id)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.AssignmentUpdated(
+                    self._key(emp_id, proj_id), {"Role": new_data.role, "Salary": new_data.salary}))
             conn.commit()
+            invalidate("Assignments")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -79,12 +103,17 @@ class AssignmentService:
         conn = get_db_connection()
         if conn is None: return False
         
-        query = "DELETE FROM Assignments WHERE EmployeeID = %s AND ProjectID = %s"
-        cursor = conn.cursor()
+        query = self.DELETE_SQL
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, (emp_id, proj_id))
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.AssignmentDeleted(self._key(emp_id, proj_id)))
             conn.commit()
+            invalidate("Assignments")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -92,4 +121,40 @@ class AssignmentService:
             return False
         finally:
             cursor.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Bulk operations (one transaction, chunked)
+    # -------------------------------------------------------------
+
+    def create_many(self, assignments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): Inserts Assignment objects with multi-row INSERTs in one transaction. """
+        query = self.INSERT_SQL
+        results = execute_batch(
+            query, assignments,
+            lambda a: (a.employee_id, a.project_id, a.role, a.salary),
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda a: changefeed.AssignmentCreated(
+                self._key(a.employee_id, a.project_id), {"Role": a.role, "Salary": a.salary}),
+        )
+        return summarize(results, "assignments created")
+
+    def update_many(self, assignments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): Updates Role/Salary of Assignment objects matched on (employee_id, project_id). """
+        results = execute_keyed_batch(
+            "Assignments", assignments,
+            lambda a: self._key(a.employee_id, a.project_id), lambda a: {"Role": a.role, "Salary": a.salary},
+            chunk_size=chunk_size,
+            events=lambda a: changefeed.AssignmentUpdated(
+                self._key(a.employee_id, a.project_id), {"Role": a.role, "Salary": a.salary}),
+        )
+        return summarize(results, "assignments updated")
+
+    def delete_many(self, keys, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): Deletes assignments given an iterable of (emp_id, proj_id) pairs. """
+        results = execute_keyed_batch(
+            "Assignments", keys, lambda key: self._key(key[0], key[1]),
+            chunk_size=chunk_size,
+            events=lambda key: changefeed.AssignmentDeleted(self._key(key[0], key[1])),
+        )
+        return summarize(results, "assignments deleted")
@@ -0,0 +1,223 @@
+# async_db.py
+#
+# asyncio counterpart of connection.py / queries.run_query, built on aiomysql.
+#
+# Streamlit reruns the script in a fresh thread each time, so all async work
+# runs on one long-lived background event loop (see run_sync / gather_pages);
+# the aiomysql pool lives on that loop and survives between reruns.
+
+import asyncio
+import threading
+import weakref
+
+import pandas as pd
+from mysql.connector import Error
+
+import changefeed
+from connection import backend, config, pool_config
+from profiling import QueryTimer, data_helper
+
+_pools = weakref.WeakKeyDictionary()   # event loop -> Task creating its pool
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _driver():
+    try:
+        import aiomysql
+    except ImportError as e:
+        raise ImportError("The async layer needs aiomysql: pip install aiomysql") from e
+    return aiomysql
+
+
+def async_available():
+    """True when aiomysql is installed and the configured backend is MySQL."""
+    if backend.name != "mysql":
+        return False
+    try:
+        _driver()
+        return True
+    except ImportError:
+        return False
+
+
+async def get_async_pool():
+    """Return the aiomysql pool of the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    task = _pools.get(loop)
+    if task is None:
+        aiomysql = _driver()
+        task = loop.create_task(aiomysql.create_pool(
+            host=config["host"],
+            port=config.get("port", 3306),
+            user=config["user"],
+            password=config["password"],
+            db=config["database"],
+            minsize=0,
+            maxsize=pool_config["pool_size"] + pool_config["max_overflow"],
+            pool_recycle=pool_config["max_lifetime"],
+            autocommit=False,
+        ))
+        _pools[loop] = task
+    try:
+        return await task
+    except Exception:
+        _pools.pop(loop, None)   # let the next call retry
+        raise
+
+
+def _as_mysql_error(e):
+    # aiomysql raises PyMySQL errors with (errno, message) args; the services
+    # inspect e.errno on mysql.connector errors, so translate them.
+    errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+    msg = e.args[1] if len(e.args) > 1 else str(e)
+    return Error(msg=msg, errno=errno)
+
+
+async def run_query_async(sql, params=None, caller=None):
+    """
+    Async version of queries.run_query: returns a DataFrame (empty on error).
+    `caller` names the query function in the profiling stats.
+    """
+    aiomysql = _driver()
+    timer = QueryTimer(sql, caller)
+    try:
+        pool = await get_async_pool()
+        async with pool.acquire() as conn:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+            # end the implicit read transaction so the next query sees fresh data
+            await conn.rollback()
+        timer.add_rows(rows)
+        return pd.DataFrame(list(rows))
+    except Exception as e:
+        timer.fail(e)
+        print("❌ Query error:", e)
+        return pd.DataFrame()
+    finally:
+        timer.finish()
+
+
+@data_helper
+async def fetch_rows_async(sql, params=None):
+    """Return all rows as tuples. Raises mysql.connector.Error on failure."""
+    timer = QueryTimer(sql)
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rows = await cursor.fetchall()
+            await conn.rollback()
+            timer.add_rows(rows)
+            return list(rows)
+        except Exception as e:
+            timer.fail(e)
+            raise _as_mysql_error(e) from e
+        finally:
+            timer.finish()
+
+
+@data_helper
+async def execute_async(sql, params=None, events=None):
+    """
+    Run one write statement in its own transaction and commit it.
+    Returns the affected row count. Raises mysql.connector.Error on failure
+    (after rolling back), so callers can reuse the sync services' errno checks.
+
+    events(rowcount, lastrowid) -> [ChangeEvent] are written to the change
+    outbox (changefeed.py) in the same transaction.
+    """
+    if events is not None and changefeed.relay.last_id is None:
+        # as changefeed.record(): the relay must start before this process's first event
+        await asyncio.to_thread(changefeed.relay.mark_start)
+    timer = QueryTimer(sql)
+    pool = await get_async_pool()
+    async with pool.acquire() as conn:
+        try:
+            async with conn.cursor() as cursor:
+                await cursor.execute(sql, params)
+                rowcount = cursor.rowcount
+                if events is not None:
+                    rows = [event.outbox_row() for event in events(rowcount, cursor.lastrowid)]
+                    if rows:
+                        await cursor.executemany(changefeed.INSERT_SQL, rows)
+            await conn.commit()
+            timer.event.rows = rowcount
+            return rowcount
+        except Exception as e:
+            timer.fail(e)
+            await conn.rollback()
+            raise _as_mysql_error(e) from e
+        finally:
+            timer.finish()
+
+
+async def close_async_pool():
+    """Close the pool of the running event loop."""
+    task = _pools.pop(asyncio.get_running_loop(), None)
+    if task is not None:
+        pool = await task
+        pool.close()
+        await pool.wait_closed()
+
+
+# ------------------------------------------
+# Background loop (sync callers, e.g. main.py)
+# ------------------------------------------
+def _background_loop():
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="async-db", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def run_sync(coro, timeout=None):
+    """
+    Run a coroutine on the background loop and wait for its result.
+    On timeout the coroutine is cancelled and TimeoutError is raised.
+
+    The coroutine runs in a copy of the caller's context (the loop schedules
+    it with call_soon_threadsafe, which copies it), so it sees the caller's
+    replicas.py session: a write it makes pins the caller's reads.
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _background_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
+
+
+async def gather(**coros):
+    """
+    Await independent coroutines concurrently: total time is the slowest one,
+    not the sum. Returns {name: result}; a coroutine that raised is reported
+    and its result replaced by an empty DataFrame.
+    """
+    names = list(coros)
+    results = await asyncio.gather(*coros.values(), return_exceptions=True)
+    out = {}
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            print(f"❌ {name} failed: {result}")
+            result = pd.DataFrame()
+        out[name] = result
+    return out
+
+
+def gather_pages(timeout=None, **coros):
+    """
+    Sync entry point for page code:
+
+        data = gather_pages(
+            employees=aq.get_employees(),
+            projects=aq.get_projects(),
+        )
+    """
+    return run_sync(gather(**coros), timeout)
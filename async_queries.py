@@ -0,0 +1,71 @@
+# async_queries.py
+#
+# async versions of the read functions in queries.py. Each variant runs the
+# exact SQL of its sync counterpart (via queries.capture_sql) on the aiomysql
+# pool and shares the same query cache entries.
+#
+#   from async_db import gather_pages
+#   import async_queries as aq
+#   data = gather_pages(emps=aq.get_employees(), depts=aq.get_departments())
+
+import functools
+
+import queries
+from async_db import run_query_async
+from query_cache import _copy, cache_key, fresh_read_required, get_cache
+
+
+def _async_variant(fn):
+    tables = getattr(fn, "tables", None)   # set by @cached
+
+    @functools.wraps(fn)
+    async def variant(*args, **kwargs):
+        sql, params = queries.capture_sql(fn, *args, **kwargs)
+        caller = f"{fn.__module__}.{fn.__name__}"
+        if tables is None:
+            return await run_query_async(sql, params, caller)
+
+        cache = get_cache()
+        key = cache_key(fn, args, kwargs)
+        versions = cache.versions(tables)
+        # (reads here always go to the primary, so the result may be cached)
+        hit, value = (False, None) if fresh_read_required() else cache.lookup(key, tables)
+        if not hit:
+            value = await run_query_async(sql, params, caller)
+            cache.store(key, tables, value, versions)
+        return _copy(value)
+    return variant
+
+
+# CRUD lists
+get_employees = _async_variant(queries.get_employees)
+get_departments = _async_variant(queries.get_departments)
+get_projects = _async_variant(queries.get_projects)
+get_assignments = _async_variant(queries.get_assignments)
+
+# Keyset pages
+get_employees_page = _async_variant(queries.get_employees_page)
+get_projects_page = _async_variant(queries.get_projects_page)
+get_assignments_page = _async_variant(queries.get_assignments_page)
+
+# Global Search
+search_employees = _async_variant(queries.search_employees)
+
+# Dashboard (materialized aggregates)
+get_salary_totals = _async_variant(queries.get_salary_totals)
+get_salary_histogram = _async_variant(queries.get_salary_histogram)
+get_role_counts = _async_variant(queries.get_role_counts)
+get_top_employees_by_avg_salary = _async_variant(queries.get_top_employees_by_avg_salary)
+
+# Dashboard (live aggregates)
+count_all_tables = _async_variant(queries.count_all_tables)
+salary_summary = _async_variant(queries.salary_summary)
+salary_histogram = _async_variant(queries.salary_histogram)
+role_distribution = _async_variant(queries.role_distribution)
+top_employees_by_avg_salary = _async_variant(queries.top_employees_by_avg_salary)
+
+# Reports (use queries.py with stream=True for exports)
+inner_join_per_project = _async_variant(queries.inner_join_per_project)
+left_join_all_employees = _async_variant(queries.left_join_all_employees)
+multi_table_join_with_manager = _async_variant(queries.multi_table_join_with_manager)
+above_global_average = _async_variant(queries.above_global_average)
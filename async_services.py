@@ -0,0 +1,267 @@
+# async_services.py
+#
+# async versions of the *Service classes. Same SQL, return values and error
+# messages as the sync services; statements run on the aiomysql pool from
+# async_db, so independent calls can be awaited together:
+#
+#   employees, projects = await asyncio.gather(
+#       AsyncEmployeeService().get_all_employees(),
+#       AsyncProjectService().get_all_projects(),
+#   )
+#
+# Writes pin the reads of the current replicas.py session to the primary,
+# like the sync services: a coroutine runs in the context of the task that
+# awaits it, and async_db.run_sync runs it in a copy of the caller's context
+# (test_async_db checks this). The bulk methods run the sync batch (batch.py)
+# on a worker thread, which also keeps the caller's context.
+
+import asyncio
+
+from mysql.connector import Error
+
+import changefeed
+from async_db import execute_async, fetch_rows_async
+from query_cache import invalidate
+from batch import DEFAULT_CHUNK_SIZE
+from profiling import data_helper
+from employee import EmployeeTable
+from department import DepartmentTable
+from project import ProjectTable
+from assignment import AssignmentTable
+from Employee_service import EmployeeService
+from department_service import DepartmentService
+from project_service import ProjectService
+from assignment_service import AssignmentService
+
+
+@data_helper
+async def _fetch_all(sql, table_type, label):
+    try:
+        return table_type.from_rows(await fetch_rows_async(sql))
+    except Error as e:
+        print(f"Error fetching {label}: {e}")
+        return table_type()
+
+
+@data_helper
+async def _write(sql, params, table, events=None):
+    """
+    Run a write (plus its change events, same transaction), invalidate
+    `table` and publish the events. Returns the row count; raises Error.
+    """
+    recorded = []
+
+    def record(rowcount, new_id):
+        recorded.extend(events(rowcount, new_id))
+        return recorded
+
+    rowcount = await execute_async(sql, params, record if events is not None else None)
+    invalidate(table)
+    await asyncio.to_thread(changefeed.publish, recorded)
+    return rowcount
+
+
+def _created(event_cls, id_col, data):
+    """events() for an INSERT: the new AUTO_INCREMENT id is the row key."""
+    return lambda rowcount, new_id: [event_cls({id_col: new_id}, data)]
+
+
+def _changed(event):
+    """events() for an UPDATE / DELETE: only if a row matched."""
+    return lambda rowcount, _: [event] if rowcount > 0 else []
+
+
+class AsyncEmployeeService:
+
+    async def get_all_employees(self):
+        """ [R]ead: Retrieves all employees. """
+        return await _fetch_all(EmployeeService.SELECT_ALL_SQL, EmployeeTable, "employees")
+
+    async def create_employee(self, employee_data):
+        """ [C]reate: Inserts a new employee (an Employee object). """
+        values = (employee_data.name, employee_data.date_of_birth, employee_data.department_id)
+        try:
+            await _write(EmployeeService.INSERT_SQL, values, "Employees", _created(
+                changefeed.EmployeeCreated, "EmployeeID", EmployeeService._data(employee_data)))
+            print(f"✅ Employee {employee_data.name} created successfully.")
+            return True
+        except Error as e:
+            print(f"❌ Error creating employee: {e}")
+            return False
+
+    async def update_employee(self, employee_id, new_data):
+        """ [U]pdate: Updates existing employee information. """
+        values = (new_data.name, new_data.date_of_birth, new_data.department_id, employee_id)
+        try:
+            event = changefeed.EmployeeUpdated({"EmployeeID": employee_id}, EmployeeService._data(new_data))
+            return await _write(EmployeeService.UPDATE_SQL, values, "Employees", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error updating employee {employee_id}: {e}")
+            return False
+
+    async def delete_employee(self, employee_id):
+        """ [D]elete: Deletes an employee by EmployeeID. """
+        try:
+            event = changefeed.EmployeeDeleted({"EmployeeID": employee_id})
+            return await _write(EmployeeService.DELETE_SQL, (employee_id,), "Employees", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error deleting employee {employee_id}: {e}")
+            return False
+
+    async def create_many(self, employees, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): see EmployeeService.create_many. """
+        return await asyncio.to_thread(EmployeeService().create_many, employees, chunk_size)
+
+    async def update_many(self, employees, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): see EmployeeService.update_many. """
+        return await asyncio.to_thread(EmployeeService().update_many, employees, chunk_size)
+
+    async def delete_many(self, employee_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): see EmployeeService.delete_many. """
+        return await asyncio.to_thread(EmployeeService().delete_many, employee_ids, chunk_size)
+
+
+class AsyncDepartmentService:
+
+    async def get_all_departments(self):
+        """ [R]ead: Retrieves all departments. """
+        return await _fetch_all(DepartmentService.SELECT_ALL_SQL, DepartmentTable, "departments")
+
+    async def create_department(self, dept_name):
+        """ [C]reate: Inserts a new department. """
+        try:
+            await _write(DepartmentService.INSERT_SQL, (dept_name,), "Departments", _created(
+                changefeed.DepartmentCreated, "DepartmentID", {"DepartmentName": dept_name}))
+            print(f"✅ Department '{dept_name}' created.")
+            return True
+        except Error as e:
+            print(f"❌ {DepartmentService._describe_error(e, dept_name)}")
+            return False
+
+    async def delete_department(self, dept_id):
+        """ [D]elete: Deletes a department by ID (fails with 1451 while it has employees). """
+        try:
+            event = changefeed.DepartmentDeleted({"DepartmentID": dept_id})
+            deleted = await _write(DepartmentService.DELETE_SQL, (dept_id,), "Departments", _changed(event)) > 0
+            if deleted:
+                print(f"✅ Department ID {dept_id} deleted.")
+            return deleted
+        except Error as e:
+            print(f"❌ {DepartmentService._describe_error(e, dept_id)}")
+            return False
+
+    async def create_many(self, dept_names, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): see DepartmentService.create_many. """
+        return await asyncio.to_thread(DepartmentService().create_many, dept_names, chunk_size)
+
+    async def update_many(self, departments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): see DepartmentService.update_many. """
+        return await asyncio.to_thread(DepartmentService().update_many, departments, chunk_size)
+
+    async def delete_many(self, dept_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): see DepartmentService.delete_many. """
+        return await asyncio.to_thread(DepartmentService().delete_many, dept_ids, chunk_size)
+
+
+class AsyncProjectService:
+
+    async def get_all_projects(self):
+        """ [R]ead: Retrieves all projects. """
+        return await _fetch_all(ProjectService.SELECT_ALL_SQL, ProjectTable, "projects")
+
+    async def create_project(self, project_data):
+        """ [C]reate: Inserts a new project. """
+        values = (project_data.project_name, project_data.manager_employee_id)
+        try:
+            await _write(ProjectService.INSERT_SQL, values, "Projects", _created(
+                changefeed.ProjectCreated, "ProjectID", ProjectService._data(project_data)))
+            print(f"✅ Project '{project_data.project_name}' created.")
+            return True
+        except Error as e:
+            print(f"❌ {ProjectService._describe_error(e, project_data)}")
+            return False
+
+    async def update_project(self, project_id, new_data):
+        """ [U]pdate: Updates existing project information. """
+        values = (new_data.project_name, new_data.manager_employee_id, project_id)
+        try:
+            event = changefeed.ProjectUpdated({"ProjectID": project_id}, ProjectService._data(new_data))
+            return await _write(ProjectService.UPDATE_SQL, values, "Projects", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error updating project {project_id}: {e}")
+            return False
+
+    async def delete_project(self, project_id):
+        """ [D]elete: Deletes a project by ID. """
+        try:
+            event = changefeed.ProjectDeleted({"ProjectID": project_id})
+            return await _write(ProjectService.DELETE_SQL, (project_id,), "Projects", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error deleting project {project_id}: {e}")
+            return False
+
+    async def create_many(self, projects, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): see ProjectService.create_many. """
+        return await asyncio.to_thread(ProjectService().create_many, projects, chunk_size)
+
+    async def update_many(self, projects, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): see ProjectService.update_many. """
+        return await asyncio.to_thread(ProjectService().update_many, projects, chunk_size)
+
+    async def delete_many(self, project_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): see ProjectService.delete_many. """
+        return await asyncio.to_thread(ProjectService().delete_many, project_ids, chunk_size)
+
+
+class AsyncAssignmentService:
+
+    async def get_all_assignments(self):
+        """ [R]ead: Retrieves all assignments. """
+        return await _fetch_all(AssignmentService.SELECT_ALL_SQL, AssignmentTable, "assignments")
+
+    async def create_assignment(self, assignment_data):
+        """ [C]reate: Inserts a new assignment (Employee-Project link). """
+        values = (assignment_data.employee_id, assignment_data.project_id,
+                  assignment_data.role, assignment_data.salary)
+        try:
+            event = changefeed.AssignmentCreated(
+                AssignmentService._key(assignment_data.employee_id, assignment_data.project_id),
+                {"Role": assignment_data.role, "Salary": assignment_data.salary})
+            await _write(AssignmentService.INSERT_SQL, values, "Assignments", _changed(event))
+            print(f"✅ Assignment created for Emp {assignment_data.employee_id} on Proj {assignment_data.project_id}.")
+            return True
+        except Error as e:
+            print(f"❌ {AssignmentService._describe_error(e, assignment_data)}")
+            return False
+
+    async def update_assignment(self, emp_id, proj_id, new_data):
+        """ [U]pdate: Updates Role and Salary for an existing assignment. """
+        values = (new_data.role, new_data.salary, emp_id, proj_id)
+        try:
+            event = changefeed.AssignmentUpdated(
+                AssignmentService._key(emp_id, proj_id), {"Role": new_data.role, "Salary": new_data.salary})
+            return await _write(AssignmentService.UPDATE_SQL, values, "Assignments", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error updating assignment: {e}")
+            return False
+
+    async def delete_assignment(self, emp_id, proj_id):
+        """ [D]elete: Deletes an assignment using the composite key. """
+        try:
+            event = changefeed.AssignmentDeleted(AssignmentService._key(emp_id, proj_id))
+            return await _write(AssignmentService.DELETE_SQL, (emp_id, proj_id), "Assignments", _changed(event)) > 0
+        except Error as e:
+            print(f"❌ Error deleting assignment: {e}")
+            return False
+
+    async def create_many(self, assignments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): see AssignmentService.create_many. """
+        return await asyncio.to_thread(AssignmentService().create_many, assignments, chunk_size)
+
+    async def update_many(self, assignments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): see AssignmentService.update_many. """
+        return await asyncio.to_thread(AssignmentService().update_many, assignments, chunk_size)
+
+    async def delete_many(self, keys, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): see AssignmentService.delete_many. """
+        return await asyncio.to_thread(AssignmentService().delete_many, keys, chunk_size)
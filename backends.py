@@ -0,0 +1,57 @@
+# backends.py
+#
+# Database backends, chosen with DB_TYPE (env.py, overridable from the
+# environment):
+#
+#   mysql  - MySQL server through mysql.connector (default)
+#   sqlite - embedded SQLite database loaded from schema (1).sql / seed (1).sql
+#            (sqlite_backend.py); DB_PATH is the file, empty for in-memory
+#
+# A backend turns its config into connections with the mysql.connector
+# interface; connection.py pools them.
+
+import mysql.connector
+
+
+class MySQLBackend:
+    name = "mysql"
+    supports_infile = True   # LOAD DATA LOCAL INFILE (bulk_loader.py)
+
+    def __init__(self, config):
+        self.config = config
+
+    @property
+    def database_id(self):
+        """Names this database in file names (e.g. analytics.py snapshot directories)."""
+        cfg = self.config
+        return f"mysql-{cfg.get('host', 'localhost')}-{cfg.get('port', 3306)}-{cfg.get('database', '')}"
+
+    def connect(self, **options):
+        """New server connection; `options` are extra mysql.connector.connect() arguments."""
+        return mysql.connector.connect(**self.config, **options)
+
+    def close(self):
+        pass
+
+
+def _sqlite_backend(config):
+    from sqlite_backend import SQLiteBackend
+    return SQLiteBackend(config)
+
+
+BACKENDS = {
+    "mysql": MySQLBackend,
+    "sqlite": _sqlite_backend,
+}
+
+
+def get_backend(db_type, **configs):
+    """
+    Backend for `db_type`, built from configs[db_type]:
+        get_backend("sqlite", mysql=config, sqlite={"path": ""})
+    """
+    db_type = (db_type or "mysql").lower()
+    factory = BACKENDS.get(db_type)
+    if factory is None:
+        raise ValueError(f"Unknown DB_TYPE {db_type!r}; expected one of {', '.join(BACKENDS)}")
+    return factory(configs.get(db_type, {}))
@@ -0,0 +1,243 @@
+# batch.py
+
+from itertools import chain, islice
+
+import changefeed
+from connection import get_db_connection
+from mysql.connector import Error
+from query_cache import invalidate_for_sql
+from profiling import data_helper
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class BatchResult:
+    """Outcome of one row of a batch write."""
+
+    def __init__(self, index, item, ok, error=None):
+        self.index = index
+        self.item = item
+        self.ok = ok
+        self.error = error
+
+    def __repr__(self):
+        status = "ok" if self.ok else f"failed: {self.error}"
+        return f"BatchResult({self.index}, {status})"
+
+
+def _chunks(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _default_error(err, item):
+    return str(err)
+
+
+# ------------------------------------------
+# Statements for many keyed rows (also used by unit_of_work.py)
+# ------------------------------------------
+def _placeholders(n):
+    return ", ".join(["%s"] * n)
+
+
+def match_keys(key_cols, keys):
+    """WHERE clause (and params) selecting the rows with any of `keys` (tuples of key_cols values)."""
+    if len(key_cols) == 1:
+        return f"{key_cols[0]} IN ({_placeholders(len(keys))})", [k[0] for k in keys]
+    one = "(" + " AND ".join(f"{col} = %s" for col in key_cols) + ")"
+    return " OR ".join([one] * len(keys)), [v for k in keys for v in k]
+
+
+def update_sql(table, columns, key_cols, rows):
+    """
+    One UPDATE for `rows` [(key values, column values)]: a plain SET when every
+    row gets the same values, otherwise SET c = CASE WHEN <key> THEN ... END.
+    """
+    where, where_params = match_keys(key_cols, [key for key, _ in rows])
+    distinct = {values for _, values in rows}
+    if len(distinct) == 1:
+        # the same new values for every row (e.g. moving employees to one department)
+        sets = ", ".join(f"{col} = %s" for col in columns)
+        return f"UPDATE {table} SET {sets} WHERE {where}", list(distinct.pop()) + where_params
+    when = " AND ".join(f"{col} = %s" for col in key_cols)
+    sets, params = [], []
+    for i, col in enumerate(columns):
+        sets.append(f"{col} = CASE" + f" WHEN {when} THEN %s" * len(rows) + f" ELSE {col} END")
+        for key, values in rows:
+            params.extend(key)
+            params.append(values[i])
+    return f"UPDATE {table} SET {', '.join(sets)} WHERE {where}", params + where_params
+
+
+def delete_sql(table, key_cols, keys):
+    where, params = match_keys(key_cols, keys)
+    return f"DELETE FROM {table} WHERE {where}", params
+
+
+# ------------------------------------------
+# Batch writes
+# ------------------------------------------
+def _run_batch(items, chunk_size, run_chunk, written_sql, events):
+    """
+    One connection, one transaction: run_chunk(cursor, chunk, offset) returns
+    the BatchResults of a chunk. Always returns one BatchResult per item.
+    """
+    results = []
+    conn = get_db_connection()
+    if conn is None:
+        return [BatchResult(i, item, False, "Cannot connect to MySQL") for i, item in enumerate(items)]
+
+    cursor = conn.cursor()
+    chunks = _chunks(items, chunk_size)
+    current = []
+    try:
+        for current in chunks:
+            results.extend(run_chunk(cursor, current, len(results)))
+            current = []
+        recorded = []
+        if events is not None:
+            recorded = changefeed.record(conn, *(events(r.item) for r in results if r.ok))
+        conn.commit()
+    except Error as e:
+        conn.rollback()
+        print(f"❌ Batch aborted, transaction rolled back: {e}")
+        for r in results:
+            if r.ok:
+                r.ok, r.error = False, f"Rolled back: {e}"
+        # the chunk that was running and the ones never read
+        for item in chain(current, chain.from_iterable(chunks)):
+            results.append(BatchResult(len(results), item, False, f"Not run: {e}"))
+        return results
+    finally:
+        cursor.close()
+        conn.close()
+
+    invalidate_for_sql(written_sql)
+    changefeed.publish(recorded)
+    return results
+
+
+@data_helper
+def execute_batch(query, items, to_params, chunk_size=DEFAULT_CHUNK_SIZE,
+                  describe_error=None, events=None):
+    """
+    Run `query` for every item inside ONE transaction, streaming `items` in chunks.
+
+    Each chunk is sent with executemany (an INSERT becomes a single multi-row
+    INSERT). If the chunk fails, it is replayed row by row behind savepoints so
+    only the offending rows are reported as failed.
+
+    events(item) -> ChangeEvent: recorded in the change outbox for every
+    successful row, in the same transaction (see changefeed.py).
+
+    Returns a list of BatchResult in input order, one per item. If the
+    transaction itself fails every row is reported as failed.
+    """
+    describe_error = describe_error or _default_error
+
+    def run_chunk(cursor, chunk, offset):
+        cursor.execute("SAVEPOINT batch_chunk")
+        try:
+            cursor.executemany(query, [to_params(item) for item in chunk])
+            cursor.execute("RELEASE SAVEPOINT batch_chunk")
+            return [BatchResult(offset + i, item, True) for i, item in enumerate(chunk)]
+        except Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+            return _run_rows(cursor, chunk, lambda item: (query, to_params(item)), describe_error, offset)
+
+    return _run_batch(items, chunk_size, run_chunk, query, events)
+
+
+@data_helper
+def execute_keyed_batch(table, items, to_key, to_values=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                        describe_error=None, events=None):
+    """
+    UPDATE (with `to_values`) or DELETE rows matched on their key, inside ONE
+    transaction. to_key(item) / to_values(item) return {column: value}, with
+    the same columns for every item.
+
+    Per chunk: one SELECT of the keys that exist, then one statement for all
+    of them (UPDATE ... SET c = CASE ... END / DELETE ... WHERE key IN (...)).
+    Items without a row are reported as "No matching row". If the statement
+    fails (e.g. a row still referenced), the chunk is replayed row by row
+    behind savepoints, as in execute_batch.
+
+    Returns a list of BatchResult in input order, one per item.
+    """
+    describe_error = describe_error or _default_error
+
+    def statement(rows, key_cols, columns):
+        if to_values is None:
+            return delete_sql(table, key_cols, [key for key, _ in rows])
+        return update_sql(table, columns, key_cols, rows)
+
+    def run_chunk(cursor, chunk, offset):
+        keys = [to_key(item) for item in chunk]
+        values = [to_values(item) for item in chunk] if to_values is not None else [{}] * len(chunk)
+        key_cols, columns = tuple(keys[0]), tuple(values[0])
+        rows = [(tuple(k[c] for c in key_cols), tuple(v[c] for c in columns)) for k, v in zip(keys, values)]
+
+        where, params = match_keys(key_cols, list(dict.fromkeys(key for key, _ in rows)))
+        cursor.execute(f"SELECT {', '.join(key_cols)} FROM {table} WHERE {where}", params)
+        existing = {tuple(row) for row in cursor.fetchall()}
+
+        out, found = [], {}
+        for i, (item, (key, new)) in enumerate(zip(chunk, rows)):
+            if key not in existing or (to_values is None and key in found):   # (a repeated delete)
+                out.append(BatchResult(offset + i, item, False, "No matching row"))
+                continue
+            found[key] = new   # the same key twice: its last values win, as row by row
+            out.append(BatchResult(offset + i, item, True))
+        if not found:
+            return out
+
+        cursor.execute("SAVEPOINT batch_chunk")
+        try:
+            cursor.execute(*statement(list(found.items()), key_cols, columns))
+            cursor.execute("RELEASE SAVEPOINT batch_chunk")
+            return out
+        except Error:
+            cursor.execute("ROLLBACK TO SAVEPOINT batch_chunk")
+
+        # find the offending rows
+        pending = [(r, row) for r, row in zip(out, rows) if r.ok]
+        replayed = _run_rows(cursor, pending, lambda entry: statement([entry[1]], key_cols, columns),
+                             lambda e, entry: describe_error(e, entry[0].item), 0)
+        for (r, _), result in zip(pending, replayed):
+            r.ok, r.error = result.ok, result.error
+        return out
+
+    verb = "DELETE FROM" if to_values is None else "UPDATE"
+    return _run_batch(items, chunk_size, run_chunk, f"{verb} {table}", events)
+
+
+@data_helper
+def _run_rows(cursor, chunk, statement, describe_error, offset):
+    """
+    Execute statement(item) -> (sql, params) for each item behind its own
+    savepoint, so one bad row does not poison the batch.
+    """
+    out = []
+    for i, item in enumerate(chunk):
+        cursor.execute("SAVEPOINT batch_row")
+        try:
+            cursor.execute(*statement(item))
+            cursor.execute("RELEASE SAVEPOINT batch_row")
+            out.append(BatchResult(offset + i, item, True))
+        except Error as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT batch_row")
+            out.append(BatchResult(offset + i, item, False, describe_error(e, item)))
+    return out
+
+
+def summarize(results, label):
+    """Print a one-line summary like the single-row methods do and return the results."""
+    ok = sum(1 for r in results if r.ok)
+    mark = "✅" if ok == len(results) else "⚠️"
+    print(f"{mark} {ok}/{len(results)} {label}.")
+    return results
@@ -0,0 +1,466 @@
+# benchmark.py
+#
+# Synthetic data generator + latency benchmark for the data layer.
+#
+#   python benchmark.py --scale 10k                      # generate, load, run all suites
+#   python benchmark.py --scale 100k --no-load --repeat 20 -o bench_100k.json
+#   python benchmark.py --compare bench_old.json bench_new.json
+#   python benchmark.py --scale 100k --no-load --suite dataframes   # no database needed
+#
+# WARNING: loading replaces ALL rows in employee_manager_db.
+
+import argparse
+import datetime
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from bisect import bisect
+from itertools import accumulate, islice
+
+import pandas as pd
+
+from bulk_loader import TABLES, BulkLoadSession
+import queries
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+LOAD_CHUNK_SIZE = 10000
+
+FIRST_NAMES = ["Anh", "Binh", "Chi", "Dung", "Giang", "Hoa", "Hung", "Khanh", "Lan", "Linh",
+               "Minh", "Nam", "Ngoc", "Phuong", "Quang", "Son", "Thao", "Trang", "Tuan", "Viet"]
+MIDDLE_NAMES = ["Van", "Thi", "Duc", "Minh", "Thu", "Hai", "Quoc", "Ngoc"]
+LAST_NAMES = ["Nguyen", "Tran", "Le", "Pham", "Hoang", "Huynh", "Phan", "Vu", "Vo", "Dang",
+              "Bui", "Do", "Ho", "Ngo", "Duong", "Ly"]
+DEPARTMENTS = ["Research & Development", "Human Resources", "Sales & Marketing", "Finance",
+               "Legal", "IT & Infrastructure", "Operations", "Customer Support"]
+ROLES = [("Developer", 0.35), ("Tester", 0.2), ("Senior Engineer", 0.2), ("Analyst", 0.1),
+         ("Designer", 0.08), ("Project Lead", 0.05), ("Architect", 0.02)]
+ROLE_BASE_SALARY = {"Developer": 45000, "Tester": 38000, "Senior Engineer": 62000, "Analyst": 50000,
+                    "Designer": 47000, "Project Lead": 75000, "Architect": 90000}
+
+
+# ------------------------------------------
+# Synthetic data
+# ------------------------------------------
+
+class Dataset:
+    """
+    Row generators for a synthetic company of `n_employees`.
+    Rows are produced lazily (deterministic for a given seed) so a 1M-employee
+    dataset never has to sit in memory.
+    """
+
+    def __init__(self, n_employees, seed=42, zipf_s=1.1, max_assignments=4):
+        self.n_employees = n_employees
+        self.n_departments = max(6, min(len(DEPARTMENTS) * 4, n_employees // 5000))
+        self.n_projects = max(10, n_employees // 100)
+        self.seed = seed
+        self.zipf_s = zipf_s
+        self.max_assignments = max_assignments
+
+    def departments(self):
+        for i in range(1, self.n_departments + 1):
+            base = DEPARTMENTS[(i - 1) % len(DEPARTMENTS)]
+            name = base if i <= len(DEPARTMENTS) else f"{base} {(i - 1) // len(DEPARTMENTS) + 1}"
+            yield (i, name)
+
+    def employees(self):
+        rng = random.Random(self.seed)
+        start = datetime.date(1960, 1, 1).toordinal()
+        for i in range(1, self.n_employees + 1):
+            name = f"{rng.choice(LAST_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(FIRST_NAMES)} {i:07d}"
+            dob = datetime.date.fromordinal(start + rng.randrange(16000)).isoformat()
+            yield (i, name, dob, rng.randrange(self.n_departments) + 1)
+
+    def projects(self):
+        rng = random.Random(self.seed + 1)
+        for i in range(1, self.n_projects + 1):
+            yield (i, f"Project {i:06d}", rng.randrange(self.n_employees) + 1)
+
+    def assignments(self):
+        """1..max_assignments projects per employee, projects drawn from a Zipf distribution."""
+        rng = random.Random(self.seed + 2)
+        cum = list(accumulate(1.0 / (rank ** self.zipf_s) for rank in range(1, self.n_projects + 1)))
+        total = cum[-1]
+        role_names = [r for r, _ in ROLES]
+        role_cum = list(accumulate(w for _, w in ROLES))
+        for emp_id in range(1, self.n_employees + 1):
+            k = rng.randint(1, self.max_assignments)
+            chosen = set()
+            while len(chosen) < min(k, self.n_projects):
+                chosen.add(bisect(cum, rng.random() * total) + 1)
+            for proj_id in sorted(chosen):
+                role = role_names[min(bisect(role_cum, rng.random() * role_cum[-1]), len(ROLES) - 1)]
+                salary = round(ROLE_BASE_SALARY[role] * rng.lognormvariate(0, 0.15), 2)
+                yield (emp_id, proj_id, role, salary)
+
+
+def load_dataset(dataset, chunk_size=LOAD_CHUNK_SIZE):
+    """Replace all table contents with `dataset` through the bulk loader. Returns row counts."""
+    generators = {
+        "Departments": dataset.departments,
+        "Employees": dataset.employees,
+        "Projects": dataset.projects,
+        "Assignments": dataset.assignments,
+    }
+    with BulkLoadSession(replace=True, chunk_size=chunk_size) as loader:
+        for table, rows in generators.items():
+            loader.load_rows(table, TABLES[table], rows())
+    return {table: stat["rows"] for table, stat in loader.stats.items()}
+
+
+# ------------------------------------------
+# Timing
+# ------------------------------------------
+
+def _rows(result):
+    if result is None or isinstance(result, bool):
+        return 0
+    try:
+        return len(result)
+    except TypeError:
+        return 0
+
+
+def measure(fn, repeat, warmup=1):
+    """Call fn() warmup + repeat times; return latency percentiles and throughput."""
+    for _ in range(warmup):
+        fn()
+    times, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+        rows = _rows(result)
+    times.sort()
+    p95_index = min(len(times) - 1, max(0, int(round(0.95 * len(times))) - 1))
+    mean = statistics.fmean(times)
+    return {
+        "runs": repeat,
+        "p50_ms": statistics.median(times) * 1000,
+        "p95_ms": times[p95_index] * 1000,
+        "mean_ms": mean * 1000,
+        "min_ms": times[0] * 1000,
+        "max_ms": times[-1] * 1000,
+        "rows": rows,
+        "rows_per_sec": rows / mean if mean and rows else 0.0,
+    }
+
+
+def _uncached(fn):
+    return getattr(fn, "__wrapped__", fn)
+
+
+# ------------------------------------------
+# Suites
+# ------------------------------------------
+
+def bench_queries(repeat, dataset):
+    """Every read function in queries.py, cache bypassed."""
+    mid = max(1, dataset.n_employees // 2)
+    cases = {
+        "get_employees": {},
+        "get_departments": {},
+        "get_projects": {},
+        "get_assignments": {},
+        "get_employees_page[first]": {},
+        "get_employees_page[middle]": {"after": (mid,)},
+        "get_employees_page[department]": {"department_id": 1},
+        "get_employees_page[name_prefix]": {"name_prefix": "Nguyen Van"},
+        "get_projects_page[first]": {},
+        "get_assignments_page[middle]": {"after": (mid, 1)},
+        "get_assignments_page[project]": {"project_id": 1},
+        "get_salary_totals": {},
+        "get_salary_histogram": {},
+        "get_role_counts": {},
+        "get_top_employees_by_avg_salary": {"limit": 20},
+        "count_all_tables": {},
+        "salary_summary": {},
+        "salary_histogram": {"bins": 10},
+        "role_distribution": {},
+        "top_employees_by_avg_salary": {"limit": 20},
+        "inner_join_per_project": {},
+        "left_join_all_employees": {},
+        "multi_table_join_with_manager": {},
+        "above_global_average": {},
+    }
+    results = {}
+    for case, kwargs in cases.items():
+        fn = _uncached(getattr(queries, case.split("[")[0]))
+        results[f"queries.{case}"] = measure(lambda: fn(**kwargs), repeat)
+    return results
+
+
+def bench_dashboard(repeat, dataset):
+    """The Dashboard page's data loads, old (client-side pandas) vs aggregated."""
+    def client_side():
+        emp = _uncached(queries.get_employees)()
+        dept = _uncached(queries.get_departments)()
+        proj = _uncached(queries.get_projects)()
+        assign = _uncached(queries.get_assignments)()
+        summary = (len(emp), len(dept), len(proj), len(assign))
+        if not assign.empty:
+            assign["Salary"] = assign["Salary"].astype(float)
+            assign["Salary"].mean()
+            assign.groupby(["EmployeeID", "EmployeeName"])["Salary"].mean().sort_values(ascending=False)
+        return summary
+
+    def materialized():
+        _uncached(queries.count_all_tables)()
+        _uncached(queries.get_salary_totals)()
+        _uncached(queries.get_salary_histogram)()
+        _uncached(queries.get_role_counts)()
+        return _uncached(queries.get_top_employees_by_avg_salary)(20)
+
+    def sql_side():
+        _uncached(queries.count_all_tables)()
+        _uncached(queries.salary_summary)()
+        _uncached(queries.salary_histogram)(10)
+        _uncached(queries.role_distribution)()
+        return _uncached(queries.top_employees_by_avg_salary)(20)
+
+    return {
+        "dashboard.client_side_pandas": measure(client_side, repeat),
+        "dashboard.materialized_aggregates": measure(materialized, repeat),
+        "dashboard.sql_aggregates": measure(sql_side, repeat),
+    }
+
+
+def bench_services(repeat, dataset):
+    """Single-row and bulk CRUD through the service classes. Leaves the data unchanged."""
+    from Employee_service import EmployeeService
+    from assignment_service import AssignmentService
+    from project_service import ProjectService
+    from employee import Employee
+    from assignment import Assignment
+    from project import Project
+
+    emp_svc, assign_svc, proj_svc = EmployeeService(), AssignmentService(), ProjectService()
+    rng = random.Random(dataset.seed + 3)
+    results = {}
+
+    results["services.get_all_employees"] = measure(emp_svc.get_all_employees, max(1, repeat // 5))
+    results["services.get_all_projects"] = measure(proj_svc.get_all_projects, repeat)
+    results["services.get_all_assignments"] = measure(assign_svc.get_all_assignments, max(1, repeat // 5))
+
+    # Employees: create -> update -> delete scratch rows
+    tag = f"bench-{int(time.time())}"
+    results["services.create_employee"] = measure(
+        lambda: emp_svc.create_employee(Employee(None, tag, "1990-01-01", 1)), repeat, warmup=0)
+    scratch = queries.run_query("SELECT EmployeeID FROM Employees WHERE Name = %s", (tag,))["EmployeeID"].tolist()
+    ids = iter(scratch)
+    results["services.update_employee"] = measure(
+        lambda: emp_svc.update_employee(int(rng.choice(scratch)), Employee(None, tag, "1991-01-01", 1)), repeat)
+    results["services.delete_employee"] = measure(lambda: emp_svc.delete_employee(int(next(ids))), repeat, warmup=0)
+
+    # Bulk variants
+    batch = [Employee(None, tag, "1990-01-01", 1) for _ in range(1000)]
+    results["services.employees.create_many[1000]"] = measure(lambda: emp_svc.create_many(batch), 1, warmup=0)
+    scratch = queries.run_query("SELECT EmployeeID FROM Employees WHERE Name = %s", (tag,))["EmployeeID"].tolist()
+    results["services.employees.delete_many[1000]"] = measure(
+        lambda: emp_svc.delete_many(int(i) for i in scratch), 1, warmup=0)
+
+    # Projects + assignments on a scratch project, for employees that exist (--no-load may reuse any data)
+    proj_svc.create_project(Project(None, tag, None))
+    proj_id = int(queries.run_query("SELECT ProjectID FROM Projects WHERE ProjectName = %s", (tag,))["ProjectID"][0])
+    assigned = [int(i) for i in queries.run_query(
+        "SELECT EmployeeID FROM Employees ORDER BY EmployeeID LIMIT %s", (repeat,))["EmployeeID"]]
+    emp_ids = iter(assigned)
+    results["services.create_assignment"] = measure(
+        lambda: assign_svc.create_assignment(Assignment(next(emp_ids), proj_id, "Tester", 40000)),
+        len(assigned), warmup=0)
+    results["services.update_assignment"] = measure(
+        lambda: assign_svc.update_assignment(rng.choice(assigned), proj_id, Assignment(None, None, "Developer", 41000)),
+        repeat)
+    del_ids = iter(assigned)
+    results["services.delete_assignment"] = measure(
+        lambda: assign_svc.delete_assignment(next(del_ids), proj_id), len(assigned), warmup=0)
+    results["services.update_project"] = measure(
+        lambda: proj_svc.update_project(proj_id, Project(proj_id, tag, None)), repeat)
+    proj_svc.delete_project(proj_id)
+    return results
+
+
+def bench_dataframes(repeat, dataset):
+    """
+    main.py's select-box helpers on synthetic frames of the dataset's size:
+    the old per-row loops against df_utils. Runs without a database.
+    """
+    from df_utils import fk_map, label_column, row_index
+
+    employees = pd.DataFrame(list(dataset.employees()),
+                             columns=["EmployeeID", "Name", "DateOfBirth", "DepartmentID"])
+    names = dict(zip(employees["EmployeeID"].tolist(), employees["Name"].tolist()))
+    assignments = pd.DataFrame(list(islice(dataset.assignments(), dataset.n_employees)),
+                               columns=["EmployeeID", "ProjectID", "Role", "Salary"])
+    assignments["EmployeeName"] = assignments["EmployeeID"].map(names)
+    assignments["ProjectName"] = "Project " + assignments["ProjectID"].astype(str)
+    template = "{EmployeeID} — {EmployeeName} — Project {ProjectID} — {ProjectName}"
+    target = int(employees["EmployeeID"].iloc[len(employees) * 3 // 4])
+    token = ("Employees", 0)
+    row_index(employees, "EmployeeID", token=token)   # as built by an earlier rerun
+
+    def iterrows_map():
+        return {row["Name"]: row["EmployeeID"] for _, row in employees.iterrows()}
+
+    def apply_labels():
+        return assignments.apply(
+            lambda r: f"{r['EmployeeID']} — {r['EmployeeName']} — Project {r['ProjectID']} — {r['ProjectName']}",
+            axis=1)
+
+    slow_repeat = max(1, repeat // 5)
+    return {
+        "dataframes.fk_map[iterrows]": measure(iterrows_map, slow_repeat),
+        "dataframes.fk_map[zip]": measure(lambda: fk_map(employees, "Name", "EmployeeID"), repeat),
+        "dataframes.labels[apply]": measure(apply_labels, slow_repeat),
+        "dataframes.labels[vectorized]": measure(lambda: label_column(assignments, template), repeat),
+        "dataframes.select_row[mask]": measure(
+            lambda: employees[employees["EmployeeID"] == target].iloc[0], repeat),
+        "dataframes.select_row[index_build]": measure(
+            lambda: row_index(employees, "EmployeeID").row(target), repeat),
+        "dataframes.select_row[index_reused]": measure(
+            lambda: row_index(employees, "EmployeeID", token=token).row(target), repeat),
+    }
+
+
+def bench_analytics(repeat, dataset):
+    """The Queries page joins: SQL on the primary vs. the in-process snapshot."""
+    import analytics
+
+    results = {"analytics.build_snapshot": measure(analytics.engine.refresh, max(1, repeat // 5))}
+    snapshot = analytics.engine.snapshot()
+    for name in ("inner_join_per_project", "left_join_all_employees",
+                 "multi_table_join_with_manager", "above_global_average"):
+        sql_fn = getattr(queries, name)
+
+        def on_snapshot(name=name):
+            snapshot._results.clear()   # measure the join, not the memoized result
+            return getattr(snapshot, name)()
+
+        results[f"analytics.{name}[sql]"] = measure(sql_fn, repeat)
+        results[f"analytics.{name}[snapshot]"] = measure(on_snapshot, repeat)
+    return results
+
+
+def bench_unit_of_work(repeat, dataset, n_rows=100):
+    """
+    Moving n_rows employees between departments: one statement + commit per
+    row (as the page buttons do) vs. one UnitOfWork flush. Leaves the data unchanged.
+    """
+    from connection import get_db_connection
+    from unit_of_work import UnitOfWork
+
+    before = queries.run_query("SELECT EmployeeID, DepartmentID FROM Employees ORDER BY EmployeeID LIMIT %s", (n_rows,))
+    ids = [int(i) for i in before["EmployeeID"]]
+    targets = iter([1, 2] * (repeat + 1))
+
+    def per_row():
+        dep = next(targets)
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        for emp_id in ids:
+            cursor.execute("UPDATE Employees SET DepartmentID=%s WHERE EmployeeID=%s", (dep, emp_id))
+            conn.commit()
+        cursor.close()
+        conn.close()
+
+    def unit_of_work():
+        dep = next(targets)
+        uow = UnitOfWork()
+        for emp_id in ids:
+            uow.update("Employees", {"DepartmentID": dep}, {"EmployeeID": emp_id})
+        uow.flush()
+
+    results = {f"uow.move_employees[{n_rows}][per_row]": measure(per_row, repeat),
+               f"uow.move_employees[{n_rows}][unit_of_work]": measure(unit_of_work, repeat)}
+
+    restore = UnitOfWork()
+    for emp_id, dep in zip(ids, before["DepartmentID"].tolist()):
+        restore.update("Employees", {"DepartmentID": None if pd.isna(dep) else int(dep)}, {"EmployeeID": emp_id})
+    restore.flush()
+    return results
+
+
+SUITES = {"queries": bench_queries, "dashboard": bench_dashboard, "services": bench_services,
+          "dataframes": bench_dataframes, "analytics": bench_analytics, "uow": bench_unit_of_work}
+
+
+# ------------------------------------------
+# Report
+# ------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+def compare(old, new):
+    """Print p50/p95 deltas between two reports."""
+    print(f"{'benchmark':<48} {'p50 old':>10} {'p50 new':>10} {'Δ':>8} {'p95 old':>10} {'p95 new':>10}")
+    for name, cur in new["results"].items():
+        prev = old["results"].get(name)
+        if prev is None:
+            print(f"{name:<48} {'-':>10} {cur['p50_ms']:>10.2f}")
+            continue
+        delta = (cur["p50_ms"] - prev["p50_ms"]) / prev["p50_ms"] * 100 if prev["p50_ms"] else 0.0
+        print(f"{name:<48} {prev['p50_ms']:>10.2f} {cur['p50_ms']:>10.2f} {delta:>+7.1f}% "
+              f"{prev['p95_ms']:>10.2f} {cur['p95_ms']:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark queries.py, the services and the dashboard")
+    parser.add_argument("--scale", default="10k", help="10k / 100k / 1m or an employee count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--suite", action="append", choices=sorted(SUITES), help="default: all")
+    parser.add_argument("--no-load", action="store_true", help="reuse the data already in the database")
+    parser.add_argument("-o", "--output", default=None, help="JSON report path")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two JSON reports")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            compare(json.load(f_old), json.load(f_new))
+        return 0
+
+    n = SCALES.get(args.scale.lower()) or int(args.scale)
+    dataset = Dataset(n, seed=args.seed)
+    counts = None
+    if not args.no_load:
+        print(f"Loading synthetic dataset: {n:,} employees, {dataset.n_projects:,} projects")
+        counts = load_dataset(dataset)
+
+    results = {}
+    for name in args.suite or list(SUITES):
+        print(f"Running {name} suite...")
+        results.update(SUITES[name](args.repeat, dataset))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "scale": n,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "row_counts": counts,
+        },
+        "results": results,
+    }
+    for name, r in results.items():
+        print(f"  {name:<48} p50 {r['p50_ms']:9.2f} ms   p95 {r['p95_ms']:9.2f} ms   {r['rows_per_sec']:12,.0f} rows/s")
+
+    output = args.output or f"bench_{args.scale}_{report['meta']['timestamp'].replace(':', '')}.json"
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"Report written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,387 @@
+# bulk_loader.py
+#
+# Fast bulk import of CSV / Parquet files into employee_manager_db.
+#
+#   python bulk_loader.py --dir data/                 # data/{departments,employees,projects,assignments}.csv|.parquet
+#   python bulk_loader.py --employees emps.csv --assignments assign.parquet
+#   python bulk_loader.py --dir data/ --replace       # TRUNCATE first
+#   python bulk_loader.py --dir data/ --no-infile     # force chunked multi-row INSERTs
+#
+# Files need a header row with the table's column names (see TABLES).
+# During the load FK/unique checks are off, secondary indexes are dropped and
+# rebuilt afterwards, and the dashboard-aggregate triggers are skipped (the
+# aggregates are rebuilt once at the end). Referential integrity is verified
+# after the load; the exit code is 1 if orphan rows were found.
+#
+# Each table is committed as soon as it is loaded (one transaction per table
+# keeps the undo log small), and TRUNCATE commits by itself. A failed load is
+# therefore NOT undone: the tables committed before the failure stay loaded
+# (listed in .committed / .truncated and printed). The indexes, checks,
+# aggregates and integrity report are restored for them all the same, and
+# their change events are published. The exit code is 2.
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from itertools import islice
+
+from mysql.connector import Error
+
+from connection import backend
+from query_cache import invalidate
+import changefeed
+
+# Load order respects the foreign keys
+TABLES = {
+    "Departments": ["DepartmentID", "DepartmentName"],
+    "Employees": ["EmployeeID", "Name", "DateOfBirth", "DepartmentID"],
+    "Projects": ["ProjectID", "ProjectName", "ManagerEmployeeID"],
+    "Assignments": ["EmployeeID", "ProjectID", "Role", "Salary"],
+}
+
+# Secondary indexes that are not needed by a foreign key: dropped before the
+# load and rebuilt in one ALTER TABLE afterwards (sorted index build).
+DEFERRABLE_INDEXES = {
+    "Employees": {"idx_employees_name": "(Name)"},
+    "Assignments": {"idx_assignments_role_salary": "(Role, Salary)",
+                    "idx_assignments_salary": "(Salary)"},
+}
+
+# Orphan checks run after the load: name -> SQL returning a count
+INTEGRITY_CHECKS = {
+    "Employees.DepartmentID": """
+        SELECT COUNT(*) FROM Employees e
+        LEFT JOIN Departments d ON e.DepartmentID = d.DepartmentID
+        WHERE d.DepartmentID IS NULL""",
+    "Projects.ManagerEmployeeID": """
+        SELECT COUNT(*) FROM Projects p
+        LEFT JOIN Employees e ON p.ManagerEmployeeID = e.EmployeeID
+        WHERE p.ManagerEmployeeID IS NOT NULL AND e.EmployeeID IS NULL""",
+    "Assignments.EmployeeID": """
+        SELECT COUNT(*) FROM Assignments a
+        LEFT JOIN Employees e ON a.EmployeeID = e.EmployeeID
+        WHERE e.EmployeeID IS NULL""",
+    "Assignments.ProjectID": """
+        SELECT COUNT(*) FROM Assignments a
+        LEFT JOIN Projects p ON a.ProjectID = p.ProjectID
+        WHERE p.ProjectID IS NULL""",
+}
+
+DEFAULT_CHUNK_SIZE = 10000
+_INFILE_DISABLED_ERRORS = (1148, 2068, 3948)
+
+
+class BulkLoadSession:
+    """
+    Dedicated (non-pooled) connection configured for bulk loading.
+
+        with BulkLoadSession(replace=True) as loader:
+            loader.load_file("Employees", "employees.csv")
+            loader.load_rows("Assignments", TABLES["Assignments"], rows)
+        print(loader.orphans)
+
+    On exit - also after a failure - indexes are rebuilt, checks restored,
+    aggregates rebuilt and referential integrity verified (results in
+    .orphans). After a failure only the table being loaded is rolled back:
+    .truncated and .committed list what already changed.
+    """
+
+    def __init__(self, replace=False, defer_indexes=True, use_infile=True, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.replace = replace
+        self.defer_indexes = defer_indexes
+        self.use_infile = use_infile
+        self.chunk_size = chunk_size
+        self.conn = None
+        self.stats = {}
+        self.orphans = {}
+        self.truncated = []   # tables emptied (replace=True), committed
+        self.committed = []   # tables whose loaded rows are committed
+        self._events = []     # their change events, published on exit
+        self._dropped = {}
+
+    # ------------------------------------------
+    # Session setup / teardown
+    # ------------------------------------------
+
+    def __enter__(self):
+        if not backend.supports_infile:
+            # Embedded backend: plain executemany INSERTs, indexes stay in place
+            self.use_infile = False
+            self.defer_indexes = False
+        self.conn = backend.connect(allow_local_infile=self.use_infile)
+        try:
+            self._execute("SET FOREIGN_KEY_CHECKS = 0")
+            self._execute("SET UNIQUE_CHECKS = 0")
+            self._execute("SET @skip_dashboard_aggregates = 1")
+            if self.replace:
+                for table in reversed(list(TABLES)):
+                    self._execute(f"TRUNCATE TABLE {table}")
+                    self.truncated.append(table)
+                # Table-wide change events: subscribers reload instead of applying rows
+                self._commit(changefeed.event_type(table, "deleted")() for table in self.truncated)
+            if self.defer_indexes:
+                self._drop_secondary_indexes()
+        except BaseException:
+            self.__exit__(*sys.exc_info())
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is not None:
+                self.conn.rollback()   # the table being loaded; the committed ones stay
+            self._finish()
+        except Error as e:
+            if exc_type is None:
+                raise
+            # e.g. the connection was lost: report the original error
+            print(f"❌ Could not restore the database after the failed load: {e}")
+        finally:
+            self.conn.close()
+            invalidate(*TABLES)
+            changefeed.publish(self._events)
+        if exc_type is not None and (self.truncated or self.committed):
+            print("⚠️ Load failed after committing: "
+                  + ", ".join([f"{t} (emptied)" for t in self.truncated if t not in self.committed]
+                              + [f"{t} (loaded)" for t in self.committed])
+                  + ". The database holds a partial load.")
+        return False
+
+    def _finish(self):
+        """Indexes, checks, aggregates and integrity report: run after every load, failed or not."""
+        if self._dropped:
+            self._restore_secondary_indexes()
+        self._execute("SET UNIQUE_CHECKS = 1")
+        self._execute("SET FOREIGN_KEY_CHECKS = 1")
+        self._execute("SET @skip_dashboard_aggregates = NULL")
+        self._execute("CALL RebuildDashboardAggregates()")
+        self.conn.commit()
+        self.orphans = self.validate()
+
+    def _commit(self, events):
+        """Commit the open transaction together with its change events."""
+        recorded = changefeed.record(self.conn, *events)
+        self.conn.commit()
+        self._events.extend(recorded)
+
+    def _execute(self, sql, params=None):
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            if cursor.with_rows:
+                return cursor.fetchall()
+            return cursor.rowcount
+        finally:
+            cursor.close()
+
+    def _drop_secondary_indexes(self):
+        rows = self._execute(
+            """
+            SELECT DISTINCT TABLE_NAME, INDEX_NAME
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            """
+        )
+        existing = {(t.lower(), i) for t, i in rows}
+        for table, indexes in DEFERRABLE_INDEXES.items():
+            names = [name for name in indexes if (table.lower(), name) in existing]
+            if names:
+                self._execute(f"ALTER TABLE {table} " + ", ".join(f"DROP INDEX {n}" for n in names))
+                self._dropped[table] = names
+
+    def _restore_secondary_indexes(self):
+        for table, names in self._dropped.items():
+            start = time.perf_counter()
+            adds = ", ".join(f"ADD INDEX {n} {DEFERRABLE_INDEXES[table][n]}" for n in names)
+            self._execute(f"ALTER TABLE {table} {adds}")
+            print(f"  rebuilt {len(names)} index(es) on {table} in {time.perf_counter() - start:.1f}s")
+        self._dropped = {}
+
+    # ------------------------------------------
+    # Loading
+    # ------------------------------------------
+
+    def load_file(self, table, path):
+        """Load a .csv or .parquet file into `table`. Returns the number of rows loaded."""
+        start = time.perf_counter()
+        if path.lower().endswith(".parquet"):
+            n = self._load_parquet(table, path)
+        else:
+            n = self._load_csv(table, path)
+        self._record(table, n, time.perf_counter() - start)
+        return n
+
+    def load_rows(self, table, columns, rows):
+        """Chunked multi-row INSERT of an iterable of tuples."""
+        start = time.perf_counter()
+        n = self._insert_rows(table, columns, rows)
+        self._record(table, n, time.perf_counter() - start)
+        return n
+
+    def _record(self, table, n, elapsed):
+        self._commit([changefeed.event_type(table, "created")()])
+        if table not in self.committed:
+            self.committed.append(table)
+        self.stats[table] = {"rows": n, "seconds": elapsed, "rows_per_sec": n / elapsed if elapsed else 0.0}
+        print(f"  loaded {n:>10,} {table:<12} in {elapsed:6.1f}s ({self.stats[table]['rows_per_sec']:,.0f} rows/s)")
+
+    def _load_csv(self, table, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader(f))
+        columns = _check_columns(table, header)
+
+        if self.use_infile:
+            try:
+                return self._load_data_infile(table, path, columns)
+            except Error as e:
+                if e.errno not in _INFILE_DISABLED_ERRORS:
+                    raise
+                print(f"  LOAD DATA LOCAL INFILE unavailable ({e.msg}); falling back to multi-row INSERT")
+                self.use_infile = False
+
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.reader(f)
+            next(reader)
+            return self._insert_rows(table, columns, (tuple(v if v != "" else None for v in row) for row in reader))
+
+    def _load_data_infile(self, table, path, columns):
+        with open(path, "rb") as f:
+            line_end = "\\r\\n" if b"\r\n" in f.read(65536) else "\\n"
+        # Every column goes through a user variable so that empty fields become NULL
+        variables = ", ".join(f"@v{i}" for i in range(len(columns)))
+        assignments = ", ".join(f"{col} = NULLIF(@v{i}, '')" for i, col in enumerate(columns))
+        sql = f"""
+            LOAD DATA LOCAL INFILE %s
+            INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '{line_end}'
+            IGNORE 1 LINES
+            ({variables})
+            SET {assignments}
+        """
+        return self._execute(sql, (os.path.abspath(path),))
+
+    def _load_parquet(self, table, path):
+        import pyarrow.parquet as pq
+
+        parquet = pq.ParquetFile(path)
+        columns = _check_columns(table, parquet.schema_arrow.names)
+        total = 0
+        for batch in parquet.iter_batches(batch_size=max(self.chunk_size, 100_000), columns=columns):
+            df = batch.to_pandas()
+            if self.use_infile:
+                # Spill the batch to a temporary CSV so the server can ingest it natively
+                with tempfile.NamedTemporaryFile("w", suffix=".csv", delete=False, newline="", encoding="utf-8") as tmp:
+                    df.to_csv(tmp, index=False)
+                try:
+                    total += self._load_csv(table, tmp.name)
+                finally:
+                    os.unlink(tmp.name)
+            else:
+                df = df.astype(object).where(df.notna(), None)
+                total += self._insert_rows(table, columns, df.itertuples(index=False, name=None))
+        return total
+
+    def _insert_rows(self, table, columns, rows):
+        sql = (f"INSERT INTO {table} ({', '.join(columns)}) "
+               f"VALUES ({', '.join(['%s'] * len(columns))})")
+        cursor = self.conn.cursor()
+        total = 0
+        try:
+            rows = iter(rows)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                # executemany rewrites this into a single multi-row INSERT
+                cursor.executemany(sql, chunk)
+                total += len(chunk)
+        finally:
+            cursor.close()
+        return total
+
+    # ------------------------------------------
+    # Integrity
+    # ------------------------------------------
+
+    def validate(self):
+        """Count rows whose foreign keys point nowhere (possible while FK checks were off)."""
+        return {name: self._execute(sql)[0][0] for name, sql in INTEGRITY_CHECKS.items()}
+
+
+def _check_columns(table, header):
+    expected = TABLES[table]
+    lookup = {c.lower(): c for c in expected}
+    columns = [lookup.get(h.strip().lower()) for h in header]
+    unknown = [h for h, c in zip(header, columns) if c is None]
+    if unknown:
+        raise ValueError(f"{table}: unknown column(s) {unknown}; expected {expected}")
+    return columns
+
+
+def find_files(directory):
+    """Map table -> file for {table}.csv / {table}.parquet in `directory` (case-insensitive)."""
+    found = {}
+    names = {f.lower(): f for f in os.listdir(directory)}
+    for table in TABLES:
+        for ext in (".parquet", ".csv"):
+            name = names.get(table.lower() + ext)
+            if name:
+                found[table] = os.path.join(directory, name)
+                break
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load CSV/Parquet files into employee_manager_db")
+    parser.add_argument("--dir", help="directory containing departments/employees/projects/assignments files")
+    for table in TABLES:
+        parser.add_argument(f"--{table.lower()}", metavar="FILE", help=f"file for {table}")
+    parser.add_argument("--replace", action="store_true", help="TRUNCATE the tables before loading")
+    parser.add_argument("--no-infile", action="store_true", help="use multi-row INSERTs instead of LOAD DATA")
+    parser.add_argument("--keep-indexes", action="store_true", help="do not drop/rebuild secondary indexes")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    files = find_files(args.dir) if args.dir else {}
+    for table in TABLES:
+        path = getattr(args, table.lower())
+        if path:
+            files[table] = path
+    if not files:
+        parser.error("nothing to load: pass --dir or at least one table file")
+
+    session = BulkLoadSession(
+        replace=args.replace,
+        defer_indexes=not args.keep_indexes,
+        use_infile=not args.no_infile,
+        chunk_size=args.chunk_size,
+    )
+    try:
+        with session as loader:
+            for table in TABLES:
+                if table in files:
+                    loader.load_file(table, files[table])
+    except (Error, ValueError, OSError) as e:
+        print(f"❌ Bulk load failed: {e}")
+        for name, n in session.orphans.items():
+            if n:
+                print(f"   {n:,} rows with dangling {name}")
+        return 2
+
+    bad = {name: n for name, n in session.orphans.items() if n}
+    if bad:
+        print("❌ Referential integrity violations:")
+        for name, n in bad.items():
+            print(f"   {n:,} rows with dangling {name}")
+        return 1
+    print("✅ Load complete, referential integrity OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
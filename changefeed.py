@@ -0,0 +1,420 @@
+# changefeed.py
+#
+# Change-data-capture through an outbox table. Every write - the services,
+# the unit of work, db_execute in main.py, the bulk loader - also inserts its
+# change events into ChangeOutbox in the SAME transaction (record()), so an
+# event exists exactly when its change was committed. Subscribers get typed
+# events (EmployeeUpdated, AssignmentDeleted, ...):
+#
+#   changefeed.subscribe(on_employees, EmployeeCreated, EmployeeUpdated, EmployeeDeleted)
+#
+# Subscribers are called with a list of events per delivery, one delivery at
+# a time. Two paths feed them:
+#   - publish(events), called by the writer right after its commit with the
+#     events record() returned: delivered from memory before the writer
+#     returns (read-your-writes), without touching the database;
+#   - a background thread (start()) polling the outbox in EventID order every
+#     POLL_INTERVAL seconds for changes committed by other processes (rows of
+#     this process's ORIGIN were delivered by their writer and are skipped).
+#
+# An event's key is the primary key of the changed row when known; otherwise
+# the WHERE columns of a statement that hit several rows, or {} when any row
+# of the table may have changed (raw SQL, bulk loads). Subscribers that can
+# not apply such an event rely on the query cache version bump instead.
+
+import json
+import threading
+import time
+import uuid
+
+from mysql.connector import Error
+
+from connection import get_db_connection
+from query_cache import invalidate, written_table
+
+POLL_INTERVAL = 1.0      # seconds between background polls
+BATCH_SIZE = 500         # outbox rows read per query
+RECORD_CHUNK = 500       # outbox rows per INSERT
+GAP_TIMEOUT = 10.0       # seconds to wait for a skipped EventID (transaction still open)
+MAX_GAP = 1000           # larger jumps in EventID are not tracked as gaps
+RETAIN_EVENTS = 10000    # outbox rows kept by prune()
+PRUNE_EVERY = 60         # background polls between prunes
+
+# Identifies this process's own events (their cache invalidation already happened)
+ORIGIN = uuid.uuid4().hex
+
+INSERT_SQL = "INSERT INTO ChangeOutbox (EventType, EntityKey, Payload, Origin) VALUES (%s, %s, %s, %s)"
+SELECT_SQL = ("SELECT EventID, EventType, EntityKey, Payload, Origin FROM ChangeOutbox "
+              "WHERE EventID > %s ORDER BY EventID LIMIT %s")
+
+PRIMARY_KEYS = {
+    "Departments": ("DepartmentID",),
+    "Employees": ("EmployeeID",),
+    "Projects": ("ProjectID",),
+    "Assignments": ("EmployeeID", "ProjectID"),
+}
+_TABLE_NAMES = {table.lower(): table for table in PRIMARY_KEYS}
+
+
+# ------------------------------------------
+# Events
+# ------------------------------------------
+class ChangeEvent:
+    """
+    One committed change. `key`: {column: value} selecting the changed rows;
+    `data`: the new column values (empty for deletes).
+    """
+
+    table = None
+    action = None   # "created" | "updated" | "deleted"
+
+    def __init__(self, key=None, data=None, event_id=None, origin=ORIGIN):
+        self.key = dict(key or {})
+        self.data = dict(data or {})
+        self.event_id = event_id
+        self.origin = origin
+
+    @property
+    def local(self):
+        """Written by this process."""
+        return self.origin == ORIGIN
+
+    def row_key(self):
+        """Primary key values of the one changed row, or None if the key selects more (or less)."""
+        columns = PRIMARY_KEYS.get(self.table, ())
+        if not columns or set(self.key) != set(columns):
+            return None
+        return tuple(self.key[col] for col in columns)
+
+    def outbox_row(self):
+        return (type(self).__name__, json.dumps(self.key, default=str),
+                json.dumps(self.data, default=str), self.origin)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.key}, {self.data})"
+
+
+class DepartmentCreated(ChangeEvent):
+    table, action = "Departments", "created"
+
+
+class DepartmentUpdated(ChangeEvent):
+    table, action = "Departments", "updated"
+
+
+class DepartmentDeleted(ChangeEvent):
+    table, action = "Departments", "deleted"
+
+
+class EmployeeCreated(ChangeEvent):
+    table, action = "Employees", "created"
+
+
+class EmployeeUpdated(ChangeEvent):
+    table, action = "Employees", "updated"
+
+
+class EmployeeDeleted(ChangeEvent):
+    table, action = "Employees", "deleted"
+
+
+class ProjectCreated(ChangeEvent):
+    table, action = "Projects", "created"
+
+
+class ProjectUpdated(ChangeEvent):
+    table, action = "Projects", "updated"
+
+
+class ProjectDeleted(ChangeEvent):
+    table, action = "Projects", "deleted"
+
+
+class AssignmentCreated(ChangeEvent):
+    table, action = "Assignments", "created"
+
+
+class AssignmentUpdated(ChangeEvent):
+    table, action = "Assignments", "updated"
+
+
+class AssignmentDeleted(ChangeEvent):
+    table, action = "Assignments", "deleted"
+
+
+EVENT_TYPES = {cls.__name__: cls for cls in ChangeEvent.__subclasses__()}
+_BY_TABLE_ACTION = {(cls.table, cls.action): cls for cls in EVENT_TYPES.values()}
+
+
+def event_type(table, action):
+    """Event class for a table ("employees", "Employees"...) and action, or None."""
+    return _BY_TABLE_ACTION.get((_TABLE_NAMES.get(table.lower()), action))
+
+
+def events_for_sql(sql):
+    """
+    Events for a raw INSERT/UPDATE/DELETE statement (db_execute): one event
+    with an empty key, i.e. "some rows of this table changed".
+    """
+    table = written_table(sql)
+    if table is None:
+        return []
+    verb = sql.split(None, 1)[0].lower()
+    action = {"update": "updated", "delete": "deleted", "truncate": "deleted"}.get(verb, "created")
+    if action == "created" and "ON DUPLICATE KEY" in sql.upper():
+        action = "updated"
+    cls = event_type(table, action)
+    return [cls()] if cls else []
+
+
+# ------------------------------------------
+# Writing
+# ------------------------------------------
+def record(conn, *events):
+    """
+    Add `events` to the outbox on `conn`, inside its open transaction: call
+    after the change itself and before commit(), so both commit or neither.
+    Returns the events, for publish() once committed. Raises
+    mysql.connector.Error like the change would.
+    """
+    if not events:
+        return []
+    relay.mark_start(conn)
+    rows = [event.outbox_row() for event in events]
+    cursor = conn.cursor()
+    try:
+        for start in range(0, len(rows), RECORD_CHUNK):
+            cursor.executemany(INSERT_SQL, rows[start:start + RECORD_CHUNK])
+    finally:
+        cursor.close()
+    return list(events)
+
+
+# ------------------------------------------
+# Delivery
+# ------------------------------------------
+class OutboxRelay:
+    """
+    Delivers this process's committed events (deliver_local) and the other
+    processes' ones, read from the outbox in EventID order (poll).
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, gap_timeout=GAP_TIMEOUT):
+        self.batch_size = batch_size
+        self.gap_timeout = gap_timeout
+        self.last_id = None        # newest EventID delivered; None until first use
+        self.delivered = 0
+        self.last_error = None
+        self._subscribers = []     # (fn, event classes or None for all)
+        self._gaps = {}            # skipped EventID -> monotonic deadline
+        self._lock = threading.RLock()          # outbox reads (poll, mark_start)
+        self._deliver_lock = threading.Lock()   # one delivery at a time; never held across DB I/O
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ---- subscribers ----
+    def subscribe(self, fn, *event_types):
+        """Call fn(events) with the new events of `event_types` (default: all)."""
+        self._subscribers.append((fn, event_types or None))
+
+    def unsubscribe(self, fn):
+        self._subscribers = [(f, types) for f, types in self._subscribers if f is not fn]
+
+    def _deliver(self, events):
+        with self._deliver_lock:
+            for fn, types in list(self._subscribers):
+                batch = events if types is None else [e for e in events if isinstance(e, types)]
+                if not batch:
+                    continue
+                try:
+                    fn(batch)
+                except Exception as e:
+                    print("❌ Change subscriber failed:", e)
+            self.delivered += len(events)
+
+    def deliver_local(self, events):
+        """Deliver events this process just committed, from memory. Returns the number delivered."""
+        events = list(events)
+        if events:
+            self._deliver(events)
+        return len(events)
+
+    # ---- reading ----
+    def mark_start(self, conn=None):
+        """
+        On first use, start after the newest outbox row: older changes are
+        already in whatever the subscribers load. The writers call this before
+        recording their first event so it is not skipped.
+        """
+        if self.last_id is not None:
+            return
+        with self._lock:
+            if self.last_id is not None:
+                return
+            own = conn is None
+            conn = conn or get_db_connection()
+            if conn is None:
+                return
+            cursor = conn.cursor()
+            try:
+                cursor.execute("SELECT COALESCE(MAX(EventID), 0) FROM ChangeOutbox")
+                self.last_id = int(cursor.fetchall()[0][0])
+            finally:
+                cursor.close()
+                if own:
+                    conn.close()
+
+    def _fetch(self, cursor):
+        rows = []
+        now = time.monotonic()
+        self._gaps = {event_id: until for event_id, until in self._gaps.items() if until > now}
+        if self._gaps:
+            # rows whose transaction had not committed when a later EventID was read
+            ids = sorted(self._gaps)
+            cursor.execute("SELECT EventID, EventType, EntityKey, Payload, Origin FROM ChangeOutbox "
+                           f"WHERE EventID IN ({', '.join(['%s'] * len(ids))}) ORDER BY EventID", ids)
+            rows = cursor.fetchall()
+            for row in rows:
+                self._gaps.pop(row[0], None)
+
+        cursor.execute(SELECT_SQL, (self.last_id, self.batch_size))
+        new = cursor.fetchall()
+        expected = self.last_id + 1
+        for row in new:
+            if row[0] - expected <= MAX_GAP:
+                for missing in range(expected, row[0]):
+                    self._gaps[missing] = now + self.gap_timeout
+            expected = row[0] + 1
+        if new:
+            self.last_id = new[-1][0]
+        return rows + new, len(new) == self.batch_size
+
+    @staticmethod
+    def _event(row):
+        event_id, name, key, payload, origin = row
+        cls = EVENT_TYPES.get(name)
+        if cls is None:
+            return None
+        return cls(json.loads(key), json.loads(payload), event_id=event_id, origin=origin)
+
+    def poll(self):
+        """
+        Deliver the new outbox events of other processes, in order (this
+        process's own were delivered by their writers). Returns the number
+        delivered.
+        """
+        total = 0
+        with self._lock:
+            more = True
+            while more:
+                conn = get_db_connection()   # the primary: a replica may not have the rows yet
+                if conn is None:
+                    return total
+                cursor = conn.cursor()
+                try:
+                    self.mark_start(conn)
+                    rows, more = self._fetch(cursor)
+                    conn.commit()   # end the read snapshot (REPEATABLE READ) before the next poll
+                except Error as e:
+                    self.last_error = str(e)
+                    print("❌ Change feed poll failed:", e)
+                    return total
+                finally:
+                    cursor.close()
+                    conn.close()
+                events = [event for event in map(self._event, rows) if event is not None and not event.local]
+                if events:
+                    self._deliver(events)
+                total += len(events)
+        return total
+
+    def prune(self, keep=RETAIN_EVENTS):
+        """Delete delivered outbox rows older than the newest `keep`."""
+        if self.last_id is None or self.last_id <= keep:
+            return 0
+        conn = get_db_connection()
+        if conn is None:
+            return 0
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM ChangeOutbox WHERE EventID <= %s", (self.last_id - keep,))
+            conn.commit()
+            return cursor.rowcount
+        except Error as e:
+            conn.rollback()
+            print("❌ Cannot prune change outbox:", e)
+            return 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    # ---- background polling ----
+    def start(self, interval=POLL_INTERVAL):
+        """Poll in a daemon thread (idempotent)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, args=(interval,), name="changefeed", daemon=True)
+            self._thread.start()
+
+    def _run(self, interval):
+        polls = 0
+        while not self._stop.wait(interval):
+            try:
+                self.poll()
+                polls += 1
+                if polls % PRUNE_EVERY == 0:
+                    self.prune()
+            except Exception as e:
+                print("❌ Change feed relay failed:", e)
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        self._stop.set()
+        if thread is not None:
+            thread.join()
+
+    def stats(self):
+        return {
+            "last_event_id": self.last_id,
+            "delivered": self.delivered,
+            "subscribers": len(self._subscribers),
+            "pending_gaps": len(self._gaps),
+            "polling": self._thread is not None,
+            "last_error": self.last_error,
+        }
+
+
+relay = OutboxRelay()
+
+
+def subscribe(fn, *event_types):
+    relay.subscribe(fn, *event_types)
+
+
+def unsubscribe(fn):
+    relay.unsubscribe(fn)
+
+
+def publish(events):
+    """
+    Deliver `events` (as returned by record()) once their transaction has
+    committed; writers call this right after commit + invalidate.
+    """
+    return relay.deliver_local(events)
+
+
+def start(interval=POLL_INTERVAL):
+    relay.start(interval)
+
+
+# Other processes' writes: bump the query cache versions of their tables
+# (this process already invalidated its own right after commit).
+def _invalidate_remote(events):
+    tables = [event.table for event in events if not event.local]
+    if tables:
+        invalidate(*dict.fromkeys(tables))
+
+
+subscribe(_invalidate_remote)
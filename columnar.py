@@ -0,0 +1,229 @@
+# columnar.py
+#
+# Compact column storage for large result sets. A table keeps one typed array
+# per attribute (names packed into a single UTF-8 buffer) instead of one
+# Python object per row; rows are read through lightweight views that expose
+# the same attributes as the model classes.
+
+import datetime
+from array import array
+from decimal import ROUND_HALF_EVEN, Decimal
+
+FETCH_CHUNK_SIZE = 5000
+
+
+class Column:
+    """Base column: values in a typed array plus a NULL mask allocated on first None."""
+
+    def __init__(self):
+        self._nulls = None   # bytearray, 1 = NULL
+
+    def append(self, value):
+        if value is None:
+            if self._nulls is None:
+                self._nulls = bytearray(len(self))
+            self._nulls.append(1)
+            self._append(self._null_value())
+            return
+        if self._nulls is not None:
+            self._nulls.append(0)
+        self._append(value)
+
+    def __getitem__(self, i):
+        if self._nulls is not None and self._nulls[i]:
+            return None
+        return self._get(i)
+
+    def is_null(self, i):
+        return self._nulls is not None and bool(self._nulls[i])
+
+    def nbytes(self):
+        return len(self._nulls) if self._nulls is not None else 0
+
+
+class IntColumn(Column):
+    def __init__(self):
+        super().__init__()
+        self.values = array("q")
+
+    def __len__(self):
+        return len(self.values)
+
+    def _null_value(self):
+        return 0
+
+    def _append(self, value):
+        self.values.append(int(value))
+
+    def _get(self, i):
+        return self.values[i]
+
+    def nbytes(self):
+        return super().nbytes() + self.values.itemsize * len(self.values)
+
+
+class DecimalColumn(IntColumn):
+    """Fixed-point decimals (e.g. DECIMAL(10, 2)) stored as scaled integers."""
+
+    def __init__(self, scale=2):
+        super().__init__()
+        self.scale = scale
+
+    def _append(self, value):
+        # str() first: a float (e.g. SQLite REAL) is the shortest decimal it prints as, not its binary value
+        scaled = Decimal(str(value) if isinstance(value, float) else value).scaleb(self.scale)
+        self.values.append(int(scaled.to_integral_value(ROUND_HALF_EVEN)))
+
+    def _get(self, i):
+        return Decimal(self.values[i]).scaleb(-self.scale)
+
+
+class DateColumn(IntColumn):
+    """Dates stored as proleptic Gregorian ordinals."""
+
+    def _append(self, value):
+        if isinstance(value, str):
+            value = datetime.date.fromisoformat(value)
+        self.values.append(value.toordinal())
+
+    def _get(self, i):
+        return datetime.date.fromordinal(self.values[i])
+
+
+class StrColumn(Column):
+    """Strings packed into one UTF-8 buffer with an offsets array."""
+
+    def __init__(self):
+        super().__init__()
+        self.buffer = bytearray()
+        self.offsets = array("q", [0])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _null_value(self):
+        return ""
+
+    def _append(self, value):
+        self.buffer += str(value).encode("utf-8")
+        self.offsets.append(len(self.buffer))
+
+    def _get(self, i):
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def nbytes(self):
+        return super().nbytes() + len(self.buffer) + self.offsets.itemsize * len(self.offsets)
+
+
+class RowView:
+    """
+    Read-only view of one row of a ColumnarTable. Attribute access reads the
+    column arrays, so views cost two slots regardless of the row width.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name):
+        column = self._table.columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        return column[self._index]
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Row views are read-only; use to_model() for an editable copy")
+
+    def to_model(self):
+        return self._table.row_type(*self.values())
+
+    def values(self):
+        return tuple(column[self._index] for column in self._table.columns.values())
+
+    def __eq__(self, other):
+        fields = self._table.fields
+        try:
+            return self.values() == tuple(getattr(other, f) for f in fields)
+        except AttributeError:
+            return NotImplemented
+
+    def __repr__(self):
+        return self._table.row_type.__repr__(self)
+
+
+class ColumnarTable:
+    """
+    Column-oriented collection of rows. Subclasses set `row_type` (the model
+    class) and `schema` ((attribute, column factory) in constructor order).
+
+    Behaves like a read-only list of models: len(), iteration, indexing and
+    slicing return RowView objects with the model's attributes.
+    """
+
+    row_type = None
+    schema = ()
+
+    def __init__(self):
+        self.columns = {name: factory() for name, factory in self.schema}
+        self.fields = tuple(self.columns)
+
+    @classmethod
+    def from_rows(cls, rows):
+        table = cls()
+        table.extend(rows)
+        return table
+
+    def append(self, *values):
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(*row)
+
+    def extend_from_cursor(self, cursor, chunk_size=FETCH_CHUNK_SIZE):
+        """Append a cursor's remaining rows, fetchmany() chunk by chunk."""
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            self.extend(rows)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [RowView(self, j) for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("row index out of range")
+        return RowView(self, i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield RowView(self, i)
+
+    def column(self, name):
+        """
+        All values of one column. Non-null integer columns return the backing
+        array itself (no copy), which numpy.frombuffer() can wrap.
+        """
+        column = self.columns[name]
+        if type(column) is IntColumn and column._nulls is None:
+            return column.values
+        return [column[i] for i in range(len(self))]
+
+    def to_models(self):
+        return [view.to_model() for view in self]
+
+    def nbytes(self):
+        """Approximate memory held by the column buffers."""
+        return sum(column.nbytes() for column in self.columns.values())
+
+    def __repr__(self):
+        return f"{type(self).__name__}({len(self)} rows)"
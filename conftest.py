@@ -0,0 +1,10 @@
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def slow_query_log(tmp_path, monkeypatch):
+    """Statements slow enough to be logged go to the test's tmp_path."""
+    monkeypatch.setattr(profiling.slow_log, "path", str(tmp_path / "slow_queries.log"))
+    return profiling.slow_log
@@ -1,8 +1,21 @@
 # connection.py
 
-import mysql.connector
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from mysql.connector import Error
 
+import env
+from backends import get_backend
+from db_pool import ConnectionPool, PoolTimeoutError
+import stmt_cache
+from replicas import ReplicaRouter
+
+# "mysql" or "sqlite" (see backends.py); the environment overrides env.py
+DB_TYPE = os.environ.get("DB_TYPE", env.DB_TYPE)
+
 config = {
     "host": "localhost",
     "user": "root",
@@ -10,14 +23,178 @@ config = {
     "database": "employee_manager_db",
 }
 
+sqlite_config = {
+    "path": os.environ.get("DB_PATH", env.DB_PATH),   # empty: in-memory database
+}
+
+pool_config = {
+    "pool_size": 5,        # connections kept open while idle
+    "max_overflow": 10,    # extra connections allowed under load
+    "timeout": 10.0,       # seconds to wait for a free connection
+    "max_lifetime": 1800,  # seconds before a connection is recycled
+}
+
+replica_config = {
+    "replicas": os.environ.get("DB_REPLICAS", env.DB_REPLICAS),      # see env.py; empty: no replicas
+    "strategy": os.environ.get("DB_READ_STRATEGY", env.DB_READ_STRATEGY),
+    "pin_seconds": 5.0,    # reads stay on the primary this long after a session writes
+}
+
+backend = get_backend(DB_TYPE, mysql=config, sqlite=sqlite_config)
+
+_pool = None
+_pool_lock = threading.Lock()
+_router = None
+_router_ready = False
+
+# Called with every connection handed out in the current context (see track_connections)
+_checkout_listener = ContextVar("checkout_listener", default=None)
+# True inside read_from_primary(): read_only connections come from the primary as well
+_primary_reads = ContextVar("primary_reads", default=False)
+
+
+def _connect():
+    conn = backend.connect()
+    if conn.is_connected():
+        return conn
+    return None
+
+
+def get_pool():
+    """Return the process-wide connection pool (created on first use)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(_connect, **pool_config)
+    return _pool
+
+
+def replica_backend(entry):
+    """Backend for one DB_REPLICAS entry: host[:port] for mysql, a file path for sqlite."""
+    host, _, port = entry.partition(":")
+    mysql = {**config, "host": host}
+    if port:
+        mysql["port"] = int(port)
+    return get_backend(DB_TYPE, mysql=mysql, sqlite={**sqlite_config, "path": entry})
+
+
+def configure_replicas(replicas, strategy=None, pin_seconds=None):
+    """
+    Replace the read replicas: [(name, backend)], or [] to send every read to
+    the primary. Defaults come from replica_config.
+    """
+    global _router, _router_ready
+    with _pool_lock:
+        old, _router = _router, None
+        if replicas:
+            _router = ReplicaRouter(
+                replicas, pool_config,
+                strategy=strategy or replica_config["strategy"],
+                pin_seconds=replica_config["pin_seconds"] if pin_seconds is None else pin_seconds)
+        _router_ready = True
+    if old is not None:
+        old.close()
+    return _router
+
 
-def get_db_connection():
-    """Return a new MySQL connection."""
+def get_router():
+    """The ReplicaRouter for DB_REPLICAS (created on first use), or None without replicas."""
+    if not _router_ready:
+        entries = [e.strip() for e in replica_config["replicas"].split(",") if e.strip()]
+        configure_replicas([(entry, replica_backend(entry)) for entry in entries])
+    return _router
+
+
+def get_db_connection(read_only=False):
+    """
+    Return a pooled database connection (MySQL or the embedded backend).
+    Calling close() on it returns it to the pool.
+
+    read_only=True marks a plain SELECT: it may be served by a read replica
+    (see replicas.py) unless the session wrote within the last pin_seconds.
+    conn.backend is the server the connection belongs to.
+    """
     try:
-        conn = mysql.connector.connect(**config)
-        if conn.is_connected():
-            return conn
-        return None
-    except Error as err:
+        conn = None
+        if read_only and not _primary_reads.get():
+            router = get_router()
+            if router is not None:
+                conn = router.acquire()
+        if conn is None:
+            conn = get_pool().acquire()
+            conn.backend = backend
+        listener = _checkout_listener.get()
+        if listener is not None:
+            listener(conn)
+        return conn
+    except (Error, ConnectionError) as err:
         print("❌ MySQL connection error:", err)
         return None
+    except PoolTimeoutError as err:
+        print("❌ Connection pool exhausted:", err)
+        return None
+
+
+def pool_stats():
+    """Pool metrics (in-use, idle, wait time...) for the Settings page."""
+    if _pool is None:
+        return {}
+    stats = _pool.stats()
+    stats["prepared_statements"] = stmt_cache.stats()
+    if _router is not None:
+        stats["replicas"] = _router.stats()
+    return stats
+
+
+@contextmanager
+def read_from_primary():
+    """
+    Send the read_only reads of the block to the primary, for data that is
+    kept and served as current afterwards (e.g. search_index.py rebuilds): a
+    lagging replica could miss the write that triggered the rebuild.
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+@contextmanager
+def track_connections(listener):
+    """
+    Call listener(conn) for every connection get_db_connection() returns inside
+    the block (same thread / context). Used to find and KILL a running query.
+    """
+    token = _checkout_listener.set(listener)
+    try:
+        yield
+    finally:
+        _checkout_listener.reset(token)
+
+
+def kill_query(connection_id, server=None):
+    """
+    Abort the statement running on server thread `connection_id` (KILL QUERY)
+    of `server` - the backend of the connection running it (conn.backend),
+    default the primary. Uses a dedicated connection so it works even when
+    the pool is exhausted.
+    """
+    try:
+        conn = (server or backend).connect()
+    except Error as err:
+        print("❌ Cannot cancel query:", err)
+        return False
+    try:
+        cursor = conn.cursor()
+        cursor.execute("KILL QUERY %s", (int(connection_id),))
+        cursor.close()
+        return True
+    except Error as err:
+        # 1094: unknown thread id, i.e. the query already finished
+        if err.errno != 1094:
+            print("❌ Cannot cancel query:", err)
+        return False
+    finally:
+        conn.close()
@@ -0,0 +1,291 @@
+# db_pool.py
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from profiling import InstrumentedCursor
+from stmt_cache import CachedStatement, StatementCache
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection becomes available within the wait timeout."""
+
+
+class _PoolEntry:
+    """A physical connection owned by the pool."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.overflow = False
+        self.invalid = False
+        self.statements = None   # StatementCache, created on first prepare()
+
+
+class PooledConnection:
+    """
+    Checkout handle returned by ConnectionPool.acquire().
+    Behaves like the underlying connection; close() hands it back to the pool
+    instead of tearing down the TCP connection.
+    """
+
+    def __init__(self, pool, entry):
+        self._pool = pool
+        self._entry = entry
+        self._owner = threading.Lock()   # held by close() and while_checked_out()
+
+    def __getattr__(self, name):
+        entry = self.__dict__.get("_entry")
+        if entry is None:
+            raise AttributeError(f"Connection already returned to pool (accessing '{name}')")
+        return getattr(entry.raw, name)
+
+    def cursor(self, *args, **kwargs):
+        """Driver cursor wrapped so every statement is profiled (see profiling.py)."""
+        entry = self._entry
+        if entry is None:
+            raise AttributeError("Connection already returned to pool")
+        return InstrumentedCursor(entry.raw.cursor(*args, **kwargs))
+
+    def prepare(self, sql):
+        """
+        Cursor for `sql` backed by a server-side prepared statement that stays
+        cached on this physical connection across checkouts.
+        """
+        entry = self._entry
+        if entry is None:
+            raise AttributeError("Connection already returned to pool")
+        if entry.statements is None:
+            entry.statements = StatementCache(entry.raw)
+        return InstrumentedCursor(CachedStatement(entry.statements, sql))
+
+    @property
+    def checked_out(self):
+        """False once close() has handed the connection back to the pool."""
+        return self.__dict__.get("_entry") is not None
+
+    def while_checked_out(self, fn):
+        """
+        Call fn() only if this handle still holds its connection, and keep
+        close() from handing it back to the pool until fn() returns. For acting
+        on the connection from another thread (KILL QUERY of its connection_id)
+        without hitting the next request that checks it out.
+        Returns False if the connection was already returned.
+        """
+        with self._owner:
+            if self.__dict__.get("_entry") is None:
+                return False
+            fn()
+            return True
+
+    def invalidate(self):
+        """Mark the connection as unusable; it is closed instead of reused on close()."""
+        if self._entry is not None:
+            self._entry.invalid = True
+
+    def close(self):
+        with self._owner:
+            entry, self._entry = self._entry, None
+        if entry is not None:
+            self._pool.release(entry)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ConnectionPool:
+    """
+    Bounded, thread-safe connection pool.
+
+    - pool_size: connections kept open while idle
+    - max_overflow: extra connections allowed under load (closed on release)
+    - timeout: seconds acquire() waits for a free connection
+    - max_lifetime: seconds before a connection is recycled (None = never)
+    """
+
+    def __init__(self, factory, pool_size=5, max_overflow=5, timeout=10.0, max_lifetime=1800.0):
+        self._factory = factory
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+
+        self._idle = deque()
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Metrics
+        self._checkouts = 0
+        self._timeouts = 0
+        self._recycled = 0
+        self._failed_checks = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # ------------------------------------------
+    # Checkout / return
+    # ------------------------------------------
+
+    def acquire(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        stale = []   # closed after the lock is released: close() can block on the network
+        try:
+            with self._cond:
+                while True:
+                    entry = self._take_idle(stale)
+                    if entry is not None:
+                        break
+                    if self._in_use + len(self._idle) < self.pool_size + self.max_overflow:
+                        # Reserve the slot before leaving the lock to open a new connection
+                        self._in_use += 1
+                        entry = None
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._timeouts += 1
+                        raise PoolTimeoutError(
+                            f"No connection available after {self.timeout:.1f}s "
+                            f"(in use: {self._in_use}, max: {self.pool_size + self.max_overflow})"
+                        )
+                    self._cond.wait(remaining)
+        finally:
+            for old in stale:
+                self._discard(old)
+
+        if entry is None:
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+
+        waited = time.monotonic() - start
+        with self._cond:
+            self._checkouts += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+        return PooledConnection(self, entry)
+
+    def release(self, entry):
+        raw = entry.raw
+        healthy = not entry.invalid
+        try:
+            # Never hand a half-finished transaction to the next caller
+            if healthy and raw.is_connected():
+                raw.rollback()
+            else:
+                healthy = False
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            keep = (
+                healthy
+                and not entry.overflow
+                and not self._expired(entry)
+                and len(self._idle) < self.pool_size
+            )
+            if keep:
+                self._idle.append(entry)
+            self._cond.notify()
+
+        if not keep:
+            self._discard(entry)
+
+    @contextmanager
+    def connection(self):
+        """with pool.connection() as conn: ... (returned to the pool on exit)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    # ------------------------------------------
+    # Internals
+    # ------------------------------------------
+
+    def _take_idle(self, stale):
+        """
+        Pop idle connections until one passes the health check. Caller holds the
+        lock; expired and broken ones are appended to `stale` for the caller to
+        close once it has released it.
+        """
+        while self._idle:
+            entry = self._idle.pop()
+            if self._expired(entry):
+                self._recycled += 1
+                stale.append(entry)
+                continue
+            if not self._is_healthy(entry):
+                self._failed_checks += 1
+                stale.append(entry)
+                continue
+            self._in_use += 1
+            return entry
+        return None
+
+    def _open(self):
+        raw = self._factory()
+        if raw is None:
+            raise ConnectionError("Connection factory returned no connection")
+        entry = _PoolEntry(raw)
+        with self._cond:
+            entry.overflow = self._in_use > self.pool_size
+        return entry
+
+    def _expired(self, entry):
+        if self.max_lifetime is None:
+            return False
+        return time.monotonic() - entry.created_at >= self.max_lifetime
+
+    @staticmethod
+    def _is_healthy(entry):
+        try:
+            return bool(entry.raw.is_connected())
+        except Exception:
+            return False
+
+    @staticmethod
+    def _discard(entry):
+        try:
+            entry.raw.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------
+    # Maintenance / metrics
+    # ------------------------------------------
+
+    def close_all(self):
+        """Close idle connections. Checked-out connections are closed when released."""
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for entry in idle:
+            self._discard(entry)
+
+    def stats(self):
+        with self._cond:
+            checkouts = self._checkouts
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": checkouts,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "failed_health_checks": self._failed_checks,
+                "avg_wait_ms": (self._total_wait / checkouts * 1000) if checkouts else 0.0,
+                "max_wait_ms": self._max_wait * 1000,
+            }
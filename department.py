@@ -0,0 +1,22 @@
+# Department.py
+
+from columnar import ColumnarTable, IntColumn, StrColumn
+
+class Department:
+    __slots__ = ("department_id", "department_name")
+
+    def __init__(self, department_id, department_name):
+        self.department_id = department_id
+        self.department_name = department_name
+
+    def __repr__(self):
+        return f"Department({self.department_id}, {self.department_name})"
+
+
+class DepartmentTable(ColumnarTable):
+    """Columnar list of departments returned by DepartmentService.get_all_departments()."""
+    row_type = Department
+    schema = (
+        ("department_id", IntColumn),
+        ("department_name", StrColumn),
+    )
\ No newline at end of file
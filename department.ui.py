@@ -10,7 +10,8 @@ elif page == "Departments":
                 st.error("Name required")
             else:
                 sql = "INSERT INTO Departments (DepartmentName) VALUES (%s)"
-                ok, err = db_execute(sql, (name,))
+                ok, err = db_execute(sql, (name,), events=lambda cursor: [
+                    changefeed.DepartmentCreated({"DepartmentID": cursor.lastrowid}, {"DepartmentName": name})])
                 st.success("Created") if ok else st.error(err)
 
     df = qsvc.get_departments()
@@ -20,16 +21,25 @@ elif page == "Departments":
     if not df.empty:
         idcol = safe_id_col(df)
         sel = st.selectbox("Select DepartmentID to Edit/Delete", df[idcol].tolist())
-        row = df[df[idcol] == sel].iloc[0]
+        row = row_index(df, idcol, token=("Departments", get_cache().version("Departments"))).row(sel)
 
         with st.form("edit_dep"):
             new_name = st.text_input("Name", value=row["DepartmentName"])
             if st.form_submit_button("Save"):
                 sql = "UPDATE Departments SET DepartmentName=%s WHERE DepartmentID=%s"
-                ok, err = db_execute(sql, (new_name, sel))
+                ok, err = db_execute(sql, (new_name, sel), events=lambda cursor: [
+                    changefeed.DepartmentUpdated({"DepartmentID": int(sel)}, {"DepartmentName": new_name})])
                 st.success("Saved") if ok else st.error(err)
 
+        # Employees still in the department can be moved out in the same transaction
+        others = df[df[idcol] != sel]
+        move_map = fk_map(others, "DepartmentName", idcol)
+        move_to = st.selectbox("Move its employees to", ["(keep - delete fails if any)"] + list(move_map))
+
         if st.button("Delete department"):
-            sql = "DELETE FROM Departments WHERE DepartmentID=%s"
-            ok, err = db_execute(sql, (sel,))
+            uow = UnitOfWork()
+            if move_to in move_map:
+                uow.update("Employees", {"DepartmentID": move_map[move_to]}, {"DepartmentID": sel})
+            uow.delete("Departments", {"DepartmentID": sel})
+            ok, err = uow.flush()
             st.success("Deleted") if ok else st.error(err)
\ No newline at end of file
@@ -1,26 +1,32 @@
 # department_service.py
 
 from connection import get_db_connection
-from department import Department
+from department import Department, DepartmentTable
+from query_cache import invalidate
+import changefeed
+from batch import DEFAULT_CHUNK_SIZE, execute_batch, execute_keyed_batch, summarize
 from mysql.connector import Error
 
 class DepartmentService:
-    
+    SELECT_ALL_SQL = "SELECT DepartmentID, DepartmentName FROM Departments"
+    INSERT_SQL = "INSERT INTO Departments (DepartmentName) VALUES (%s)"
+    UPDATE_SQL = "UPDATE Departments SET DepartmentName=%s WHERE DepartmentID=%s"
+    DELETE_SQL = "DELETE FROM Departments WHERE DepartmentID = %s"
+
     def get_all_departments(self):
         """
         [R]ead: Retrieves all departments.
         """
-        conn = get_db_connection()
-        departments = []
+        conn = get_db_connection(read_only=True)
+        departments = DepartmentTable()
         if conn is None: return departments
 
-        query = "SELECT DepartmentID, DepartmentName FROM Departments"
+        query = self.SELECT_ALL_SQL
         cursor = conn.cursor()
         
         try:
             cursor.execute(query)
-            for row in cursor.fetchall():
-                departments.append(Department(row[0], row[1]))
+            departments.extend_from_cursor(cursor)
         except Error as e:
             print(f"Error fetching departments: {e}")
         finally:
@@ -35,21 +41,21 @@ class DepartmentService:
         conn = get_db_connection()
         if conn is None: return False
 
-        query = "INSERT INTO Departments (DepartmentName) VALUES (%s)"
-        cursor = conn.cursor()
+        query = self.INSERT_SQL
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, (dept_name,))
+            events = changefeed.record(conn, changefeed.DepartmentCreated(
+                {"DepartmentID": cursor.lastrowid}, {"DepartmentName": dept_name}))
             conn.commit()
+            invalidate("Departments")
+            changefeed.publish(events)
             print(f"✅ Department '{dept_name}' created.")
             return True
         except Error as e:
             conn.rollback()
-            # Unique constraint violation (department name already exists)
-            if e.errno == 1062:
-                print(f"❌ Error: Department '{dept_name}' already exists.")
-            else:
-                print(f"❌ Error creating department: {e}")
+            print(f"❌ {self._describe_error(e, dept_name)}")
             return False
         finally:
             cursor.close()
@@ -64,12 +70,17 @@ class DepartmentService:
         conn = get_db_connection()
         if conn is None: return False
         
-        query = "DELETE FROM Departments WHERE DepartmentID = %s"
-        cursor = conn.cursor()
+        query = self.DELETE_SQL
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, (dept_id,))
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.DepartmentDeleted({"DepartmentID": dept_id}))
             conn.commit()
+            invalidate("Departments")
+            changefeed.publish(events)
             if cursor.rowcount > 0:
                 print(f"✅ Department ID {dept_id} deleted.")
             return cursor.rowcount > 0
@@ -82,4 +93,55 @@ class DepartmentService:
             return False
         finally:
             cursor.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Bulk operations (one transaction, chunked)
+    # -------------------------------------------------------------
+
+    @staticmethod
+    def _describe_error(e, dept_name):
+        if e.errno == 1062:
+            return f"Error: Department '{dept_name}' already exists."
+        if e.errno == 1451:
+            return "Error 1451: Employees are still assigned to this department."
+        return str(e)
+
+    def create_many(self, dept_names, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [C]reate (bulk): Inserts an iterable of department names with multi-row INSERTs
+        inside one transaction.
+        """
+        query = self.INSERT_SQL
+        results = execute_batch(
+            query, dept_names, lambda name: (name,),
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda name: changefeed.DepartmentCreated(data={"DepartmentName": name}),
+        )
+        return summarize(results, "departments created")
+
+    def update_many(self, departments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [U]pdate (bulk): Renames Department objects matched on department_id.
+        """
+        results = execute_keyed_batch(
+            "Departments", departments,
+            lambda d: {"DepartmentID": d.department_id}, lambda d: {"DepartmentName": d.department_name},
+            chunk_size=chunk_size,
+            describe_error=lambda e, d: self._describe_error(e, d.department_name),
+            events=lambda d: changefeed.DepartmentUpdated(
+                {"DepartmentID": d.department_id}, {"DepartmentName": d.department_name}),
+        )
+        return summarize(results, "departments updated")
+
+    def delete_many(self, dept_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        [D]elete (bulk): Deletes departments by ID. Departments that still have
+        employees fail individually (error 1451) without aborting the batch.
+        """
+        results = execute_keyed_batch(
+            "Departments", dept_ids, lambda dept_id: {"DepartmentID": dept_id},
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda dept_id: changefeed.DepartmentDeleted({"DepartmentID": dept_id}),
+        )
+        return summarize(results, "departments deleted")
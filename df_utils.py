@@ -0,0 +1,131 @@
+# df_utils.py
+#
+# Column-wise helpers for the DataFrames the pages build select boxes from.
+# They replace per-row Python loops (iterrows, apply(axis=1), and a full
+# key-column comparison to find the selected row) that ran on every rerun.
+#
+#   dep_map = fk_map(deps, "DepartmentName", "DepartmentID")
+#   df["pair"] = label_column(df, "{EmployeeID} — {EmployeeName}")
+#   row = row_index(df, "EmployeeID").row(sel)
+#   row = row_index(deps, "DepartmentID", token=("Departments", version)).row(dep_id)
+
+import string
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+INDEX_CACHE_SIZE = 32   # token-keyed indexes kept between reruns
+
+_formatter = string.Formatter()
+
+
+def fk_map(df, label_col, key_col):
+    """{label: key} for a select box, built by zipping the two columns."""
+    if df.empty:
+        return {}
+    return dict(zip(df[label_col].tolist(), df[key_col].tolist()))
+
+
+def label_column(df, template):
+    """
+    A string Series with `template` ("{ColA} — Project {ColB}") filled in for
+    every row. Each field is converted and concatenated a whole column at a
+    time, so there is no Python call per row. Format specs are not supported.
+    """
+    out = pd.Series("", index=df.index, dtype=object)
+    for literal, field, spec, conversion in _formatter.parse(template):
+        if literal:
+            out = out + literal
+        if field is None:
+            continue
+        if spec or conversion:
+            raise ValueError(f"label_column does not support format specs: {{{field}}}")
+        out = out + _as_text(df[field])
+    return out
+
+
+def _as_text(column):
+    # str(value) for every cell, as an f-string would; astype(str) keeps
+    # missing values missing, so those few are converted one by one.
+    text = column.astype(str).astype(object)
+    missing = column.isna()
+    if missing.any():
+        text[missing] = [str(value) for value in column[missing].tolist()]
+    return text
+
+
+def _key_columns(key_cols):
+    return (key_cols,) if isinstance(key_cols, str) else tuple(key_cols)
+
+
+def _keys(df, key_cols):
+    if len(key_cols) == 1:
+        return df[key_cols[0]].tolist()
+    return list(zip(*(df[col].tolist() for col in key_cols)))
+
+
+class RowIndex:
+    """
+    Key -> row lookup for one DataFrame: one dict probe instead of comparing
+    the whole key column. Keys are scalars for a single key column and tuples
+    for several; the first row wins when a key repeats.
+    """
+
+    def __init__(self, df, key_cols, positions=None):
+        self.df = df
+        self.key_cols = _key_columns(key_cols)
+        if positions is None:
+            keys = _keys(df, self.key_cols)
+            positions = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        self._positions = positions
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, key):
+        return key in self._positions
+
+    def position(self, key):
+        try:
+            return self._positions.get(key)
+        except TypeError:   # unhashable
+            return None
+
+    def row(self, key):
+        """The row Series for `key`, or None."""
+        pos = self.position(key)
+        return None if pos is None else self.df.iloc[pos]
+
+
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def row_index(df, key_cols, token=None):
+    """
+    RowIndex for `df`. With a `token` identifying the data - e.g. the source
+    table and its query cache version - the positions built on an earlier
+    rerun are reused, so a repeat lookup costs one dict probe instead of an
+    O(n) scan. The token must change whenever the rows can.
+    """
+    key_cols = _key_columns(key_cols)
+    if token is None or df.empty:
+        return RowIndex(df, key_cols)
+    cache_key = (token, key_cols, len(df))
+    with _index_lock:
+        positions = _index_cache.get(cache_key)
+        if positions is not None:
+            _index_cache.move_to_end(cache_key)
+            return RowIndex(df, key_cols, positions)
+    index = RowIndex(df, key_cols)
+    with _index_lock:
+        _index_cache[cache_key] = index._positions
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def clear_index_cache():
+    with _index_lock:
+        _index_cache.clear()
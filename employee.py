@@ -1,6 +1,10 @@
 # employee.py
 
+from columnar import ColumnarTable, DateColumn, IntColumn, StrColumn
+
 class Employee:
+    __slots__ = ("employee_id", "name", "date_of_birth", "department_id")
+
     def __init__(self, employee_id, name, date_of_birth, department_id):
         self.employee_id = employee_id
         self.name = name
@@ -8,4 +12,15 @@ class Employee:
         self.department_id = department_id
 
     def __repr__(self):
-        return f"Employee({self.employee_id}, {self.name})"
\ No newline at end of file
+        return f"Employee({self.employee_id}, {self.name})"
+
+
+class EmployeeTable(ColumnarTable):
+    """Columnar list of employees returned by EmployeeService.get_all_employees()."""
+    row_type = Employee
+    schema = (
+        ("employee_id", IntColumn),
+        ("name", StrColumn),
+        ("date_of_birth", DateColumn),
+        ("department_id", IntColumn),
+    )
\ No newline at end of file
@@ -4,4 +4,12 @@ DB_HOST="localhost"
 DB_PORT=3306
 DB_USER="root"
 DB_PASS="quynh123"
-DB_NAME="employee_manager_db"
\ No newline at end of file
+DB_NAME="employee_manager_db"
+
+# SQLite (DB_TYPE="sqlite"): database file, empty = in-memory
+DB_PATH=""
+
+# Read replicas: comma-separated host[:port] (mysql) or database files (sqlite);
+# empty = every read goes to the primary. DB_READ_STRATEGY: round_robin | least_latency
+DB_REPLICAS=""
+DB_READ_STRATEGY="round_robin"
\ No newline at end of file
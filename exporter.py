@@ -0,0 +1,98 @@
+# exporter.py
+
+import gzip
+import os
+import tempfile
+import time
+import uuid
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "employee_manager_exports")
+MAX_EXPORT_AGE = 3600  # seconds before old export files are removed
+
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "csv.gz": ("application/gzip", ".csv.gz"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+}
+
+
+def write_chunks(chunks, path, fmt="csv.gz", progress=None):
+    """
+    Write an iterable of DataFrame chunks (e.g. queries.stream_query / stream=True)
+    to `path` as CSV, gzip-compressed CSV or Parquet, one chunk at a time.
+
+    progress(rows_written) is called after every chunk.
+    Returns the number of rows written.
+    """
+    if fmt == "parquet":
+        return _write_parquet(chunks, path, progress)
+
+    opener = gzip.open if fmt == "csv.gz" else open
+    rows = 0
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=(rows == 0))
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    return rows
+
+
+def _write_parquet(chunks, path, progress):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                # A column that is all NULL in the first chunk would be typed "null"
+                schema = pa.schema([
+                    pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                    for f in table.schema
+                ])
+                writer = pq.ParquetWriter(path, schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_to_file(chunks, filename, fmt="csv.gz", progress=None):
+    """
+    Stream `chunks` into a new file under EXPORT_DIR.
+    Returns (path, download_name, mime, rows).
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    cleanup_exports()
+
+    mime, ext = FORMATS[fmt]
+    base = os.path.splitext(filename)[0]
+    path = os.path.join(EXPORT_DIR, f"{base}-{uuid.uuid4().hex}{ext}")
+    try:
+        rows = write_chunks(chunks, path, fmt, progress)
+    except Exception:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return path, base + ext, mime, rows
+
+
+def cleanup_exports(max_age=MAX_EXPORT_AGE):
+    """Remove export files older than max_age seconds."""
+    if not os.path.isdir(EXPORT_DIR):
+        return
+    cutoff = time.time() - max_age
+    for name in os.listdir(EXPORT_DIR):
+        path = os.path.join(EXPORT_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,167 @@
+# index_advisor.py
+#
+# Runs EXPLAIN / EXPLAIN ANALYZE on every query function in queries.py and
+# reports full table scans, filesorts and temporary tables.
+#
+#   python index_advisor.py                        # print the report
+#   python index_advisor.py --write-baseline       # accept current plans
+#   python index_advisor.py --baseline advisor_baseline.json
+#       -> exit code 1 if a query gained a scan/filesort not in the baseline
+
+import argparse
+import json
+import sys
+
+from connection import get_db_connection
+import queries
+
+# Function name -> kwargs used to produce a representative statement
+QUERY_FUNCTIONS = {
+    "get_employees": {},
+    "get_departments": {},
+    "get_projects": {},
+    "get_assignments": {},
+    "get_employees_page": {"after": (100,), "department_id": 1},
+    "get_projects_page": {"name_prefix": "Cloud"},
+    "get_assignments_page": {"after": (10, 101), "project_id": 101},
+    "search_employees": {"name": "Ng", "department_ids": (1,), "roles": ("Developer",)},
+    "count_all_tables": {},
+    "salary_summary": {},
+    "salary_histogram": {"bins": 10},
+    "role_distribution": {},
+    "top_employees_by_avg_salary": {"limit": 10},
+    "inner_join_per_project": {},
+    "left_join_all_employees": {},
+    "multi_table_join_with_manager": {},
+    "above_global_average": {},
+}
+
+DEFAULT_BASELINE = "advisor_baseline.json"
+
+
+def explain(conn, sql, params):
+    """Return (plan rows, EXPLAIN ANALYZE text or None)."""
+    cursor = conn.cursor(dictionary=True)
+    try:
+        cursor.execute("EXPLAIN " + sql, params)
+        plan = cursor.fetchall()
+    finally:
+        cursor.close()
+
+    analyze = None
+    cursor = conn.cursor()
+    try:
+        cursor.execute("EXPLAIN ANALYZE " + sql, params)
+        analyze = "\n".join(row[0] for row in cursor.fetchall())
+    except Exception as e:
+        # EXPLAIN ANALYZE needs MySQL 8.0.18+
+        analyze = f"(EXPLAIN ANALYZE unavailable: {e})"
+    finally:
+        cursor.close()
+    return plan, analyze
+
+
+def find_issues(plan):
+    """Flag full scans, filesorts and temporary tables on base tables."""
+    issues = []
+    for row in plan:
+        table = row.get("table") or ""
+        if table.startswith("<"):
+            # derived tables / CTE materialisations are scanned by design
+            continue
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            issues.append(f"full scan on {table}")
+        if "Using filesort" in extra:
+            issues.append(f"filesort on {table}")
+        if "Using temporary" in extra:
+            issues.append(f"temporary table on {table}")
+    return sorted(set(issues))
+
+
+def run(selected=None):
+    conn = get_db_connection()
+    if conn is None:
+        print("❌ Cannot connect to DB")
+        return None
+
+    report = {}
+    try:
+        for name, kwargs in QUERY_FUNCTIONS.items():
+            if selected and name not in selected:
+                continue
+            sql, params = queries.capture_sql(getattr(queries, name), **kwargs)
+            plan, analyze = explain(conn, sql, params)
+            report[name] = {
+                "issues": find_issues(plan),
+                "plan": [
+                    {k: row.get(k) for k in ("table", "type", "key", "rows", "filtered", "Extra")}
+                    for row in plan
+                ],
+                "analyze": analyze,
+            }
+    finally:
+        conn.close()
+    return report
+
+
+def print_report(report, verbose=False):
+    for name, entry in report.items():
+        mark = "⚠️ " if entry["issues"] else "✅"
+        print(f"{mark} {name}")
+        for issue in entry["issues"]:
+            print(f"     - {issue}")
+        if verbose:
+            for row in entry["plan"]:
+                print(f"       {row}")
+            if entry["analyze"]:
+                print("       " + entry["analyze"].replace("\n", "\n       "))
+
+
+def regressions(report, baseline):
+    """Issues present now but not in the baseline, per query."""
+    new = {}
+    for name, entry in report.items():
+        known = set(baseline.get(name, []))
+        added = [issue for issue in entry["issues"] if issue not in known]
+        if added:
+            new[name] = added
+    return new
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="EXPLAIN every queries.py function and flag scans/filesorts")
+    parser.add_argument("queries", nargs="*", help="only these query functions")
+    parser.add_argument("--baseline", help="fail if issues appear that are not in this JSON file")
+    parser.add_argument("--write-baseline", nargs="?", const=DEFAULT_BASELINE, help="save current issues as baseline")
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("-v", "--verbose", action="store_true", help="show plans and EXPLAIN ANALYZE output")
+    args = parser.parse_args(argv)
+
+    report = run(args.queries)
+    if report is None:
+        return 2
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        print_report(report, args.verbose)
+
+    if args.write_baseline:
+        with open(args.write_baseline, "w") as f:
+            json.dump({name: entry["issues"] for name, entry in report.items()}, f, indent=2)
+        print(f"Baseline written to {args.write_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f))
+        if found:
+            print("❌ Plan regressions:")
+            for name, issues in found.items():
+                print(f"   {name}: {', '.join(issues)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
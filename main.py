@@ -1,7 +1,22 @@
+import os
+import uuid
 import streamlit as st
 import pandas as pd
-from app.db.connection import get_db_connection
-import services.queries as qsvc
+import connection
+from connection import get_db_connection, pool_stats
+import queries as qsvc
+from query_cache import get_cache, invalidate_for_sql
+from exporter import FORMATS, export_to_file
+from async_db import async_available, gather_pages
+import async_queries as aq
+from parallel import Task, fetch_parallel
+from df_utils import fk_map, label_column, row_index
+from unit_of_work import UnitOfWork
+import analytics
+import changefeed
+import replicas
+import search_index
+import profiling
 import matplotlib.pyplot as plt
 
 # ============================================================
@@ -180,9 +195,15 @@ custom_css = """
 st.markdown(custom_css, unsafe_allow_html=True)
 st.title("Employee Information Manager")
 
-pages = ["Employees", "Departments", "Projects", "Assignments", "Queries", "Dashboard", "Settings"]
+pages = ["Employees", "Departments", "Projects", "Assignments", "Search", "Queries", "Dashboard", "Settings"]
 page = st.sidebar.radio("Go to", pages)
 
+# One DB session per browser tab: after it writes, its reads skip the replicas for a while
+replicas.set_session(st.session_state.setdefault("db_session", uuid.uuid4().hex))
+
+# Pick up changes committed by other processes (caches, search index, snapshot)
+changefeed.start()
+
 
 # ============================================================
 # HELPER FUNCTIONS
@@ -200,8 +221,41 @@ def export_df_csv(df, filename="export.csv"):
     st.download_button(label="Export CSV", data=csv, file_name=filename, mime='text/csv')
 
 
-def db_execute(sql, params=None):
-    """Execute SQL safely using MySQL."""
+def export_stream(stream_fn, filename, key):
+    """
+    Streamed export for large query results: rows go from the DB cursor into a
+    CSV / gzip / Parquet file chunk by chunk, then the file is offered for download.
+    """
+    cols = st.columns([2, 1])
+    fmt = cols[0].selectbox("Export format", list(FORMATS), index=1, key=f"{key}_fmt")
+    if cols[1].button("Export", key=f"{key}_run"):
+        status = st.empty()
+        try:
+            path, name, mime, rows = export_to_file(
+                stream_fn(), filename, fmt,
+                progress=lambda n: status.write(f"Exporting… {n:,} rows written"),
+            )
+            status.write(f"Exported {rows:,} rows")
+            st.session_state[key] = (path, name, mime)
+        except Exception as e:
+            status.error(f"❌ Export failed: {e}")
+
+    exported = st.session_state.get(key)
+    if exported and os.path.exists(exported[0]):
+        path, name, mime = exported
+        with open(path, "rb") as f:
+            st.download_button(f"Download {name}", data=f, file_name=name, mime=mime, key=f"{key}_dl")
+
+
+@profiling.data_helper
+def db_execute(sql, params=None, events=None):
+    """
+    Execute SQL safely using MySQL.
+
+    events(cursor) -> [ChangeEvent] describes the changed row(s), so the name
+    index and the analytics snapshot update in place; called only if a row
+    was affected. Without it the write is reported for the whole table.
+    """
     conn = get_db_connection()
     if not conn:
         return False, "Cannot connect to MySQL"
@@ -209,18 +263,100 @@ def db_execute(sql, params=None):
     try:
         cursor = conn.cursor()
         cursor.execute(sql, params or ())
+        if events is None:
+            changes = changefeed.events_for_sql(sql)
+        else:
+            changes = events(cursor) if cursor.rowcount > 0 else []
+        events = changefeed.record(conn, *changes)
         conn.commit()
         cursor.close()
-        conn.close()
+        invalidate_for_sql(sql)
+        changefeed.publish(events)
         return True, None
     except Exception as e:
         return False, str(e)
+    finally:
+        # Pooled connection: always hand it back, even on error
+        conn.close()
 
 
-def get_fk_map(df, label_col, key_col):
-    if df.empty:
-        return {}
-    return {row[label_col]: row[key_col] for _, row in df.iterrows()}
+def name_picker(label, key, search, current_id=None, current_name=None, lookup_name=None):
+    """
+    Search-as-you-type selector over an in-process name index (search_index.py):
+    prefix matches on any word of the name first, then typo-tolerant ones. Only
+    the best TYPEAHEAD_LIMIT names are sent to the browser and no query runs per
+    keystroke, so the widget costs the same whatever the table size.
+    Returns the chosen ID or None.
+    """
+    text = st.text_input(f"Search {label.lower()} by name", key=f"{key}_q")
+    matches = search(text, search_index.TYPEAHEAD_LIMIT) if text.strip() else []
+
+    options = {}
+    if current_id is not None and not pd.isna(current_id):
+        current_id = int(current_id)
+        if not current_name and lookup_name is not None:
+            current_name = lookup_name(current_id)
+        options[current_id] = current_name or f"#{current_id}"
+    options.update((int(match_id), name) for match_id, name, _ in matches)
+
+    ids = [None] + list(options)
+    choice = st.selectbox(
+        label, ids,
+        index=ids.index(current_id) if current_id in options else 0,
+        format_func=lambda i: "" if i is None else f"{options[i]} (#{i})",
+        key=f"{key}_sel",
+    )
+    if len(matches) >= search_index.TYPEAHEAD_LIMIT:
+        st.caption("Showing the best matches — type more of the name to narrow the list")
+    return choice
+
+
+def _employee_name(employee_id):
+    found = qsvc.get_employee_name(employee_id)
+    return found["Name"].iloc[0] if not found.empty else ""
+
+
+def employee_picker(label, key, current_id=None, current_name=None):
+    """Employee (or project manager) selector; returns an EmployeeID or None."""
+    return name_picker(label, key, search_index.search_employees, current_id, current_name, _employee_name)
+
+
+def project_picker(label, key, current_id=None, current_name=None):
+    """Project selector; returns a ProjectID or None."""
+    return name_picker(label, key, search_index.search_projects, current_id, current_name)
+
+
+def paged_view(key, fetch_page, key_columns, **filters):
+    """
+    Keyset pagination controls: fetch one page via `fetch_page` and render Prev/Next.
+    Cursors live in st.session_state[key]; changing a filter goes back to page 1.
+    """
+    state = st.session_state.setdefault(key, {"after": None, "before": None, "page": 1, "filters": None})
+    if state["filters"] != filters:
+        state.update(after=None, before=None, page=1, filters=filters)
+
+    nav = st.columns([1, 1, 2, 4])
+    page_size = nav[2].selectbox("Rows per page", [25, 50, 100, 200], index=1, key=f"{key}_size")
+
+    df = fetch_page(after=state["after"], before=state["before"], limit=page_size, **filters)
+    first, last = qsvc.page_bounds(df, key_columns)
+
+    if nav[0].button("◀ Prev", key=f"{key}_prev", disabled=state["page"] <= 1):
+        # Page 2 -> 1 goes back to the start so page 1 is always full
+        before = first if state["page"] > 2 else None
+        state.update(after=None, before=before, page=state["page"] - 1)
+        st.rerun()
+    if nav[1].button("Next ▶", key=f"{key}_next", disabled=len(df) < page_size):
+        state.update(after=last, before=None, page=state["page"] + 1)
+        st.rerun()
+    nav[3].caption(f"Page {state['page']} · {len(df)} rows")
+    return df
+
+
+def export_on_demand(loader, filename, key):
+    """Full CSV export for paged tables; the whole table is only loaded when requested."""
+    if st.button("Prepare full CSV export", key=key):
+        export_df_csv(loader(), filename)
 
 
 # ============================================================
@@ -238,7 +374,7 @@ if page == "Employees":
 
         deps = qsvc.get_departments()
         dep_idcol = safe_id_col(deps) if not deps.empty else "DepartmentID"
-        dep_map = get_fk_map(deps, "DepartmentName", dep_idcol)
+        dep_map = fk_map(deps, "DepartmentName", dep_idcol)
         dep_choice = st.selectbox("Department", [""] + list(dep_map.keys()))
 
         if st.form_submit_button("Create"):
@@ -247,20 +383,29 @@ if page == "Employees":
             else:
                 dep_id = dep_map.get(dep_choice)
                 sql = "INSERT INTO Employees (EmployeeID, Name, DateOfBirth, DepartmentID) VALUES (%s, %s, %s, %s)"
-                ok, err = db_execute(sql, (eid, name, dob.isoformat(), dep_id))
+                values = {"Name": name, "DateOfBirth": dob.isoformat(), "DepartmentID": dep_id}
+                ok, err = db_execute(sql, (eid, name, dob.isoformat(), dep_id), events=lambda cursor: [
+                    changefeed.EmployeeCreated({"EmployeeID": int(eid)}, values)])
                 st.success("Employee created") if ok else st.error(err)
 
     # ---------------------- VIEW ----------------------
     st.subheader("All Employees")
-    df = qsvc.get_employees()
+    fcols = st.columns(2)
+    name_filter = fcols[0].text_input("Name starts with", key="emp_name_filter")
+    dep_filter = fcols[1].selectbox("Filter by department", [""] + list(dep_map.keys()), key="emp_dep_filter")
+    df = paged_view(
+        "employees_page", qsvc.get_employees_page, ["EmployeeID"],
+        name_prefix=name_filter or None,
+        department_id=int(dep_map[dep_filter]) if dep_filter else None,
+    )
     st.dataframe(df)
-    export_df_csv(df, "employees.csv")
+    export_on_demand(qsvc.get_employees, "employees.csv", key="employees_export")
 
     # ---------------------- EDIT + DELETE ----------------------
     if not df.empty:
         idcol = safe_id_col(df)
         sel = st.selectbox("Select employee to Edit/Delete", df[idcol].tolist())
-        row = df[df[idcol] == sel].iloc[0]
+        row = row_index(df, idcol).row(sel)
 
         with st.form("edit_employee"):
             new_name = st.text_input("Name", value=row["Name"])
@@ -268,13 +413,14 @@ if page == "Employees":
 
             dep_df = qsvc.get_departments()
             dep_idcol = safe_id_col(dep_df)
-            dep_map = get_fk_map(dep_df, "DepartmentName", dep_idcol)
+            dep_map = fk_map(dep_df, "DepartmentName", dep_idcol)
 
             current_dep_name = ""
             if "DepartmentID" in row:
-                match = dep_df[dep_df[dep_idcol] == row["DepartmentID"]]
-                if not match.empty:
-                    current_dep_name = match.iloc[0]["DepartmentName"]
+                deps_version = ("Departments", get_cache().version("Departments"))
+                match = row_index(dep_df, dep_idcol, token=deps_version).row(row["DepartmentID"])
+                if match is not None:
+                    current_dep_name = match["DepartmentName"]
 
             new_dep = st.selectbox(
                 "Department",
@@ -285,12 +431,15 @@ if page == "Employees":
             if st.form_submit_button("Save"):
                 depid = dep_map.get(new_dep)
                 sql = "UPDATE Employees SET Name=%s, DateOfBirth=%s, DepartmentID=%s WHERE EmployeeID=%s"
-                ok, err = db_execute(sql, (new_name, new_dob.isoformat(), depid, sel))
+                values = {"Name": new_name, "DateOfBirth": new_dob.isoformat(), "DepartmentID": depid}
+                ok, err = db_execute(sql, (new_name, new_dob.isoformat(), depid, sel), events=lambda cursor: [
+                    changefeed.EmployeeUpdated({"EmployeeID": int(sel)}, values)])
                 st.success("Updated") if ok else st.error(err)
 
         if st.button("Delete selected employee"):
             sql = "DELETE FROM Employees WHERE EmployeeID=%s"
-            ok, err = db_execute(sql, (sel,))
+            ok, err = db_execute(sql, (sel,), events=lambda cursor: [
+                changefeed.EmployeeDeleted({"EmployeeID": int(sel)})])
             st.success("Deleted") if ok else st.error(err)
 
 
@@ -307,7 +456,8 @@ elif page == "Departments":
                 st.error("Name required")
             else:
                 sql = "INSERT INTO Departments (DepartmentName) VALUES (%s)"
-                ok, err = db_execute(sql, (name,))
+                ok, err = db_execute(sql, (name,), events=lambda cursor: [
+                    changefeed.DepartmentCreated({"DepartmentID": cursor.lastrowid}, {"DepartmentName": name})])
                 st.success("Created") if ok else st.error(err)
 
     df = qsvc.get_departments()
@@ -317,18 +467,27 @@ elif page == "Departments":
     if not df.empty:
         idcol = safe_id_col(df)
         sel = st.selectbox("Select DepartmentID to Edit/Delete", df[idcol].tolist())
-        row = df[df[idcol] == sel].iloc[0]
+        row = row_index(df, idcol, token=("Departments", get_cache().version("Departments"))).row(sel)
 
         with st.form("edit_dep"):
             new_name = st.text_input("Name", value=row["DepartmentName"])
             if st.form_submit_button("Save"):
                 sql = "UPDATE Departments SET DepartmentName=%s WHERE DepartmentID=%s"
-                ok, err = db_execute(sql, (new_name, sel))
+                ok, err = db_execute(sql, (new_name, sel), events=lambda cursor: [
+                    changefeed.DepartmentUpdated({"DepartmentID": int(sel)}, {"DepartmentName": new_name})])
                 st.success("Saved") if ok else st.error(err)
 
+        # Employees still in the department can be moved out in the same transaction
+        others = df[df[idcol] != sel]
+        move_map = fk_map(others, "DepartmentName", idcol)
+        move_to = st.selectbox("Move its employees to", ["(keep - delete fails if any)"] + list(move_map))
+
         if st.button("Delete department"):
-            sql = "DELETE FROM Departments WHERE DepartmentID=%s"
-            ok, err = db_execute(sql, (sel,))
+            uow = UnitOfWork()
+            if move_to in move_map:
+                uow.update("Employees", {"DepartmentID": move_map[move_to]}, {"DepartmentID": sel})
+            uow.delete("Departments", {"DepartmentID": sel})
+            ok, err = uow.flush()
             st.success("Deleted") if ok else st.error(err)
 
 # ============================================================
@@ -337,103 +496,64 @@ elif page == "Departments":
 elif page == "Projects":
     st.header("Projects")
 
-    employees = qsvc.get_employees()
-    emp_idcol = safe_id_col(employees) if not employees.empty else "EmployeeID"
-    emp_map = get_fk_map(employees, "Name", emp_idcol)
-
     # ----------------------- CREATE PROJECT -----------------------
+    # The manager picker sits outside the form so typing refreshes its options
+    mid = employee_picker("Manager", key="create_proj_mgr")
     with st.form("create_project"):
         pname = st.text_input("Project Name")
-        manager = st.selectbox("Manager", [""] + list(emp_map.keys()))
 
         if st.form_submit_button("Create Project"):
             if not pname:
                 st.error("Project name required")
             else:
-                mid = emp_map.get(manager)
-
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    sql = """
-                        INSERT INTO Projects (ProjectName, ManagerEmployeeID)
-                        VALUES (%s, %s)
-                    """
-                    cursor.execute(sql, (pname, mid))
-                    conn.commit()
-                    st.success("Created")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                sql = """
+                    INSERT INTO Projects (ProjectName, ManagerEmployeeID)
+                    VALUES (%s, %s)
+                """
+                ok, err = db_execute(sql, (pname, mid), events=lambda cursor: [changefeed.ProjectCreated(
+                    {"ProjectID": cursor.lastrowid}, {"ProjectName": pname, "ManagerEmployeeID": mid})])
+                st.success("Created") if ok else st.error(f"❌ {err}")
 
     # ----------------------- VIEW PROJECTS -----------------------
-    df = qsvc.get_projects()
+    name_filter = st.text_input("Project name starts with", key="proj_name_filter")
+    df = paged_view(
+        "projects_page", qsvc.get_projects_page, ["ProjectID"],
+        name_prefix=name_filter or None,
+    )
     st.dataframe(df)
-    export_df_csv(df, "projects.csv")
+    export_on_demand(qsvc.get_projects, "projects.csv", key="projects_export")
 
     # ----------------------- EDIT + DELETE -----------------------
     if not df.empty:
         idcol = safe_id_col(df)
         sel = st.selectbox("Select ProjectID to Edit/Delete", df[idcol].tolist())
-        row = df[df[idcol] == sel].iloc[0]
-
-        # Current manager name
-        current_mgr_id = row.get("ManagerEmployeeID")
-        current_mgr_name = ""
-        if current_mgr_id in employees[emp_idcol].values:
-            current_mgr_name = employees[employees[emp_idcol] == current_mgr_id].iloc[0]["Name"]
+        row = row_index(df, idcol).row(sel)
 
         # --------- EDIT FORM ---------
+        # Current manager comes with the page row (ManagerName)
+        new_mid = employee_picker(
+            "Manager", key=f"edit_proj_mgr_{sel}",
+            current_id=row.get("ManagerEmployeeID"), current_name=row.get("ManagerName"),
+        )
         with st.form("edit_proj"):
             new_name = st.text_input("Name", value=row["ProjectName"])
-            new_mgr = st.selectbox(
-                "Manager",
-                [""] + list(emp_map.keys()),
-                index=(list(emp_map.keys()).index(current_mgr_name) if current_mgr_name in emp_map else 0)
-            )
 
             if st.form_submit_button("Save"):
-                mid = emp_map.get(new_mgr)
-
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    sql = """
-                        UPDATE Projects
-                        SET ProjectName=%s, ManagerEmployeeID=%s
-                        WHERE ProjectID=%s
-                    """
-                    cursor.execute(sql, (new_name, mid, sel))
-                    conn.commit()
-                    st.success("Saved")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                sql = """
+                    UPDATE Projects
+                    SET ProjectName=%s, ManagerEmployeeID=%s
+                    WHERE ProjectID=%s
+                """
+                ok, err = db_execute(sql, (new_name, new_mid, sel), events=lambda cursor: [changefeed.ProjectUpdated(
+                    {"ProjectID": int(sel)}, {"ProjectName": new_name, "ManagerEmployeeID": new_mid})])
+                st.success("Saved") if ok else st.error(f"❌ {err}")
 
         # --------- DELETE PROJECT ---------
         if st.button("Delete project"):
-            conn = get_db_connection()
-            try:
-                cursor = conn.cursor()
-                sql = "DELETE FROM Projects WHERE ProjectID=%s"
-                cursor.execute(sql, (sel,))
-                conn.commit()
-                st.success("Deleted")
-
-            except Exception as e:
-                st.error(f"❌ {e}")
-
-            finally:
-                cursor.close()
-                conn.close()
+            sql = "DELETE FROM Projects WHERE ProjectID=%s"
+            ok, err = db_execute(sql, (sel,), events=lambda cursor: [
+                changefeed.ProjectDeleted({"ProjectID": int(sel)})])
+            st.success("Deleted") if ok else st.error(f"❌ {err}")
 
 # ============================================================
 # PAGE: ASSIGNMENTS
@@ -441,66 +561,61 @@ elif page == "Projects":
 elif page == "Assignments":
     st.header("Assignments")
 
-    # Load data safely
-    employees = qsvc.get_employees()
-    projects = qsvc.get_projects()
+    # Load data safely (both at once). Employees are not listed here: the
+    # employee picker searches the name index as the user types.
+    data = fetch_parallel({"projects": qsvc.get_projects, "counts": qsvc.count_all_tables})
+    projects, counts = data["projects"], data["counts"]
+    if data.errors:
+        st.error("Could not load: " + ", ".join(f"{k} ({v})" for k, v in data.errors.items()))
 
-    if employees.empty or projects.empty:
+    if projects.empty or counts.empty or int(counts["Employees"].iloc[0]) == 0:
         st.warning("Employees or Projects table is empty. Please add data first.")
         st.stop()
 
-    emp_idcol = safe_id_col(employees)
     proj_idcol = safe_id_col(projects)
-
-    emp_map = get_fk_map(employees, "Name", emp_idcol)
-    proj_map = get_fk_map(projects, "ProjectName", proj_idcol)
+    proj_map = fk_map(projects, "ProjectName", proj_idcol)
 
     # ----------------------- CREATE ASSIGNMENT -----------------------
+    st.subheader("Create assignment")
+    empid = employee_picker("Employee", key="create_assign_emp")
+    projid = project_picker("Project", key="create_assign_proj")
     with st.form("create_assign"):
-        st.subheader("Create assignment")
-
-        emp_choice = st.selectbox("Employee", [""] + list(emp_map.keys()))
-        proj_choice = st.selectbox("Project", [""] + list(proj_map.keys()))
         role = st.text_input("Role")
         salary = st.number_input("Salary", min_value=0.0)
 
         submit_create = st.form_submit_button("Create Assignment")
 
         if submit_create:
-            if not emp_choice or not proj_choice or not role:
+            if empid is None or projid is None or not role:
                 st.error("Employee, Project and Role are required")
             else:
-                empid = emp_map[emp_choice]
-                projid = proj_map[proj_choice]
-
-                try:
-                    conn = get_db_connection()
-                    cursor = conn.cursor()
-
-                    sql = """
-                        INSERT INTO employee_manager_db.Assignments 
-                        (EmployeeID, ProjectID, Role, Salary)
-                        VALUES (%s, %s, %s, %s)
-                        ON DUPLICATE KEY UPDATE
-                            Role = VALUES(Role),
-                            Salary = VALUES(Salary);
-                    """
-                    cursor.execute(sql, (empid, projid, role, float(salary)))
-                    conn.commit()
-
+                sql = """
+                    INSERT INTO employee_manager_db.Assignments 
+                    (EmployeeID, ProjectID, Role, Salary)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE
+                        Role = VALUES(Role),
+                        Salary = VALUES(Salary);
+                """
+                ok, err = db_execute(sql, (empid, projid, role, float(salary)), events=lambda cursor: [
+                    changefeed.AssignmentUpdated({"EmployeeID": empid, "ProjectID": projid},
+                                                 {"Role": role, "Salary": float(salary)})])
+                if ok:
                     st.success("Assignment created or updated successfully!")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                else:
+                    st.error(f"❌ {err}")
 
     # ----------------------- VIEW ASSIGNMENTS -----------------------
-    df = qsvc.get_assignments()
+    fcols = st.columns(2)
+    proj_filter = fcols[0].selectbox("Filter by project", [""] + list(proj_map.keys()), key="assign_proj_filter")
+    role_filter = fcols[1].text_input("Filter by role", key="assign_role_filter")
+    df = paged_view(
+        "assignments_page", qsvc.get_assignments_page, ["EmployeeID", "ProjectID"],
+        project_id=int(proj_map[proj_filter]) if proj_filter else None,
+        role=role_filter or None,
+    )
     st.dataframe(df)
-    export_df_csv(df, "assignments.csv")
+    export_on_demand(qsvc.get_assignments, "assignments.csv", key="assignments_export")
 
     st.subheader("Edit or Delete Assignment")
 
@@ -515,14 +630,11 @@ elif page == "Assignments":
         st.stop()
 
     # ----------------------- EDIT + DELETE UI -----------------------
-    df["pair"] = df.apply(
-        lambda r: f"{r['EmployeeID']} — {r['EmployeeName']} — Project {r['ProjectID']} — {r['ProjectName']}",
-        axis=1
-    )
+    df["pair"] = label_column(df, "{EmployeeID} — {EmployeeName} — Project {ProjectID} — {ProjectName}")
 
     sel = st.selectbox("Select Assignment", df["pair"].tolist())
 
-    row = df[df["pair"] == sel].iloc[0]
+    row = row_index(df, "pair").row(sel)
     empid = int(row["EmployeeID"])
     projid = int(row["ProjectID"])
 
@@ -534,48 +646,115 @@ elif page == "Assignments":
         submit_edit = st.form_submit_button("Save")
 
         if submit_edit:
-            try:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-
-                sql = """
-                    UPDATE employee_manager_db.Assignments
-                    SET Role=%s, Salary=%s
-                    WHERE EmployeeID=%s AND ProjectID=%s
-                """
-                cursor.execute(sql, (new_role, new_salary, empid, projid))
-                conn.commit()
-
-                st.success("Assignment updated successfully!")
-
-            except Exception as e:
-                st.error(f"❌ {e}")
-
-            finally:
-                cursor.close()
-                conn.close()
-
-    # --------- DELETE ---------
-    if st.button("Delete Assignment"):
-        try:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-
             sql = """
-                DELETE FROM employee_manager_db.Assignments
+                UPDATE employee_manager_db.Assignments
+                SET Role=%s, Salary=%s
                 WHERE EmployeeID=%s AND ProjectID=%s
             """
-            cursor.execute(sql, (empid, projid))
-            conn.commit()
+            ok, err = db_execute(sql, (new_role, new_salary, empid, projid), events=lambda cursor: [
+                changefeed.AssignmentUpdated({"EmployeeID": empid, "ProjectID": projid},
+                                             {"Role": new_role, "Salary": new_salary})])
+            if ok:
+                st.success("Assignment updated successfully!")
+            else:
+                st.error(f"❌ {err}")
 
+    # --------- DELETE ---------
+    if st.button("Delete Assignment"):
+        sql = """
+            DELETE FROM employee_manager_db.Assignments
+            WHERE EmployeeID=%s AND ProjectID=%s
+        """
+        ok, err = db_execute(sql, (empid, projid), events=lambda cursor: [
+            changefeed.AssignmentDeleted({"EmployeeID": empid, "ProjectID": projid})])
+        if ok:
             st.success("Assignment deleted!")
+        else:
+            st.error(f"❌ {err}")
+
+    # --------- BULK EDIT (one transaction) ---------
+    st.subheader("Bulk edit this page")
+    st.caption("Change roles and salaries or tick Delete, then save everything in one transaction.")
+    keys = ["EmployeeID", "ProjectID"]
+    grid = df[keys + ["Role", "Salary"]].reset_index(drop=True).assign(Delete=False)
+    edited = st.data_editor(grid, disabled=keys, hide_index=True, key="assign_bulk_editor")
+
+    if st.button("Save all changes"):
+        removed = edited[edited["Delete"]]
+        changed = edited[~edited["Delete"] & ((edited["Role"] != grid["Role"]) | (edited["Salary"] != grid["Salary"]))]
+        uow = UnitOfWork()
+        for r in changed.itertuples(index=False):
+            uow.update("Assignments", {"Role": r.Role, "Salary": float(r.Salary)},
+                       {"EmployeeID": int(r.EmployeeID), "ProjectID": int(r.ProjectID)})
+        for r in removed.itertuples(index=False):
+            uow.delete("Assignments", {"EmployeeID": int(r.EmployeeID), "ProjectID": int(r.ProjectID)})
+        if not len(uow):
+            st.info("Nothing changed")
+        else:
+            changes = len(uow)
+            ok, err = uow.flush()
+            if ok:
+                st.success(f"Saved {changes} changes in one transaction ({uow.statements} statements)")
+            else:
+                st.error(f"❌ {err}")
 
-        except Exception as e:
-            st.error(f"❌ {e}")
 
-        finally:
-            cursor.close()
-            conn.close()
+# ============================================================
+# PAGE: SEARCH
+# ============================================================
+elif page == "Search":
+    st.header("Global Search")
+
+    SEARCH_KEYS = ["search_name", "search_deps", "search_projs", "search_roles",
+                   "search_mgrs", "search_min", "search_max", "search_sort", "search_desc"]
+    if st.button("Reset filters"):
+        for k in SEARCH_KEYS:
+            st.session_state.pop(k, None)
+        st.rerun()
+
+    # Option lists are small (departments, projects, roles): load them together
+    opts = fetch_parallel({
+        "deps": qsvc.get_departments,
+        "projs": qsvc.get_projects,
+        "roles": qsvc.role_distribution,
+    })
+    dep_map = fk_map(opts["deps"], "DepartmentName", "DepartmentID")
+    proj_map = fk_map(opts["projs"], "ProjectName", "ProjectID")
+    managers = opts["projs"].dropna(subset=["ManagerEmployeeID"]) if not opts["projs"].empty else opts["projs"]
+    mgr_map = fk_map(managers, "ManagerName", "ManagerEmployeeID")
+    roles = opts["roles"]["Role"].tolist() if not opts["roles"].empty else []
+
+    name_q = st.text_input("Employee name starts with", key="search_name")
+    fcols = st.columns(2)
+    deps_sel = fcols[0].multiselect("Department", list(dep_map), key="search_deps")
+    projs_sel = fcols[1].multiselect("Project", list(proj_map), key="search_projs")
+    roles_sel = fcols[0].multiselect("Role", roles, key="search_roles")
+    mgrs_sel = fcols[1].multiselect("Manager", list(mgr_map), key="search_mgrs")
+    min_sal = fcols[0].number_input("Min salary", min_value=0.0, value=0.0, step=500.0, key="search_min")
+    max_sal = fcols[1].number_input("Max salary (0 = no limit)", min_value=0.0, value=0.0, step=500.0, key="search_max")
+    scols = st.columns(3)
+    sort = scols[0].selectbox("Sort by", list(qsvc.SEARCH_SORT_COLUMNS), index=1, key="search_sort")
+    desc = scols[1].checkbox("Descending", key="search_desc")
+    limit = scols[2].selectbox("Max rows", [50, 100, 250, 500, 1000], index=1)
+
+    q = (qsvc.Search()
+         .name(name_q)
+         .department(*(int(dep_map[d]) for d in deps_sel))
+         .project(*(int(proj_map[p]) for p in projs_sel))
+         .role(*roles_sel)
+         .manager(*(int(mgr_map[m]) for m in mgrs_sel))
+         .salary_between(min_sal or None, max_sal or None)
+         .order_by(sort, desc))
+    # One extra row tells whether the result was cut off
+    df = q.limit(limit + 1).run()
+    if len(df) > limit:
+        st.caption(f"Showing the first {limit} matches — refine the filters to see more")
+        df = df.iloc[:limit]
+    else:
+        st.caption(f"{len(df)} matches")
+    st.dataframe(df)
+    if not df.empty:
+        export_df_csv(df, "search_results.csv")
 
 
 # ============================================================
@@ -590,25 +769,37 @@ elif page == "Queries":
                          "Multi-table JOIN (with manager)",
                          "Above global average"])
 
+    # Analysis runs on a columnar snapshot by default, off the primary
+    source = st.radio("Source", ["Analytics snapshot", "Live database"], horizontal=True)
+    live = source == "Live database"
+    if not live:
+        snap = analytics.engine.snapshot()
+        status = analytics.engine.status()
+        note = " (refreshing in the background)" if status["refreshing"] else ""
+        st.caption(f"Snapshot taken {status['age_s']:.0f}s ago — "
+                   f"{status['rows'].get('Assignments', 0):,} assignments{note}")
+        if st.button("Refresh snapshot"):
+            snap = analytics.engine.refresh()
+
     if qtab == "INNER JOIN (employee per project)":
-        df = qsvc.inner_join_per_project()
+        df = qsvc.inner_join_per_project() if live else snap.inner_join_per_project()
         st.dataframe(df)
-        export_df_csv(df, "inner_join.csv")
+        export_stream(lambda: qsvc.inner_join_per_project(stream=True), "inner_join.csv", key="inner_join_export")
 
     elif qtab == "LEFT JOIN (all employees)":
-        df = qsvc.left_join_all_employees()
+        df = qsvc.left_join_all_employees() if live else snap.left_join_all_employees()
         st.dataframe(df)
-        export_df_csv(df, "left_join.csv")
+        export_stream(lambda: qsvc.left_join_all_employees(stream=True), "left_join.csv", key="left_join_export")
 
     elif qtab == "Multi-table JOIN (with manager)":
-        df = qsvc.multi_table_join_with_manager()
+        df = qsvc.multi_table_join_with_manager() if live else snap.multi_table_join_with_manager()
         st.dataframe(df)
-        export_df_csv(df, "multi_join.csv")
+        export_stream(lambda: qsvc.multi_table_join_with_manager(stream=True), "multi_join.csv", key="multi_join_export")
 
     elif qtab == "Above global average":
-        df = qsvc.above_global_average()
+        df = qsvc.above_global_average() if live else snap.above_global_average()
         st.dataframe(df)
-        export_df_csv(df, "above_avg.csv")
+        export_stream(lambda: qsvc.above_global_average(stream=True), "above_avg.csv", key="above_avg_export")
 
 
 # ============================================================
@@ -617,36 +808,92 @@ elif page == "Queries":
 elif page == "Dashboard":
     st.header("Dashboard")
 
-    emp_df = qsvc.get_employees()
-    dept_df = qsvc.get_departments()
-    proj_df = qsvc.get_projects()
-    assign_df = qsvc.get_assignments()
-
-    cols = st.columns(4)
-    cols[0].metric("Total Employees", len(emp_df))
-    cols[1].metric("Departments", len(dept_df))
-    cols[2].metric("Projects", len(proj_df))
-    cols[3].metric("Assignments", len(assign_df))
-
-    if not assign_df.empty and "Salary" in assign_df:
-        st.write(f"Average salary: {assign_df['Salary'].mean():.2f}")
-
-    # Histogram
-    if not assign_df.empty and "Salary" in assign_df:
-        fig, ax = plt.subplots()
-        ax.hist(assign_df["Salary"], bins=10)
-        st.pyplot(fig)
-
-    # Top employees by salary
+    # Lay the page out first: the Top N slider must exist before the loads start
+    summary_box = st.container()
+    charts_box = st.container()
     st.subheader("Top employees by average assignment salary")
-    if not assign_df.empty:
-        group_cols = [col for col in ["EmployeeID", "EmployeeName"] if col in assign_df]
-        if group_cols:
-            avg_by_emp = assign_df.groupby(group_cols)["Salary"].mean().reset_index().sort_values("Salary", ascending=False)
-            st.dataframe(avg_by_emp)
-            export_df_csv(avg_by_emp, "top_employees_avg_salary.csv")
+    top_n = st.slider("Top N", min_value=5, max_value=100, value=20, step=5)
+
+    # Everything below is aggregated by MySQL: only a few rows cross the wire.
+    # The independent loads run concurrently, so the page waits for the slowest
+    # query instead of the sum of all of them.
+    # Assignment statistics: trigger-maintained aggregate tables when the
+    # schema has them (checked once), otherwise live GROUP BY queries
+    materialized = qsvc.has_dashboard_aggregates()
+    if async_available():
+        if materialized:
+            stats = dict(
+                totals=aq.get_salary_totals(),
+                hist=aq.get_salary_histogram(),
+                roles=aq.get_role_counts(),
+                top=aq.get_top_employees_by_avg_salary(top_n),
+            )
         else:
-            st.warning("No employee identifiers found in assignment data")
+            stats = dict(
+                totals=aq.salary_summary(),
+                hist=aq.salary_histogram(bins=10),
+                roles=aq.role_distribution(),
+                top=aq.top_employees_by_avg_salary(top_n),
+            )
+        data = gather_pages(counts=aq.count_all_tables(), **stats)
+    else:
+        # No async driver: same fan-out on the thread pool
+        if materialized:
+            stats = {
+                "totals": qsvc.get_salary_totals,
+                "hist": qsvc.get_salary_histogram,
+                "roles": qsvc.get_role_counts,
+                "top": Task(qsvc.get_top_employees_by_avg_salary, top_n),
+            }
+        else:
+            stats = {
+                "totals": qsvc.salary_summary,
+                "hist": Task(qsvc.salary_histogram, bins=10),
+                "roles": qsvc.role_distribution,
+                "top": Task(qsvc.top_employees_by_avg_salary, top_n),
+            }
+        data = fetch_parallel({"counts": qsvc.count_all_tables, **stats})
+
+    counts = data["counts"]
+    counts = counts.iloc[0] if not counts.empty else {}
+    totals = data["totals"]
+    assignment_count = int(totals["AssignmentCount"].iloc[0]) if not totals.empty else 0
+
+    with summary_box:
+        cols = st.columns(4)
+        cols[0].metric("Total Employees", int(counts.get("Employees", 0)))
+        cols[1].metric("Departments", int(counts.get("Departments", 0)))
+        cols[2].metric("Projects", int(counts.get("Projects", 0)))
+        cols[3].metric("Assignments", assignment_count)
+
+        if assignment_count:
+            st.write(f"Average salary: {float(totals['AverageSalary'].iloc[0]):.2f}")
+
+    with charts_box:
+        # Histogram
+        hist_df = data["hist"]
+        if not hist_df.empty:
+            edges = hist_df["SalaryFrom"].astype(float)
+            widths = hist_df["SalaryTo"].astype(float) - edges
+            fig, ax = plt.subplots()
+            ax.bar(edges, hist_df["AssignmentCount"], width=widths, align="edge")
+            ax.set_xlabel("Salary")
+            ax.set_ylabel("Assignments")
+            st.pyplot(fig)
+
+        # Role distribution
+        role_df = data["roles"]
+        if not role_df.empty:
+            st.subheader("Role distribution")
+            st.bar_chart(role_df.set_index("Role")["AssignmentCount"])
+
+    # Top employees by salary
+    avg_by_emp = data["top"]
+    if not avg_by_emp.empty:
+        st.dataframe(avg_by_emp)
+        export_df_csv(avg_by_emp, "top_employees_avg_salary.csv")
+    else:
+        st.info("No assignments yet")
 
 # ============================================================
 # PAGE: SETTINGS
@@ -655,7 +902,11 @@ elif page == "Settings":
     st.header("Settings / DB info")
 
     st.subheader("Database Information")
-    st.write("Database Type: MySQL")
+    backend_label = {"mysql": "MySQL", "sqlite": "SQLite (embedded)"}.get(
+        connection.backend.name, connection.backend.name)
+    st.write("Database Type:", backend_label)
+    if connection.backend.name == "sqlite":
+        st.write("Database File:", connection.backend.path)
 
     # Thử kết nối để hiển thị info
     conn = get_db_connection()
@@ -670,4 +921,71 @@ elif page == "Settings":
     else:
         st.error("Status: Cannot connect ❌")
 
-    st.info("Using MySQL connection settings from connection.py")
+    st.subheader("Connection Pool")
+    stats = pool_stats()
+    if stats:
+        cols = st.columns(4)
+        cols[0].metric("In use", stats["in_use"])
+        cols[1].metric("Idle", stats["idle"])
+        cols[2].metric("Avg wait (ms)", f"{stats['avg_wait_ms']:.1f}")
+        cols[3].metric("Max wait (ms)", f"{stats['max_wait_ms']:.1f}")
+        prepared = stats["prepared_statements"]
+        st.caption(f"Prepared statement cache: {prepared['hits']} hits, {prepared['misses']} prepares, "
+                   f"{prepared['evictions']} evictions ({prepared['hit_ratio']:.0%} reuse)")
+        st.json(stats)
+    else:
+        st.info("Pool not initialised yet")
+
+    routing = stats.get("replicas")
+    if routing:
+        st.subheader("Read Replicas")
+        st.caption(f"Strategy: {routing['strategy']} · reads pinned to the primary for "
+                   f"{routing['pin_seconds']:g}s after a write · {routing['pinned_reads']} pinned, "
+                   f"{routing['fallback_reads']} fallback reads")
+        st.dataframe(pd.DataFrame([{k: v for k, v in r.items() if k != "pool"} for r in routing["replicas"]]))
+
+    st.subheader("Change Feed")
+    feed = changefeed.relay.stats()
+    cols = st.columns(3)
+    cols[0].metric("Last event", feed["last_event_id"] if feed["last_event_id"] is not None else "-")
+    cols[1].metric("Delivered", feed["delivered"])
+    cols[2].metric("Subscribers", feed["subscribers"])
+    if feed["last_error"]:
+        st.warning(f"Last poll failed: {feed['last_error']}")
+
+    st.subheader("Query Cache")
+    cache_stats = get_cache().stats()
+    cols = st.columns(3)
+    cols[0].metric("Entries", f"{cache_stats['entries']} / {cache_stats['max_entries']}")
+    cols[1].metric("Hit ratio", f"{cache_stats['hit_ratio']:.0%}")
+    cols[2].metric("TTL (s)", cache_stats["ttl_seconds"])
+    if st.button("Clear cache"):
+        get_cache().clear()
+        st.success("Cache cleared")
+
+    st.subheader("Query Profiling")
+    profiling.slow_log.threshold_ms = st.number_input(
+        "Slow query threshold (ms)", min_value=1.0, value=float(profiling.slow_log.threshold_ms), step=50.0)
+
+    per_caller = pd.DataFrame(profiling.stats.summary())
+    if per_caller.empty:
+        st.info("No queries recorded yet")
+    else:
+        st.write("Per calling function (rolling window of recent calls)")
+        st.dataframe(per_caller)
+
+        caller = st.selectbox("Latency histogram for", per_caller["caller"].tolist())
+        hist = pd.DataFrame(profiling.stats.histogram(caller), columns=["UpTo_ms", "Calls"])
+        hist["UpTo_ms"] = hist["UpTo_ms"].map(lambda ms: f"≤{ms:g}" if ms != float("inf") else "more")
+        st.bar_chart(hist.set_index("UpTo_ms")["Calls"])
+
+        top_n = st.slider("Slowest statements", min_value=5, max_value=profiling.TOP_N, value=10, step=5)
+        st.dataframe(pd.DataFrame(profiling.slowest.top(top_n)))
+
+    with st.expander(f"Slow query log ({profiling.slow_log.path})"):
+        st.dataframe(pd.DataFrame(profiling.slow_log.tail(50)))
+    if st.button("Reset profiling stats"):
+        profiling.reset()
+        st.success("Profiling stats cleared")
+
+    st.info(f"Using {backend_label} connection settings from connection.py (DB_TYPE={connection.DB_TYPE})")
@@ -0,0 +1,31 @@
+-- 001_covering_indexes.sql
+-- Covering / composite indexes for the query screens (queries.py).
+-- Run once against an existing employee_manager_db:
+--     mysql -u root -p employee_manager_db < migrations/001_covering_indexes.sql
+-- Fresh installs get the same indexes from schema.sql.
+
+USE employee_manager_db;
+
+-- inner_join_per_project / multi_table_join_with_manager:
+-- read Assignments in (ProjectID, EmployeeID) order without a filesort,
+-- Role and Salary come straight from the index (no row lookup).
+-- Also serves the FK on ProjectID.
+CREATE INDEX idx_assignments_project_employee
+    ON Assignments (ProjectID, EmployeeID, Role, Salary);
+
+-- role_distribution / role filter: GROUP BY Role from the index
+CREATE INDEX idx_assignments_role_salary
+    ON Assignments (Role, Salary);
+
+-- salary_summary / salary_histogram / above_global_average: MIN/MAX/AVG from a narrow index
+CREATE INDEX idx_assignments_salary
+    ON Assignments (Salary);
+
+-- Employees page: department filter, listing names per department
+-- Also serves the FK on DepartmentID.
+CREATE INDEX idx_employees_department_name
+    ON Employees (DepartmentID, Name);
+
+-- Name prefix search (LIKE 'abc%') and ORDER BY Name
+CREATE INDEX idx_employees_name
+    ON Employees (Name);
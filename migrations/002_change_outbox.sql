@@ -0,0 +1,16 @@
+-- 002_change_outbox.sql
+-- Outbox table for the change feed (changefeed.py).
+-- Run once against an existing employee_manager_db:
+--     mysql -u root -p employee_manager_db < migrations/002_change_outbox.sql
+-- Fresh installs get the same table from schema.sql.
+
+USE employee_manager_db;
+
+CREATE TABLE IF NOT EXISTS ChangeOutbox (
+    EventID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    EventType VARCHAR(40) NOT NULL,
+    EntityKey TEXT NOT NULL,
+    Payload TEXT NOT NULL,
+    Origin VARCHAR(32) NOT NULL,
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
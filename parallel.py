@@ -0,0 +1,178 @@
+# parallel.py
+#
+# Run independent queries.py calls at the same time on a bounded thread pool.
+# Every call checks out its own pooled connection, so a page that needs
+# several datasets waits for the slowest query instead of the sum of all.
+#
+#   data = fetch_parallel({
+#       "employees": qsvc.get_employees,
+#       "projects": qsvc.get_projects,
+#       "top": Task(qsvc.top_employees_by_avg_salary, 20, timeout=5),
+#   })
+#   data["employees"], data.errors
+
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+from connection import kill_query, pool_config, track_connections
+
+DEFAULT_TIMEOUT = 15.0   # seconds per query
+# No more workers than idle pooled connections: extra threads would only queue in the pool
+MAX_WORKERS = pool_config["pool_size"]
+# A task that times out while running keeps its worker until its query returns.
+# Up to this many such workers are replaced, so a few hung queries cannot
+# starve every later fetch; past it the pool just runs with fewer workers.
+MAX_ABANDONED_WORKERS = MAX_WORKERS
+
+_executor = None
+_executor_lock = threading.Lock()
+_abandoned = 0
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="query")
+    return _executor
+
+
+def _abandon_worker(executor, future):
+    """
+    `future` timed out while running on `executor`: retire that executor so new
+    work gets fresh workers. Once nothing references it, its threads finish
+    their queued work and exit (no shutdown(): a concurrent fetch may still be
+    submitting to it).
+    """
+    global _executor, _abandoned
+    with _executor_lock:
+        if _abandoned >= MAX_ABANDONED_WORKERS:
+            return
+        _abandoned += 1
+        if _executor is executor:
+            _executor = None
+    future.add_done_callback(_worker_returned)
+
+
+def _worker_returned(future):
+    global _abandoned
+    with _executor_lock:
+        _abandoned -= 1
+
+
+class Task:
+    """A call to run in parallel: Task(fn, *args, timeout=None, **kwargs)."""
+
+    def __init__(self, fn, *args, timeout=None, **kwargs):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.timeout = timeout
+
+
+class FetchResults(dict):
+    """name -> result; failed or timed-out loads hold an empty DataFrame and are listed in .errors."""
+
+    def __init__(self):
+        super().__init__()
+        self.errors = {}
+
+
+class _Running:
+    """(connection, server thread id, backend) of the connections a task has checked out."""
+
+    def __init__(self):
+        self.connections = []
+        self.cancelled = False
+
+    def on_checkout(self, conn):
+        try:
+            self.connections.append((conn, conn.connection_id, getattr(conn, "backend", None)))
+        except Exception:
+            pass
+
+    def cancel(self):
+        self.cancelled = True
+        for conn, connection_id, server in self.connections:
+            # one the task already closed is back in the pool, maybe running another
+            # request's query: kill only while the task still holds it
+            conn.while_checked_out(lambda: kill_query(connection_id, server))
+
+
+def _call(running, task):
+    if running.cancelled:
+        return None
+    with track_connections(running.on_checkout):
+        return task.fn(*task.args, **task.kwargs)
+
+
+def fetch_parallel(tasks, timeout=DEFAULT_TIMEOUT, cancel_event=None):
+    """
+    Run `tasks` ({name: callable or Task}) concurrently and return FetchResults.
+
+    Each task has its own deadline (Task.timeout, else `timeout`). A task that
+    misses it - or every pending task once `cancel_event` is set - is cancelled:
+    not started if still queued, otherwise its running statement is aborted with
+    KILL QUERY. Cancelled and failed tasks yield an empty DataFrame.
+    """
+    tasks = {name: t if isinstance(t, Task) else Task(t) for name, t in tasks.items()}
+    results = FetchResults()
+    if not tasks:
+        return results
+
+    executor = _get_executor()
+    start = time.monotonic()
+    pending = {}
+    for name, task in tasks.items():
+        running = _Running()
+        # in the caller's context, so the worker reads as the same session (replicas.py)
+        future = executor.submit(contextvars.copy_context().run, _call, running, task)
+        limit = task.timeout if task.timeout is not None else timeout
+        deadline = start + limit if limit is not None else None
+        pending[future] = (name, running, deadline)
+
+    while pending:
+        deadlines = [d for _, _, d in pending.values() if d is not None]
+        wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+        if cancel_event is not None:
+            # poll so a cancel request is noticed promptly
+            wait_for = 0.1 if wait_for is None else min(wait_for, 0.1)
+        done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            name, _, _ = pending.pop(future)
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                print(f"❌ {name} failed: {e}")
+                results.errors[name] = str(e)
+                results[name] = pd.DataFrame()
+
+        now = time.monotonic()
+        cancel_all = cancel_event is not None and cancel_event.is_set()
+        for future, (name, running, deadline) in list(pending.items()):
+            if cancel_all or (deadline is not None and now >= deadline):
+                pending.pop(future)
+                if not future.cancel():   # already running
+                    _abandon_worker(executor, future)
+                running.cancel()
+                reason = "cancelled" if cancel_all else "timed out"
+                print(f"❌ {name} {reason}")
+                results.errors[name] = reason
+                results[name] = pd.DataFrame()
+
+    # keep the caller's order
+    return _ordered(results, tasks)
+
+
+def _ordered(results, tasks):
+    ordered = FetchResults()
+    for name in tasks:
+        ordered[name] = results[name]
+    ordered.errors = results.errors
+    return ordered
@@ -0,0 +1,371 @@
+# profiling.py
+#
+# Instrumentation for every DB call. Pooled connections hand out
+# InstrumentedCursor objects (see db_pool.PooledConnection.cursor), so each
+# statement is timed from execute() until its rows are fetched, and a
+# QueryEvent (wall time, rows, approx. bytes, calling function) is sent to
+# the registered sinks:
+#
+#   - QueryStats:     rolling per-caller latency histograms (Settings page)
+#   - SlowQueryLog:   JSON lines for statements over a threshold
+#   - SlowestQueries: top-N slowest statements seen
+#
+# add_sink(fn) plugs in anything else that takes a QueryEvent.
+
+import heapq
+import itertools
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+
+SLOW_QUERY_MS = 200.0
+# Absolute, so the log does not land in whatever directory the app was started from
+SLOW_QUERY_LOG = os.environ.get("SLOW_QUERY_LOG") or os.path.join(tempfile.gettempdir(), "employee_manager_slow_queries.log")
+HISTORY_SIZE = 500          # latencies kept per caller for the rolling histogram
+TOP_N = 50
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+_BYTES_SAMPLE = 100         # rows inspected to estimate the size of a result
+
+_WS_RE = re.compile(r"\s+")
+
+# Code objects of data-layer helpers (run_query, db_execute...): the caller
+# recorded for a statement is the first function above them on the stack.
+_helper_codes = set()
+_INFRA_MODULES = {__name__, "db_pool", "stmt_cache", "contextlib", "threading", "concurrent.futures.thread"}
+
+
+def data_helper(fn):
+    """Mark fn as plumbing so statements are attributed to whoever called it."""
+    _helper_codes.add(fn.__code__)
+    return fn
+
+
+def _caller(depth=2):
+    frame = sys._getframe(depth)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if frame.f_code not in _helper_codes and module not in _INFRA_MODULES:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def normalize_sql(sql, limit=300):
+    sql = _WS_RE.sub(" ", str(sql)).strip()
+    return sql if len(sql) <= limit else sql[:limit] + "…"
+
+
+def estimate_bytes(rows):
+    """Approximate payload size of fetched rows (tuples or dicts), from a sample."""
+    n = len(rows)
+    if not n:
+        return 0
+    sample = rows[:_BYTES_SAMPLE]
+    size = 0
+    for row in sample:
+        values = row.values() if isinstance(row, dict) else row
+        for value in values:
+            if value is None:
+                size += 1
+            elif isinstance(value, (str, bytes, bytearray)):
+                size += len(value)
+            else:
+                size += 8
+    return size * n // len(sample)
+
+
+class QueryEvent:
+    __slots__ = ("sql", "caller", "started", "wall_ms", "rows", "bytes", "error")
+
+    def __init__(self, sql, caller):
+        self.sql = normalize_sql(sql)
+        self.caller = caller
+        self.started = time.time()
+        self.wall_ms = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.error = None
+
+    def as_dict(self):
+        return {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "caller": self.caller,
+            "wall_ms": round(self.wall_ms, 3),
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "error": self.error,
+            "sql": self.sql,
+        }
+
+
+class QueryTimer:
+    """
+    Times one statement. Used directly where there is no pooled cursor
+    (e.g. the async driver):
+
+        timer = QueryTimer(sql)
+        ... execute / fetch ...
+        timer.add_rows(rows)
+        timer.finish()
+    """
+
+    def __init__(self, sql, caller=None):
+        self.event = QueryEvent(sql, caller or _caller())
+        self._start = time.perf_counter()
+        self._done = False
+
+    def add_rows(self, rows):
+        self.event.rows += len(rows)
+        self.event.bytes += estimate_bytes(rows)
+
+    def fail(self, error):
+        self.event.error = str(error)
+
+    def finish(self):
+        if self._done:
+            return
+        self._done = True
+        self.event.wall_ms = (time.perf_counter() - self._start) * 1000
+        emit(self.event)
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy: a statement's event covers execute() plus every fetch until
+    the next execute() or close().
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._timer = None
+
+    def _finish(self):
+        if self._timer is not None:
+            timer, self._timer = self._timer, None
+            if timer.event.rows == 0:
+                rowcount = getattr(self._cursor, "rowcount", -1)
+                if rowcount and rowcount > 0 and not getattr(self._cursor, "with_rows", False):
+                    timer.event.rows = rowcount   # rows affected by a write
+            timer.finish()
+
+    def _run(self, method, operation, *args, **kwargs):
+        self._finish()
+        self._timer = QueryTimer(operation)
+        try:
+            return method(operation, *args, **kwargs)
+        except Exception as e:
+            self._timer.fail(e)
+            self._finish()
+            raise
+
+    def execute(self, operation, *args, **kwargs):
+        return self._run(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._run(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _fetched(self, rows):
+        if self._timer is not None and rows:
+            self._timer.add_rows(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._fetched(self._cursor.fetchall())
+        self._finish()
+        return rows
+
+    def fetchmany(self, size=1):
+        rows = self._cursor.fetchmany(size)
+        if not rows:
+            self._finish()
+        return self._fetched(rows)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is None:
+            self._finish()
+        else:
+            self._fetched([row])
+        return row
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._fetched([row])
+            yield row
+        self._finish()
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ------------------------------------------
+# Sinks
+# ------------------------------------------
+class QueryStats:
+    """Per-caller counters and a rolling window of recent latencies."""
+
+    def __init__(self, history=HISTORY_SIZE):
+        self.history = history
+        self._lock = threading.Lock()
+        self._callers = {}
+
+    def __call__(self, event):
+        with self._lock:
+            entry = self._callers.get(event.caller)
+            if entry is None:
+                entry = self._callers[event.caller] = {
+                    "calls": 0, "errors": 0, "rows": 0, "bytes": 0, "total_ms": 0.0,
+                    "recent": deque(maxlen=self.history),
+                }
+            entry["calls"] += 1
+            entry["errors"] += event.error is not None
+            entry["rows"] += event.rows
+            entry["bytes"] += event.bytes
+            entry["total_ms"] += event.wall_ms
+            entry["recent"].append(event.wall_ms)
+
+    def histogram(self, caller):
+        """[(upper bound in ms, count)] over the rolling window; last bound is inf."""
+        with self._lock:
+            recent = list(self._callers.get(caller, {}).get("recent", ()))
+        counts = [0] * (len(BUCKETS_MS) + 1)
+        for ms in recent:
+            i = 0
+            while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+                i += 1
+            counts[i] += 1
+        return list(zip(BUCKETS_MS + (float("inf"),), counts))
+
+    def summary(self):
+        """One dict per caller, slowest p95 first."""
+        with self._lock:
+            items = [(caller, dict(entry), sorted(entry["recent"])) for caller, entry in self._callers.items()]
+        out = []
+        for caller, entry, recent in items:
+            out.append({
+                "caller": caller,
+                "calls": entry["calls"],
+                "errors": entry["errors"],
+                "avg_ms": entry["total_ms"] / entry["calls"],
+                "p50_ms": _percentile(recent, 0.50),
+                "p95_ms": _percentile(recent, 0.95),
+                "max_ms": recent[-1] if recent else 0.0,
+                "rows": entry["rows"],
+                "bytes": entry["bytes"],
+            })
+        return sorted(out, key=lambda r: r["p95_ms"], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._callers.clear()
+
+
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class SlowQueryLog:
+    """Appends one JSON object per line for statements slower than threshold_ms."""
+
+    def __init__(self, path=SLOW_QUERY_LOG, threshold_ms=SLOW_QUERY_MS):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        if event.wall_ms < self.threshold_ms:
+            return
+        line = json.dumps(event.as_dict(), default=str)
+        with self._lock:
+            try:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except OSError as e:
+                print("❌ Cannot write slow query log:", e)
+
+    def tail(self, n=50):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                lines = deque(f, maxlen=n)
+        except OSError:
+            return []
+        return [json.loads(line) for line in lines if line.strip()]
+
+
+class SlowestQueries:
+    """Keeps the N slowest events seen."""
+
+    def __init__(self, n=TOP_N):
+        self.n = n
+        self._heap = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        item = (event.wall_ms, next(self._seq), event)
+        with self._lock:
+            if len(self._heap) < self.n:
+                heapq.heappush(self._heap, item)
+            elif item[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, item)
+
+    def top(self, n=None):
+        with self._lock:
+            items = sorted(self._heap, reverse=True)
+        return [event.as_dict() for _, _, event in items[:n]]
+
+    def reset(self):
+        with self._lock:
+            self._heap.clear()
+
+
+# ------------------------------------------
+# Registry
+# ------------------------------------------
+stats = QueryStats()
+slow_log = SlowQueryLog()
+slowest = SlowestQueries()
+_sinks = [stats, slow_log, slowest]
+enabled = True
+
+
+def add_sink(sink):
+    _sinks.append(sink)
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def emit(event):
+    if not enabled:
+        return
+    for sink in list(_sinks):
+        try:
+            sink(event)
+        except Exception as e:
+            print("❌ Profiling sink failed:", e)
+
+
+def reset():
+    stats.reset()
+    slowest.reset()
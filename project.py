@@ -0,0 +1,24 @@
+# project.py
+
+from columnar import ColumnarTable, IntColumn, StrColumn
+
+class Project:
+    __slots__ = ("project_id", "project_name", "manager_employee_id")
+
+    def __init__(self, project_id, project_name, manager_employee_id):
+        self.project_id = project_id
+        self.project_name = project_name
+        self.manager_employee_id = manager_employee_id
+
+    def __repr__(self):
+        return f"Project({self.project_id}, {self.project_name})"
+
+
+class ProjectTable(ColumnarTable):
+    """Columnar list of projects returned by ProjectService.get_all_projects()."""
+    row_type = Project
+    schema = (
+        ("project_id", IntColumn),
+        ("project_name", StrColumn),
+        ("manager_employee_id", IntColumn),   # NULL when the project has no manager
+    )
\ No newline at end of file
@@ -3,100 +3,61 @@
 elif page == "Projects":
     st.header("Projects")
 
-    employees = qsvc.get_employees()
-    emp_idcol = safe_id_col(employees) if not employees.empty else "EmployeeID"
-    emp_map = get_fk_map(employees, "Name", emp_idcol)
-
     # ----------------------- CREATE PROJECT -----------------------
+    # The manager picker sits outside the form so typing refreshes its options
+    mid = employee_picker("Manager", key="create_proj_mgr")
     with st.form("create_project"):
         pname = st.text_input("Project Name")
-        manager = st.selectbox("Manager", [""] + list(emp_map.keys()))
 
         if st.form_submit_button("Create Project"):
             if not pname:
                 st.error("Project name required")
             else:
-                mid = emp_map.get(manager)
-
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    sql = """
-                        INSERT INTO Projects (ProjectName, ManagerEmployeeID)
-                        VALUES (%s, %s)
-                    """
-                    cursor.execute(sql, (pname, mid))
-                    conn.commit()
-                    st.success("Created")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                sql = """
+                    INSERT INTO Projects (ProjectName, ManagerEmployeeID)
+                    VALUES (%s, %s)
+                """
+                ok, err = db_execute(sql, (pname, mid), events=lambda cursor: [changefeed.ProjectCreated(
+                    {"ProjectID": cursor.lastrowid}, {"ProjectName": pname, "ManagerEmployeeID": mid})])
+                st.success("Created") if ok else st.error(f"❌ {err}")
 
     # ----------------------- VIEW PROJECTS -----------------------
-    df = qsvc.get_projects()
+    name_filter = st.text_input("Project name starts with", key="proj_name_filter")
+    df = paged_view(
+        "projects_page", qsvc.get_projects_page, ["ProjectID"],
+        name_prefix=name_filter or None,
+    )
     st.dataframe(df)
-    export_df_csv(df, "projects.csv")
+    export_on_demand(qsvc.get_projects, "projects.csv", key="projects_export")
 
     # ----------------------- EDIT + DELETE -----------------------
     if not df.empty:
         idcol = safe_id_col(df)
         sel = st.selectbox("Select ProjectID to Edit/Delete", df[idcol].tolist())
-        row = df[df[idcol] == sel].iloc[0]
-
-        # Current manager name
-        current_mgr_id = row.get("ManagerEmployeeID")
-        current_mgr_name = ""
-        if current_mgr_id in employees[emp_idcol].values:
-            current_mgr_name = employees[employees[emp_idcol] == current_mgr_id].iloc[0]["Name"]
+        row = row_index(df, idcol).row(sel)
 
         # --------- EDIT FORM ---------
+        # Current manager comes with the page row (ManagerName)
+        new_mid = employee_picker(
+            "Manager", key=f"edit_proj_mgr_{sel}",
+            current_id=row.get("ManagerEmployeeID"), current_name=row.get("ManagerName"),
+        )
         with st.form("edit_proj"):
             new_name = st.text_input("Name", value=row["ProjectName"])
-            new_mgr = st.selectbox(
-                "Manager",
-                [""] + list(emp_map.keys()),
-                index=(list(emp_map.keys()).index(current_mgr_name) if current_mgr_name in emp_map else 0)
-            )
 
             if st.form_submit_button("Save"):
-                mid = emp_map.get(new_mgr)
-
-                conn = get_db_connection()
-                try:
-                    cursor = conn.cursor()
-                    sql = """
-                        UPDATE Projects
-                        SET ProjectName=%s, ManagerEmployeeID=%s
-                        WHERE ProjectID=%s
-                    """
-                    cursor.execute(sql, (new_name, mid, sel))
-                    conn.commit()
-                    st.success("Saved")
-
-                except Exception as e:
-                    st.error(f"❌ {e}")
-
-                finally:
-                    cursor.close()
-                    conn.close()
+                sql = """
+                    UPDATE Projects
+                    SET ProjectName=%s, ManagerEmployeeID=%s
+                    WHERE ProjectID=%s
+                """
+                ok, err = db_execute(sql, (new_name, new_mid, sel), events=lambda cursor: [changefeed.ProjectUpdated(
+                    {"ProjectID": int(sel)}, {"ProjectName": new_name, "ManagerEmployeeID": new_mid})])
+                st.success("Saved") if ok else st.error(f"❌ {err}")
 
         # --------- DELETE PROJECT ---------
         if st.button("Delete project"):
-            conn = get_db_connection()
-            try:
-                cursor = conn.cursor()
-                sql = "DELETE FROM Projects WHERE ProjectID=%s"
-                cursor.execute(sql, (sel,))
-                conn.commit()
-                st.success("Deleted")
-
-            except Exception as e:
-                st.error(f"❌ {e}")
-
-            finally:
-                cursor.close()
-                conn.close()
+            sql = "DELETE FROM Projects WHERE ProjectID=%s"
+            ok, err = db_execute(sql, (sel,), events=lambda cursor: [
+                changefeed.ProjectDeleted({"ProjectID": int(sel)})])
+            st.success("Deleted") if ok else st.error(f"❌ {err}")
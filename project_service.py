@@ -1,24 +1,43 @@
 # services/project_service.py
 
 from connection import get_db_connection
-from project import Project
+from project import Project, ProjectTable
+from query_cache import invalidate
+import changefeed
+from batch import DEFAULT_CHUNK_SIZE, execute_batch, execute_keyed_batch, summarize
 from mysql.connector import Error
 
 class ProjectService:
+    SELECT_ALL_SQL = "SELECT ProjectID, ProjectName, ManagerEmployeeID FROM Projects"
+    INSERT_SQL = "INSERT INTO Projects (ProjectName, ManagerEmployeeID) VALUES (%s, %s)"
+    UPDATE_SQL = "UPDATE Projects SET ProjectName=%s, ManagerEmployeeID=%s WHERE ProjectID=%s"
+    DELETE_SQL = "DELETE FROM Projects WHERE ProjectID = %s"
+
+    @staticmethod
+    def _data(project):
+        """Column values of a Project for its change events."""
+        return {"ProjectName": project.project_name, "ManagerEmployeeID": project.manager_employee_id}
+
+    @staticmethod
+    def _describe_error(e, project_data):
+        if e.errno == 1062:
+            return f"Error: Project '{project_data.project_name}' already exists."
+        if e.errno == 1452:
+            return "Error: Manager EmployeeID does not exist."
+        return f"Error creating project: {e}"
 
     def get_all_projects(self):
         """ [R]ead: Retrieves all projects. """
-        conn = get_db_connection()
-        projects = []
+        conn = get_db_connection(read_only=True)
+        projects = ProjectTable()
         if conn is None: return projects
 
-        query = "SELECT ProjectID, ProjectName, ManagerEmployeeID FROM Projects"
+        query = self.SELECT_ALL_SQL
         cursor = conn.cursor()
         
         try:
             cursor.execute(query)
-            for row in cursor.fetchall():
-                projects.append(Project(row[0], row[1], row[2]))
+            projects.extend_from_cursor(cursor)
         except Error as e:
             print(f"Error fetching projects: {e}")
         finally:
@@ -31,23 +50,21 @@ class ProjectService:
         conn = get_db_connection()
         if conn is None: return False
 
-        query = "INSERT INTO Projects (ProjectName, ManagerEmployeeID) VALUES (%s, %s)"
+        query = self.INSERT_SQL
         values = (project_data.project_name, project_data.manager_employee_id)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = changefeed.record(conn, changefeed.ProjectCreated({"ProjectID": cursor.lastrowid}, self._data(project_data)))
             conn.commit()
+            invalidate("Projects")
+            changefeed.publish(events)
             print(f"✅ Project '{project_data.project_name}' created.")
             return True
         except Error as e:
             conn.rollback()
-            if e.errno == 1062:
-                print(f"❌ Error: Project '{project_data.project_name}' already exists.")
-            elif e.errno == 1452:
-                print("❌ Error: Manager EmployeeID does not exist.")
-            else:
-                print(f"❌ Error creating project: {e}")
+            print(f"❌ {self._describe_error(e, project_data)}")
             return False
         finally:
             cursor.close()
@@ -58,13 +75,18 @@ class ProjectService:
         conn = get_db_connection()
         if conn is None: return False
 
-        query = "UPDATE Projects SET ProjectName=%s, ManagerEmployeeID=%s WHERE ProjectID=%s"
+        query = self.UPDATE_SQL
         values = (new_data.project_name, new_data.manager_employee_id, project_id)
-        cursor = conn.cursor()
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, values)
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.ProjectUpdated({"ProjectID": project_id}, self._data(new_data)))
             conn.commit()
+            invalidate("Projects")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -79,12 +101,17 @@ class ProjectService:
         conn = get_db_connection()
         if conn is None: return False
         
-        query = "DELETE FROM Projects WHERE ProjectID = %s"
-        cursor = conn.cursor()
+        query = self.DELETE_SQL
+        cursor = conn.prepare(query)
         
         try:
             cursor.execute(query, (project_id,))
+            events = []
+            if cursor.rowcount > 0:
+                events = changefeed.record(conn, changefeed.ProjectDeleted({"ProjectID": project_id}))
             conn.commit()
+            invalidate("Projects")
+            changefeed.publish(events)
             return cursor.rowcount > 0
         except Error as e:
             conn.rollback()
@@ -93,4 +120,37 @@ class ProjectService:
             return False
         finally:
             cursor.close()
-            conn.close()
\ No newline at end of file
+            conn.close()
+
+    # -------------------------------------------------------------
+    # Bulk operations (one transaction, chunked)
+    # -------------------------------------------------------------
+
+    def create_many(self, projects, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [C]reate (bulk): Inserts Project objects with multi-row INSERTs in one transaction. """
+        query = self.INSERT_SQL
+        results = execute_batch(
+            query, projects,
+            lambda p: (p.project_name, p.manager_employee_id),
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda p: changefeed.ProjectCreated(data=self._data(p)),   # ids not known per row
+        )
+        return summarize(results, "projects created")
+
+    def update_many(self, projects, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [U]pdate (bulk): Updates Project objects matched on project_id. """
+        results = execute_keyed_batch(
+            "Projects", projects, lambda p: {"ProjectID": p.project_id}, self._data,
+            chunk_size=chunk_size, describe_error=self._describe_error,
+            events=lambda p: changefeed.ProjectUpdated({"ProjectID": p.project_id}, self._data(p)),
+        )
+        return summarize(results, "projects updated")
+
+    def delete_many(self, project_ids, chunk_size=DEFAULT_CHUNK_SIZE):
+        """ [D]elete (bulk): Deletes projects by ID (assignments CASCADE). """
+        results = execute_keyed_batch(
+            "Projects", project_ids, lambda project_id: {"ProjectID": project_id},
+            chunk_size=chunk_size,
+            events=lambda project_id: changefeed.ProjectDeleted({"ProjectID": project_id}),
+        )
+        return summarize(results, "projects deleted")
@@ -1,13 +1,27 @@
 # app/services/queries.py
+from contextvars import ContextVar
+
 import pandas as pd
-from app.db.connection import get_db_connection
+import connection
+from connection import get_db_connection
+from query_cache import bypass_cache, cached
+from profiling import data_helper
+
+# When set (see capture_sql), run_query records statements instead of executing them
+_sql_recorder = ContextVar("sql_recorder", default=None)
 
 
 # ------------------------------------------
 # Helper function to safely run queries
 # ------------------------------------------
+@data_helper
 def run_query(sql, params=None):
-    conn = get_db_connection()
+    recorder = _sql_recorder.get()
+    if recorder is not None:
+        recorder.append((sql, params))
+        return pd.DataFrame()
+
+    conn = get_db_connection(read_only=True)
     if conn is None:
         print("❌ Cannot connect to DB")
         return pd.DataFrame()
@@ -27,10 +41,80 @@ def run_query(sql, params=None):
         conn.close()
 
 
+def capture_sql(fn, *args, **kwargs):
+    """
+    Return the (sql, params) a query function would run, without touching the DB.
+    Used to run the same statements elsewhere (EXPLAIN, async driver...).
+    """
+    fn = getattr(fn, "__wrapped__", fn)   # bypass @cached
+    recorded = []
+    token = _sql_recorder.set(recorded)
+    try:
+        with bypass_cache():   # nested @cached helpers must not answer from memory
+            fn(*args, **kwargs)
+    finally:
+        _sql_recorder.reset(token)
+    if not recorded:
+        raise ValueError(f"{fn.__name__} did not issue a query")
+    return recorded[-1]
+
+
+# ------------------------------------------
+# Streaming variant (constant memory)
+# ------------------------------------------
+DEFAULT_CHUNK_SIZE = 5000
+
+
+@data_helper
+def stream_query(sql, params=None, chunk_size=DEFAULT_CHUNK_SIZE, as_arrow=False):
+    """
+    Generator version of run_query.
+    Uses an unbuffered (server-side streamed) cursor and yields chunks of at most
+    `chunk_size` rows as DataFrames (or pyarrow RecordBatches with as_arrow=True),
+    so only one chunk is held in memory regardless of the result size.
+    """
+    if as_arrow:
+        import pyarrow as pa
+
+    conn = get_db_connection(read_only=True)
+    if conn is None:
+        print("❌ Cannot connect to DB")
+        return
+
+    cursor = conn.cursor(buffered=False)
+    finished = False
+    try:
+        cursor.execute(sql, params)
+        columns = list(cursor.column_names)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                finished = True
+                break
+            df = pd.DataFrame.from_records(rows, columns=columns)
+            yield pa.RecordBatch.from_pandas(df, preserve_index=False) if as_arrow else df
+
+    except Exception as e:
+        print("❌ Query error:", e)
+        raise
+
+    finally:
+        try:
+            cursor.close()
+        except Exception:
+            # Consumer stopped early: the rest of the result is still on the wire.
+            # Discard the connection instead of draining it.
+            pass
+        if not finished:
+            conn.invalidate()
+        conn.close()
+
+
 # ------------------------------------------
 # CRUD QUERIES
 # ------------------------------------------
 
+@cached("Employees", "Departments")
 def get_employees():
     sql = """
         SELECT e.EmployeeID, e.Name, e.DateOfBirth, e.DepartmentID,
@@ -43,6 +127,7 @@ def get_employees():
     return run_query(sql)
 
 
+@cached("Departments")
 def get_departments():
     sql = """
         SELECT DepartmentID, DepartmentName
@@ -52,6 +137,7 @@ def get_departments():
     return run_query(sql)
 
 
+@cached("Projects", "Employees")
 def get_projects():
     sql = """
         SELECT p.ProjectID, p.ProjectName, p.ManagerEmployeeID,
@@ -64,10 +150,9 @@ def get_projects():
     return run_query(sql)
 
 
+@cached("Assignments", "Employees", "Projects")
 def get_assignments():
-    try:
-        conn = get_db_connection()
-        sql = """
+    sql = """
             SELECT 
                 a.EmployeeID,
                 e.Name AS EmployeeName,
@@ -79,25 +164,491 @@ def get_assignments():
             JOIN employee_manager_db.Employees e 
                 ON a.EmployeeID = e.EmployeeID
             JOIN employee_manager_db.Projects p
-                ON a.ProjectID = p.ProjectID;
+                ON a.ProjectID = p.ProjectID
+            ORDER BY a.EmployeeID, a.ProjectID
         """
+    return run_query(sql)
 
-        df = pd.read_sql(sql, conn)
-        return df
 
-    except Exception as e:
-        st.error(f"Error loading assignments: {e}")
-        return pd.DataFrame()
+# ------------------------------------------
+# KEYSET (SEEK) PAGINATION
+# ------------------------------------------
+DEFAULT_PAGE_SIZE = 50
 
-    finally:
-        conn.close()
+
+@data_helper
+def _keyset_page(sql, keys, where=None, params=(), after=None, before=None,
+                 limit=DEFAULT_PAGE_SIZE):
+    """
+    Run `sql` (a SELECT ... FROM ... without WHERE/ORDER BY) one page at a time.
+
+    keys:   list of (sql_expr, result_column) giving a unique sort order,
+            e.g. [("a.EmployeeID", "EmployeeID"), ("a.ProjectID", "ProjectID")]
+    after:  key tuple of the last row of the current page  -> next page
+    before: key tuple of the first row of the current page -> previous page
+
+    The cursor condition is a row comparison on the key columns, so MySQL seeks
+    straight to the page through the index instead of scanning OFFSET rows.
+    """
+    clauses = list(where or [])
+    params = list(params)
+    exprs = [expr for expr, _ in keys]
+    row = exprs[0] if len(exprs) == 1 else "(" + ", ".join(exprs) + ")"
+    marks = "%s" if len(exprs) == 1 else "(" + ", ".join(["%s"] * len(exprs)) + ")"
+
+    descending = before is not None and after is None
+    if after is not None:
+        clauses.append(f"{row} > {marks}")
+        params.extend(after)
+    elif before is not None:
+        clauses.append(f"{row} < {marks}")
+        params.extend(before)
+
+    direction = "DESC" if descending else "ASC"
+    sql = sql.rstrip()
+    if clauses:
+        sql += "\n        WHERE " + "\n          AND ".join(clauses)
+    sql += "\n        ORDER BY " + ", ".join(f"{expr} {direction}" for expr in exprs)
+    sql += "\n        LIMIT %s"
+    params.append(int(limit))
+
+    if descending:
+        # Fetched backwards from the cursor; restore ascending order in SQL, so
+        # callers that only run the statement (capture_sql: async, EXPLAIN) get it too
+        sql = (f"SELECT * FROM ({sql}\n        ) page\n"
+               f"        ORDER BY " + ", ".join(col for _, col in keys))
+    return run_query(sql, tuple(params))
+
+
+def page_bounds(df, key_columns):
+    """Return (first_key, last_key) tuples of a page, used as before/after cursors."""
+    if df.empty:
+        return None, None
+
+    def key(row):
+        # numpy scalars -> plain Python values the connector can bind
+        return tuple(getattr(row[col], "item", lambda: row[col])() for col in key_columns)
+
+    return key(df.iloc[0]), key(df.iloc[-1])
+
+
+EMPLOYEE_PAGE_KEYS = [("e.EmployeeID", "EmployeeID")]
+PROJECT_PAGE_KEYS = [("p.ProjectID", "ProjectID")]
+ASSIGNMENT_PAGE_KEYS = [("a.EmployeeID", "EmployeeID"), ("a.ProjectID", "ProjectID")]
+
+
+@cached("Employees", "Departments")
+def get_employees_page(after=None, before=None, limit=DEFAULT_PAGE_SIZE,
+                       department_id=None, name_prefix=None):
+    sql = """
+        SELECT e.EmployeeID, e.Name, e.DateOfBirth, e.DepartmentID,
+               d.DepartmentName
+        FROM employee_manager_db.Employees e
+        LEFT JOIN employee_manager_db.Departments d 
+               ON e.DepartmentID = d.DepartmentID
+    """
+    where, params = [], []
+    if department_id is not None:
+        where.append("e.DepartmentID = %s")
+        params.append(department_id)
+    if name_prefix:
+        where.append("e.Name LIKE %s")
+        params.append(_escape_like(name_prefix) + "%")
+    return _keyset_page(sql, EMPLOYEE_PAGE_KEYS, where, params, after, before, limit)
+
+
+@cached("Projects", "Employees")
+def get_projects_page(after=None, before=None, limit=DEFAULT_PAGE_SIZE,
+                      manager_id=None, name_prefix=None):
+    sql = """
+        SELECT p.ProjectID, p.ProjectName, p.ManagerEmployeeID,
+               e.Name AS ManagerName
+        FROM employee_manager_db.Projects p
+        LEFT JOIN employee_manager_db.Employees e 
+               ON p.ManagerEmployeeID = e.EmployeeID
+    """
+    where, params = [], []
+    if manager_id is not None:
+        where.append("p.ManagerEmployeeID = %s")
+        params.append(manager_id)
+    if name_prefix:
+        where.append("p.ProjectName LIKE %s")
+        params.append(_escape_like(name_prefix) + "%")
+    return _keyset_page(sql, PROJECT_PAGE_KEYS, where, params, after, before, limit)
+
+
+@cached("Assignments", "Employees", "Projects")
+def get_assignments_page(after=None, before=None, limit=DEFAULT_PAGE_SIZE,
+                         employee_id=None, project_id=None, role=None,
+                         min_salary=None, max_salary=None):
+    sql = """
+        SELECT a.EmployeeID,
+               e.Name AS EmployeeName,
+               a.ProjectID,
+               p.ProjectName,
+               a.Role,
+               a.Salary
+        FROM employee_manager_db.Assignments a
+        JOIN employee_manager_db.Employees e 
+            ON a.EmployeeID = e.EmployeeID
+        JOIN employee_manager_db.Projects p
+            ON a.ProjectID = p.ProjectID
+    """
+    where, params = [], []
+    if employee_id is not None:
+        where.append("a.EmployeeID = %s")
+        params.append(employee_id)
+    if project_id is not None:
+        where.append("a.ProjectID = %s")
+        params.append(project_id)
+    if role:
+        where.append("a.Role = %s")
+        params.append(role)
+    if min_salary is not None:
+        where.append("a.Salary >= %s")
+        params.append(min_salary)
+    if max_salary is not None:
+        where.append("a.Salary <= %s")
+        params.append(max_salary)
+    return _keyset_page(sql, ASSIGNMENT_PAGE_KEYS, where, params, after, before, limit)
+
+
+# ------------------------------------------
+# SELECT WIDGETS (the name search itself is search_index.py)
+# ------------------------------------------
+@cached("Employees")
+def get_employee_name(employee_id):
+    sql = """
+        SELECT EmployeeID, Name
+        FROM employee_manager_db.Employees
+        WHERE EmployeeID = %s
+    """
+    return run_query(sql, (int(employee_id),))
+
+
+# ------------------------------------------
+# GLOBAL SEARCH (composable server-side filters)
+# ------------------------------------------
+SEARCH_DEFAULT_LIMIT = 100
+SEARCH_MAX_LIMIT = 5000
+
+# Sortable result columns -> SQL expression (whitelist: never interpolate user input)
+SEARCH_SORT_COLUMNS = {
+    "EmployeeID": "e.EmployeeID",
+    "Name": "e.Name",
+    "DepartmentName": "d.DepartmentName",
+    "ProjectName": "p.ProjectName",
+    "Role": "a.Role",
+    "Salary": "a.Salary",
+    "ManagerName": "m.Name",
+}
+
+
+class Search:
+    """
+    Composable filter over Employees + Departments + Assignments + Projects
+    (+ manager). Every method returns a new Search, so filters can be combined
+    and reused:
+
+        base = Search().department(1, 2)
+        devs = base.role("Developer").salary_between(3000, None).order_by("Salary", desc=True)
+        df = devs.limit(50).run()
+
+    All predicates, the sort and the LIMIT are pushed into one parameterized
+    statement, so MySQL uses the indexes and only matching rows are returned.
+    """
+
+    SQL = """
+        SELECT e.EmployeeID, e.Name, e.DateOfBirth,
+               e.DepartmentID, d.DepartmentName,
+               a.ProjectID, p.ProjectName,
+               p.ManagerEmployeeID, m.Name AS ManagerName,
+               a.Role, a.Salary
+        FROM employee_manager_db.Employees e
+        LEFT JOIN employee_manager_db.Departments d
+               ON e.DepartmentID = d.DepartmentID
+        LEFT JOIN employee_manager_db.Assignments a
+               ON a.EmployeeID = e.EmployeeID
+        LEFT JOIN employee_manager_db.Projects p
+               ON a.ProjectID = p.ProjectID
+        LEFT JOIN employee_manager_db.Employees m
+               ON p.ManagerEmployeeID = m.EmployeeID
+    """
+
+    def __init__(self):
+        self._where = ()
+        self._params = ()
+        self._order = (("e.Name", "ASC"),)
+        self._limit = SEARCH_DEFAULT_LIMIT
+
+    def _copy(self, **changes):
+        other = Search.__new__(Search)
+        other.__dict__.update(self.__dict__)
+        other.__dict__.update(changes)
+        return other
+
+    def where(self, clause, *params):
+        """Add a raw predicate with %s placeholders (ANDed with the others)."""
+        return self._copy(_where=self._where + (clause,), _params=self._params + params)
+
+    def _in(self, expr, values):
+        values = tuple(v for v in values if v is not None and v != "")
+        if not values:
+            return self
+        if len(values) == 1:
+            return self.where(f"{expr} = %s", values[0])
+        return self.where(f"{expr} IN ({', '.join(['%s'] * len(values))})", *values)
+
+    # ---- filters ----
+    def name(self, text, contains=False):
+        """Employee name prefix (uses idx_employees_name); contains=True matches anywhere (scans)."""
+        if not text:
+            return self
+        pattern = _escape_like(text.strip()) + "%"
+        if contains:
+            pattern = "%" + pattern
+        return self.where("e.Name LIKE %s", pattern)
+
+    def department(self, *department_ids):
+        return self._in("e.DepartmentID", department_ids)
+
+    def project(self, *project_ids):
+        return self._in("a.ProjectID", project_ids)
+
+    def role(self, *roles):
+        return self._in("a.Role", roles)
+
+    def manager(self, *manager_ids):
+        return self._in("p.ManagerEmployeeID", manager_ids)
+
+    def salary_between(self, low=None, high=None):
+        q = self
+        if low is not None:
+            q = q.where("a.Salary >= %s", low)
+        if high is not None:
+            q = q.where("a.Salary <= %s", high)
+        return q
+
+    # ---- shape ----
+    def order_by(self, column, desc=False):
+        if column not in SEARCH_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by {column!r}; choose from {list(SEARCH_SORT_COLUMNS)}")
+        return self._copy(_order=((SEARCH_SORT_COLUMNS[column], "DESC" if desc else "ASC"),))
+
+    def limit(self, n):
+        return self._copy(_limit=max(1, min(int(n), SEARCH_MAX_LIMIT)))
+
+    def to_sql(self):
+        """(sql, params) of the statement run() will execute."""
+        sql = self.SQL.rstrip()
+        if self._where:
+            sql += "\n        WHERE " + "\n          AND ".join(self._where)
+        # EmployeeID / ProjectID break ties so the order (and LIMIT) is deterministic
+        order = [f"{expr} {direction}" for expr, direction in self._order]
+        order += ["e.EmployeeID", "a.ProjectID"]
+        sql += "\n        ORDER BY " + ", ".join(order)
+        sql += "\n        LIMIT %s"
+        return sql, self._params + (self._limit,)
+
+    def run(self):
+        sql, params = self.to_sql()
+        return _run_search(sql, params)
+
+
+def _escape_like(text):
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+@cached("Employees", "Departments", "Assignments", "Projects")
+def _run_search(sql, params):
+    return run_query(sql, params)
+
+
+def search_employees(name=None, department_ids=(), project_ids=(), roles=(),
+                     min_salary=None, max_salary=None, manager_ids=(),
+                     sort="Name", descending=False, limit=SEARCH_DEFAULT_LIMIT):
+    """Global Search in one call; see Search for composing filters step by step."""
+    return (
+        Search()
+        .name(name)
+        .department(*department_ids)
+        .project(*project_ids)
+        .role(*roles)
+        .salary_between(min_salary, max_salary)
+        .manager(*manager_ids)
+        .order_by(sort, descending)
+        .limit(limit)
+        .run()
+    )
+
+
+# ------------------------------------------
+# DASHBOARD AGGREGATES (trigger-maintained tables, see schema.sql)
+# ------------------------------------------
+HISTOGRAM_BUCKET_WIDTH = 5000  # must match FLOOR(Salary / 5000) in the triggers
+
+_has_aggregates = {}   # backend -> whether its schema has the aggregate tables
+
+
+def has_dashboard_aggregates():
+    """
+    True when the server has the trigger-maintained tables below. Checked once
+    per backend, so pages without them go straight to the live aggregates
+    instead of failing a query on every render.
+    """
+    server = connection.backend
+    if server not in _has_aggregates:
+        conn = get_db_connection()
+        if conn is None:
+            return False
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1 FROM employee_manager_db.SalaryTotals WHERE 1 = 0")
+            cursor.fetchall()
+            cursor.close()
+            _has_aggregates[server] = True
+        except Exception:
+            _has_aggregates[server] = False
+        finally:
+            conn.close()
+    return _has_aggregates[server]
+
+
+@cached("Assignments")
+def get_salary_totals():
+    sql = """
+        SELECT SalaryCount AS AssignmentCount,
+               SalarySum / NULLIF(SalaryCount, 0) AS AverageSalary
+        FROM employee_manager_db.SalaryTotals
+        WHERE TotalsID = 1
+    """
+    return run_query(sql)
+
+
+@cached("Assignments")
+def get_salary_histogram():
+    sql = """
+        SELECT Bucket * %s AS SalaryFrom,
+               (Bucket + 1) * %s AS SalaryTo,
+               AssignmentCount
+        FROM employee_manager_db.SalaryHistogram
+        ORDER BY Bucket
+    """
+    return run_query(sql, (HISTOGRAM_BUCKET_WIDTH, HISTOGRAM_BUCKET_WIDTH))
+
+
+@cached("Assignments")
+def get_role_counts():
+    sql = """
+        SELECT Role, AssignmentCount
+        FROM employee_manager_db.RoleCounts
+        ORDER BY AssignmentCount DESC, Role
+    """
+    return run_query(sql)
+
+
+@cached("Assignments", "Employees")
+def get_top_employees_by_avg_salary(limit=10):
+    sql = """
+        SELECT t.EmployeeID,
+               e.Name AS EmployeeName,
+               t.SalarySum / t.SalaryCount AS Salary
+        FROM employee_manager_db.EmployeeSalaryTotals t
+        JOIN employee_manager_db.Employees e
+            ON t.EmployeeID = e.EmployeeID
+        ORDER BY Salary DESC
+        LIMIT %s
+    """
+    return run_query(sql, (int(limit),))
+
+
+# ------------------------------------------
+# SQL-SIDE AGGREGATES (computed live by MySQL, only the result travels)
+# ------------------------------------------
+
+@cached("Employees", "Departments", "Projects", "Assignments")
+def count_all_tables():
+    sql = """
+        SELECT (SELECT COUNT(*) FROM employee_manager_db.Employees)   AS Employees,
+               (SELECT COUNT(*) FROM employee_manager_db.Departments) AS Departments,
+               (SELECT COUNT(*) FROM employee_manager_db.Projects)    AS Projects,
+               (SELECT COUNT(*) FROM employee_manager_db.Assignments) AS Assignments
+    """
+    return run_query(sql)
+
+
+@cached("Assignments")
+def salary_summary():
+    sql = """
+        SELECT COUNT(*)    AS AssignmentCount,
+               AVG(Salary) AS AverageSalary,
+               MIN(Salary) AS MinSalary,
+               MAX(Salary) AS MaxSalary
+        FROM employee_manager_db.Assignments
+    """
+    return run_query(sql)
+
+
+@cached("Assignments")
+def salary_histogram(bins=10):
+    """
+    width_bucket-style histogram: `bins` equal-width buckets between MIN and MAX
+    salary, the maximum value falling in the last bucket (same as np.histogram).
+    When every salary is equal the range is MIN +/- 0.5, also as np.histogram.
+    """
+    sql = """
+        WITH Bounds AS (
+            SELECT CASE WHEN MAX(Salary) > MIN(Salary) THEN MIN(Salary) ELSE MIN(Salary) - 0.5 END AS Lo,
+                   CASE WHEN MAX(Salary) > MIN(Salary) THEN (MAX(Salary) - MIN(Salary)) / %s
+                        ELSE 1.0 / %s END AS Width
+            FROM employee_manager_db.Assignments
+        ),
+        Bucketed AS (
+            SELECT LEAST(COALESCE(FLOOR((a.Salary - b.Lo) / NULLIF(b.Width, 0)), 0), %s - 1) AS Bucket
+            FROM employee_manager_db.Assignments a, Bounds b
+        )
+        SELECT k.Bucket,
+               b.Lo + k.Bucket * b.Width       AS SalaryFrom,
+               b.Lo + (k.Bucket + 1) * b.Width AS SalaryTo,
+               k.AssignmentCount
+        FROM (SELECT Bucket, COUNT(*) AS AssignmentCount FROM Bucketed GROUP BY Bucket) k, Bounds b
+        ORDER BY k.Bucket
+    """
+    return run_query(sql, (int(bins), int(bins), int(bins)))
+
+
+@cached("Assignments")
+def role_distribution():
+    sql = """
+        SELECT Role, COUNT(*) AS AssignmentCount
+        FROM employee_manager_db.Assignments
+        GROUP BY Role
+        ORDER BY AssignmentCount DESC, Role
+    """
+    return run_query(sql)
+
+
+@cached("Assignments", "Employees")
+def top_employees_by_avg_salary(limit=10):
+    sql = """
+        SELECT a.EmployeeID,
+               e.Name AS EmployeeName,
+               AVG(a.Salary) AS Salary
+        FROM employee_manager_db.Assignments a
+        JOIN employee_manager_db.Employees e
+            ON a.EmployeeID = e.EmployeeID
+        GROUP BY a.EmployeeID, e.Name
+        ORDER BY Salary DESC
+        LIMIT %s
+    """
+    return run_query(sql, (int(limit),))
 
 
 # ------------------------------------------
 # COMPLEX JOINS
 # ------------------------------------------
 
-def inner_join_per_project():
+def inner_join_per_project(stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
     sql = """
         SELECT e.Name AS EmployeeName,
                p.ProjectName,
@@ -110,10 +661,12 @@ def inner_join_per_project():
                ON a.ProjectID = p.ProjectID
         ORDER BY p.ProjectID, e.EmployeeID
     """
+    if stream:
+        return stream_query(sql, chunk_size=chunk_size)
     return run_query(sql)
 
 
-def left_join_all_employees():
+def left_join_all_employees(stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
     sql = """
         SELECT e.EmployeeID, e.Name, d.DepartmentName,
                a.Role, a.Salary, p.ProjectName
@@ -126,10 +679,12 @@ def left_join_all_employees():
                ON a.ProjectID = p.ProjectID
         ORDER BY e.EmployeeID
     """
+    if stream:
+        return stream_query(sql, chunk_size=chunk_size)
     return run_query(sql)
 
 
-def multi_table_join_with_manager():
+def multi_table_join_with_manager(stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
     sql = """
         SELECT e.Name AS EmployeeName,
                p.ProjectName,
@@ -145,10 +700,12 @@ def multi_table_join_with_manager():
                ON p.ManagerEmployeeID = m.EmployeeID
         ORDER BY p.ProjectID, e.EmployeeID
     """
+    if stream:
+        return stream_query(sql, chunk_size=chunk_size)
     return run_query(sql)
 
 
-def above_global_average():
+def above_global_average(stream=False, chunk_size=DEFAULT_CHUNK_SIZE):
     sql = """
         WITH GlobalAvg AS (
             SELECT AVG(Salary) AS GAvg 
@@ -168,4 +725,6 @@ def above_global_average():
         WHERE EmpAverage > GAvg
         ORDER BY EmpAverage DESC
     """
-    return run_query(sql)
\ No newline at end of file
+    if stream:
+        return stream_query(sql, chunk_size=chunk_size)
+    return run_query(sql)
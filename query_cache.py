@@ -0,0 +1,272 @@
+# query_cache.py
+
+import functools
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Writes to a parent table also change rows in these tables (FK ON DELETE CASCADE / SET NULL)
+CASCADES = {
+    "employees": ("assignments", "projects"),
+    "projects": ("assignments",),
+    "departments": (),
+    "assignments": (),
+}
+
+_WRITE_TABLE_RE = re.compile(
+    r"^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE\s+(?:TABLE\s+)?)\s+"
+    r"(?:`?\w+`?\.)?`?(\w+)`?",
+    re.IGNORECASE,
+)
+
+
+def _table(name):
+    return name.split(".")[-1].strip("`").lower()
+
+
+class QueryCache:
+    """
+    Versioned read-through cache with TTL and LRU eviction.
+
+    Every cached entry is keyed on the current version of the tables it reads.
+    A write bumps the version of the tables it touches, so stale entries are
+    never served again and simply age out of the LRU.
+    """
+
+    def __init__(self, max_entries=128, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._versions = {}
+        self._written_at = {}           # table -> monotonic time of its last invalidate
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, table):
+        return self._versions.get(_table(table), 0)
+
+    def versions(self, tables):
+        return tuple(self.version(t) for t in tables)
+
+    def invalidate(self, *tables):
+        with self._lock:
+            pending = [_table(t) for t in tables]
+            seen = set()
+            while pending:
+                table = pending.pop()
+                if table in seen:
+                    continue
+                seen.add(table)
+                self._versions[table] = self._versions.get(table, 0) + 1
+                self._written_at[table] = time.monotonic()
+                pending.extend(CASCADES.get(table, ()))
+
+    def written_within(self, tables, seconds):
+        """True if one of `tables` was invalidated less than `seconds` ago."""
+        since = time.monotonic() - seconds
+        return any(self._written_at.get(_table(t), float("-inf")) > since for t in tables)
+
+    def lookup(self, key, tables):
+        """Return (True, value) on a fresh hit, (False, None) otherwise."""
+        key = (key, self.versions(tables))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, None
+
+    def store(self, key, tables, value, versions=None):
+        """
+        Cache `value`. Pass the `versions` read before loading so a result that
+        raced with a write is filed under the old (already stale) versions.
+        """
+        if _is_empty(value):
+            return
+        key = (key, self.versions(tables) if versions is None else versions)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key, tables, loader, fresh=False):
+        """
+        Cached value, or loader()'s result (then cached). fresh=True skips the
+        lookup. A result read on a replica (see note_replica_read) is not
+        cached while one of `tables` was written within the replica's lag:
+        it may predate that write yet would be filed under its version.
+        """
+        versions = self.versions(tables)
+        if not fresh:
+            hit, value = self.lookup(key, tables)
+            if hit:
+                return value
+        reads = []
+        token = _replica_reads.set(reads)
+        try:
+            value = loader()
+        finally:
+            _replica_reads.reset(token)
+        if reads and self.written_within(tables, max(reads)):
+            return value
+        self.store(key, tables, value, versions)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": (self.hits / total) if total else 0.0,
+                "table_versions": dict(self._versions),
+            }
+
+
+def _is_empty(value):
+    # Empty results are cheap to re-read and may just be a failed query: never cache them
+    empty = getattr(value, "empty", None)
+    return bool(empty) if empty is not None else not value
+
+
+def _copy(value):
+    # Callers mutate DataFrames (e.g. df["pair"] = ...); never hand out the cached object
+    return value.copy() if hasattr(value, "copy") else value
+
+
+_cache = QueryCache()
+_bypass = ContextVar("cache_bypass", default=False)
+# Max lag of the replicas read by the loader running in this context (see note_replica_read)
+_replica_reads = ContextVar("cache_replica_reads", default=None)
+# check() -> True when the current session must not be served cached results
+_fresh_read_checks = []
+
+
+def get_cache():
+    return _cache
+
+
+def cached(*tables):
+    """
+    Decorator for read functions in queries.py:
+
+        @cached("Employees", "Departments")
+        def get_employees(): ...
+
+    The result is served from memory until one of `tables` is written to.
+    A session that must read its own writes (see add_fresh_read_check) always
+    loads, and its result refreshes the cache.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _bypass.get():
+                return fn(*args, **kwargs)
+            key = cache_key(fn, args, kwargs)
+            return _copy(_cache.get_or_load(key, tables, lambda: fn(*args, **kwargs), fresh=fresh_read_required()))
+        wrapper.tables = tables
+        return wrapper
+    return decorator
+
+
+def cache_key(fn, args, kwargs):
+    """Key under which @cached stores fn(*args, **kwargs)."""
+    fn = getattr(fn, "__wrapped__", fn)
+    return (fn.__module__, fn.__qualname__, args, tuple(sorted(kwargs.items())))
+
+
+@contextmanager
+def bypass_cache():
+    """Inside this block @cached functions always call through to the database."""
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def add_fresh_read_check(check):
+    """
+    check() -> True when the current session must bypass cached results, e.g.
+    replicas.py while the session is pinned to the primary after a write.
+    """
+    _fresh_read_checks.append(check)
+
+
+def remove_fresh_read_check(check):
+    if check in _fresh_read_checks:
+        _fresh_read_checks.remove(check)
+
+
+def fresh_read_required():
+    """True when the current session must not be served cached results."""
+    return any(check() for check in list(_fresh_read_checks))
+
+
+def note_replica_read(lag):
+    """
+    Called when a read is served by a replica that may lag up to `lag`
+    seconds behind the primary. A @cached load that did so is not cached
+    for tables written within that lag.
+    """
+    reads = _replica_reads.get()
+    if reads is not None:
+        reads.append(lag)
+
+
+# Called with the written tables after every invalidate (see add_write_listener)
+_write_listeners = []
+
+
+def add_write_listener(listener):
+    """
+    Call listener(tables) whenever a committed write is reported through
+    invalidate() / invalidate_for_sql(), in the writer's thread and context.
+    """
+    _write_listeners.append(listener)
+
+
+def remove_write_listener(listener):
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def _notify(tables):
+    for listener in list(_write_listeners):
+        try:
+            listener(tables)
+        except Exception as e:
+            print("❌ Write listener failed:", e)
+
+
+def invalidate(*tables):
+    """Call after committing a write to `tables`."""
+    _cache.invalidate(*tables)
+    _notify(tables)
+
+
+def written_table(sql):
+    """Table written by an INSERT/UPDATE/DELETE/TRUNCATE statement, None for anything else."""
+    match = _WRITE_TABLE_RE.match(sql)
+    return match.group(1) if match else None
+
+
+def invalidate_for_sql(sql):
+    """Invalidate the table written by an INSERT/UPDATE/DELETE statement (no-op for SELECT)."""
+    table = written_table(sql)
+    if table:
+        invalidate(table)
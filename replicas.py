@@ -0,0 +1,242 @@
+# replicas.py
+#
+# Read/write splitting. get_db_connection(read_only=True) - used by the
+# SELECTs in queries.py and the services' get_all_* methods - asks the
+# ReplicaRouter for a connection to one of the read replicas configured in
+# DB_REPLICAS; everything else (writes, transactions, KILL) stays on the
+# primary.
+#
+#   round_robin    - replicas take turns
+#   least_latency  - the replica with the lowest smoothed SELECT 1 round trip
+#
+# Read-your-writes: replicas lag behind the primary, so once a session has
+# written (any invalidate() / invalidate_for_sql() after a commit) its reads
+# go to the primary for pin_seconds. A session is one browser session in the
+# app (main.py calls set_session); code outside a session shares DEFAULT_SESSION.
+# The query cache is shared by all sessions: a pinned session bypasses it,
+# and a result another session read on a replica is not cached for tables
+# written within pin_seconds (it could predate the write).
+#
+# A replica that fails to connect or to answer the probe is skipped for
+# RETRY_AFTER seconds; with no replica available reads fall back to the primary.
+
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from db_pool import ConnectionPool
+from query_cache import (add_fresh_read_check, add_write_listener, note_replica_read,
+                         remove_fresh_read_check, remove_write_listener)
+
+ROUND_ROBIN = "round_robin"
+LEAST_LATENCY = "least_latency"
+STRATEGIES = (ROUND_ROBIN, LEAST_LATENCY)
+
+PIN_SECONDS = 5.0         # reads stay on the primary this long after the session writes
+PROBE_INTERVAL = 10.0     # seconds between latency probes of a replica
+RETRY_AFTER = 30.0        # seconds a failed replica is left out
+LATENCY_SMOOTHING = 0.3   # weight of the newest probe in the moving average
+
+DEFAULT_SESSION = "default"
+_session = ContextVar("db_session", default=DEFAULT_SESSION)
+
+
+def current_session():
+    return _session.get()
+
+
+def set_session(key):
+    """Make `key` the session of the current context (thread / script run)."""
+    return _session.set(key)
+
+
+@contextmanager
+def use_session(key):
+    token = _session.set(key)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+
+
+class Replica:
+    """One read replica: its backend, its own pool and health / latency state."""
+
+    def __init__(self, name, backend, pool_config):
+        self.name = name
+        self.backend = backend
+        self.pool = ConnectionPool(backend.connect, **pool_config)
+        self.latency_ms = None     # smoothed probe round trip, None until probed
+        self.down_until = 0.0
+        self.last_error = None
+        self.reads = 0
+        self.failures = 0
+        self._probe_conn = None
+        self._probed_at = 0.0
+        self._probe_lock = threading.Lock()
+
+    def available(self, now):
+        return now >= self.down_until
+
+    def mark_down(self, error, now=None):
+        self.down_until = (now if now is not None else time.monotonic()) + RETRY_AFTER
+        self.last_error = str(error)
+        self.failures += 1
+        self._close_probe()
+
+    def due_for_probe(self, now):
+        return now - self._probed_at >= PROBE_INTERVAL
+
+    def probe(self):
+        """
+        Time a SELECT 1 on a dedicated, unpooled connection (kept out of the
+        profiling stats). Raises on failure. One thread probes at a time.
+        """
+        if not self._probe_lock.acquire(blocking=False):
+            return
+        try:
+            self._probed_at = time.monotonic()
+            if self._probe_conn is None:
+                self._probe_conn = self.backend.connect()
+            start = time.perf_counter()
+            cursor = self._probe_conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchall()
+            finally:
+                cursor.close()
+            ms = (time.perf_counter() - start) * 1000
+            if self.latency_ms is None:
+                self.latency_ms = ms
+            else:
+                self.latency_ms += LATENCY_SMOOTHING * (ms - self.latency_ms)
+        except Exception:
+            self._close_probe()
+            raise
+        finally:
+            self._probe_lock.release()
+
+    def _close_probe(self):
+        conn, self._probe_conn = self._probe_conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def stats(self, now=None):
+        now = now if now is not None else time.monotonic()
+        return {
+            "name": self.name,
+            "up": self.available(now),
+            "latency_ms": self.latency_ms,
+            "reads": self.reads,
+            "failures": self.failures,
+            "last_error": self.last_error,
+            "pool": self.pool.stats(),
+        }
+
+    def close(self):
+        self._close_probe()
+        self.pool.close_all()
+
+
+class ReplicaRouter:
+    """
+    Picks the connection for a read. `replicas` is [(name, backend)];
+    acquire() returns a pooled replica connection, or None when the read must
+    go to the primary (session pinned after a write, or no replica available).
+    """
+
+    def __init__(self, replicas, pool_config, strategy=ROUND_ROBIN, pin_seconds=PIN_SECONDS):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown read strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+        self.replicas = [Replica(name, backend, pool_config) for name, backend in replicas]
+        self.strategy = strategy
+        self.pin_seconds = pin_seconds
+        self._pins = {}            # session -> monotonic time the pin ends
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+        self.pinned_reads = 0
+        self.fallback_reads = 0
+        add_write_listener(self._written)
+        add_fresh_read_check(self.pinned)
+
+    # ---- read-your-writes ----
+    def _written(self, tables):
+        self.pin()
+
+    def pin(self, session=None):
+        """Send the reads of `session` (default: current) to the primary for pin_seconds."""
+        session = session if session is not None else current_session()
+        now = time.monotonic()
+        with self._lock:
+            self._pins[session] = now + self.pin_seconds
+            if len(self._pins) > 1000:
+                self._pins = {s: until for s, until in self._pins.items() if until > now}
+
+    def pinned(self, session=None):
+        session = session if session is not None else current_session()
+        with self._lock:
+            until = self._pins.get(session)
+            if until is None:
+                return False
+            if until <= time.monotonic():
+                del self._pins[session]
+                return False
+            return True
+
+    # ---- routing ----
+    def _candidates(self, now):
+        up = [r for r in self.replicas if r.available(now)]
+        if self.strategy == LEAST_LATENCY:
+            # not yet probed first, so every replica gets measured
+            return sorted(up, key=lambda r: -1.0 if r.latency_ms is None else r.latency_ms)
+        if not up:
+            return up
+        start = next(self._turn) % len(up)
+        return up[start:] + up[:start]
+
+    def acquire(self):
+        if self.pinned():
+            with self._lock:
+                self.pinned_reads += 1
+            return None
+        now = time.monotonic()
+        for replica in self._candidates(now):
+            try:
+                if replica.due_for_probe(now):
+                    replica.probe()
+                conn = replica.pool.acquire()
+            except Exception as err:   # driver / pool errors alike: skip this replica for a while
+                print(f"❌ Replica {replica.name} unavailable:", err)
+                replica.mark_down(err, now)
+                continue
+            replica.reads += 1
+            conn.backend = replica.backend
+            note_replica_read(self.pin_seconds)
+            return conn
+        with self._lock:
+            self.fallback_reads += 1
+        return None
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            pinned = sum(1 for until in self._pins.values() if until > now)
+        return {
+            "strategy": self.strategy,
+            "pin_seconds": self.pin_seconds,
+            "pinned_sessions": pinned,
+            "pinned_reads": self.pinned_reads,
+            "fallback_reads": self.fallback_reads,
+            "replicas": [r.stats(now) for r in self.replicas],
+        }
+
+    def close(self):
+        remove_write_listener(self._written)
+        remove_fresh_read_check(self.pinned)
+        for replica in self.replicas:
+            replica.close()
@@ -7,6 +7,11 @@ USE employee_manager_db;
 
 -- Drop old tables if they exist (to ensure a clean run)
 -- Must drop in reverse order of foreign key dependencies
+DROP TABLE IF EXISTS ChangeOutbox;
+DROP TABLE IF EXISTS SalaryHistogram;
+DROP TABLE IF EXISTS RoleCounts;
+DROP TABLE IF EXISTS EmployeeSalaryTotals;
+DROP TABLE IF EXISTS SalaryTotals;
 DROP TABLE IF EXISTS Assignments;
 DROP TABLE IF EXISTS Projects;
 DROP TABLE IF EXISTS Employees;
@@ -32,7 +37,11 @@ CREATE TABLE Employees (
     DepartmentID INT NOT NULL,
     
     -- Foreign Key constraint: Each employee must belong to an existing department
-    FOREIGN KEY (DepartmentID) REFERENCES Departments(DepartmentID) ON DELETE RESTRICT
+    FOREIGN KEY (DepartmentID) REFERENCES Departments(DepartmentID) ON DELETE RESTRICT,
+
+    -- Department filter + name listing; name prefix search (see migrations/001)
+    INDEX idx_employees_department_name (DepartmentID, Name),
+    INDEX idx_employees_name (Name)
 );
 
 -- =================================================================
@@ -68,5 +77,181 @@ CREATE TABLE Assignments (
     FOREIGN KEY (EmployeeID) REFERENCES Employees(EmployeeID) ON DELETE CASCADE,
     
     -- Foreign Key 2: ProjectID must exist
-    FOREIGN KEY (ProjectID) REFERENCES Projects(ProjectID) ON DELETE CASCADE
+    FOREIGN KEY (ProjectID) REFERENCES Projects(ProjectID) ON DELETE CASCADE,
+
+    -- Covering indexes for the query screens (see migrations/001)
+    INDEX idx_assignments_project_employee (ProjectID, EmployeeID, Role, Salary),
+    INDEX idx_assignments_role_salary (Role, Salary),
+    INDEX idx_assignments_salary (Salary)
+);
+
+-- =================================================================
+-- 5. DASHBOARD AGGREGATES (materialized, maintained by triggers)
+-- Kept up to date on every Assignment insert/update/delete so the
+-- Dashboard reads a handful of rows instead of scanning Assignments.
+-- =================================================================
+
+-- Global salary sum/count (single row, TotalsID = 1)
+CREATE TABLE SalaryTotals (
+    TotalsID TINYINT PRIMARY KEY,
+    SalarySum DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    SalaryCount INT NOT NULL DEFAULT 0
+);
+INSERT INTO SalaryTotals (TotalsID) VALUES (1);
+
+-- Per-employee salary sum/count (average = SalarySum / SalaryCount)
+CREATE TABLE EmployeeSalaryTotals (
+    EmployeeID INT PRIMARY KEY,
+    SalarySum DECIMAL(18, 2) NOT NULL DEFAULT 0,
+    SalaryCount INT NOT NULL DEFAULT 0
+);
+
+-- Number of assignments per role
+CREATE TABLE RoleCounts (
+    Role VARCHAR(50) PRIMARY KEY,
+    AssignmentCount INT NOT NULL DEFAULT 0
+);
+
+-- Salary histogram: Bucket = FLOOR(Salary / 5000), i.e. [Bucket*5000, Bucket*5000 + 5000)
+CREATE TABLE SalaryHistogram (
+    Bucket INT PRIMARY KEY,
+    AssignmentCount INT NOT NULL DEFAULT 0
+);
+
+DROP PROCEDURE IF EXISTS ApplyAssignmentDelta;
+DROP PROCEDURE IF EXISTS RemoveAssignmentAggregates;
+DROP PROCEDURE IF EXISTS RebuildDashboardAggregates;
+
+DELIMITER $$
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one assignment from every aggregate.
+-- Bulk loads SET @skip_dashboard_aggregates = 1 and rebuild once at the end.
+CREATE PROCEDURE ApplyAssignmentDelta(
+    IN p_employee_id INT, IN p_role VARCHAR(50), IN p_salary DECIMAL(10, 2), IN p_sign INT
+)
+proc: BEGIN
+    IF @skip_dashboard_aggregates = 1 THEN
+        LEAVE proc;
+    END IF;
+
+    UPDATE SalaryTotals
+    SET SalarySum = SalarySum + p_sign * p_salary,
+        SalaryCount = SalaryCount + p_sign
+    WHERE TotalsID = 1;
+
+    INSERT INTO EmployeeSalaryTotals (EmployeeID, SalarySum, SalaryCount)
+    VALUES (p_employee_id, p_sign * p_salary, p_sign)
+    ON DUPLICATE KEY UPDATE
+        SalarySum = SalarySum + VALUES(SalarySum),
+        SalaryCount = SalaryCount + VALUES(SalaryCount);
+    DELETE FROM EmployeeSalaryTotals WHERE EmployeeID = p_employee_id AND SalaryCount = 0;
+
+    INSERT INTO RoleCounts (Role, AssignmentCount)
+    VALUES (p_role, p_sign)
+    ON DUPLICATE KEY UPDATE AssignmentCount = AssignmentCount + VALUES(AssignmentCount);
+    DELETE FROM RoleCounts WHERE Role = p_role AND AssignmentCount = 0;
+
+    INSERT INTO SalaryHistogram (Bucket, AssignmentCount)
+    VALUES (FLOOR(p_salary / 5000), p_sign)
+    ON DUPLICATE KEY UPDATE AssignmentCount = AssignmentCount + VALUES(AssignmentCount);
+    DELETE FROM SalaryHistogram WHERE Bucket = FLOOR(p_salary / 5000) AND AssignmentCount = 0;
+END$$
+
+-- FK cascades do not fire triggers, so parent deletes subtract their assignments first
+CREATE PROCEDURE RemoveAssignmentAggregates(IN p_employee_id INT, IN p_project_id INT)
+proc: BEGIN
+    DECLARE done INT DEFAULT 0;
+    DECLARE v_employee_id INT;
+    DECLARE v_role VARCHAR(50);
+    DECLARE v_salary DECIMAL(10, 2);
+    DECLARE cur CURSOR FOR
+        SELECT EmployeeID, Role, Salary
+        FROM Assignments
+        WHERE (p_employee_id IS NULL OR EmployeeID = p_employee_id)
+          AND (p_project_id IS NULL OR ProjectID = p_project_id);
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = 1;
+
+    IF @skip_dashboard_aggregates = 1 THEN
+        LEAVE proc;
+    END IF;
+
+    OPEN cur;
+    read_loop: LOOP
+        FETCH cur INTO v_employee_id, v_role, v_salary;
+        IF done THEN
+            LEAVE read_loop;
+        END IF;
+        CALL ApplyAssignmentDelta(v_employee_id, v_role, v_salary, -1);
+    END LOOP;
+    CLOSE cur;
+END$$
+
+-- Full recompute (after bulk loads / TRUNCATE, which bypass triggers)
+CREATE PROCEDURE RebuildDashboardAggregates()
+BEGIN
+    DELETE FROM EmployeeSalaryTotals;
+    DELETE FROM RoleCounts;
+    DELETE FROM SalaryHistogram;
+
+    UPDATE SalaryTotals t
+    JOIN (SELECT COALESCE(SUM(Salary), 0) AS s, COUNT(*) AS c FROM Assignments) a
+    SET t.SalarySum = a.s, t.SalaryCount = a.c
+    WHERE t.TotalsID = 1;
+
+    INSERT INTO EmployeeSalaryTotals (EmployeeID, SalarySum, SalaryCount)
+    SELECT EmployeeID, SUM(Salary), COUNT(*) FROM Assignments GROUP BY EmployeeID;
+
+    INSERT INTO RoleCounts (Role, AssignmentCount)
+    SELECT Role, COUNT(*) FROM Assignments GROUP BY Role;
+
+    INSERT INTO SalaryHistogram (Bucket, AssignmentCount)
+    SELECT FLOOR(Salary / 5000), COUNT(*) FROM Assignments GROUP BY FLOOR(Salary / 5000);
+END$$
+
+CREATE TRIGGER trg_assignments_after_insert
+AFTER INSERT ON Assignments FOR EACH ROW
+BEGIN
+    CALL ApplyAssignmentDelta(NEW.EmployeeID, NEW.Role, NEW.Salary, 1);
+END$$
+
+CREATE TRIGGER trg_assignments_after_update
+AFTER UPDATE ON Assignments FOR EACH ROW
+BEGIN
+    CALL ApplyAssignmentDelta(OLD.EmployeeID, OLD.Role, OLD.Salary, -1);
+    CALL ApplyAssignmentDelta(NEW.EmployeeID, NEW.Role, NEW.Salary, 1);
+END$$
+
+CREATE TRIGGER trg_assignments_after_delete
+AFTER DELETE ON Assignments FOR EACH ROW
+BEGIN
+    CALL ApplyAssignmentDelta(OLD.EmployeeID, OLD.Role, OLD.Salary, -1);
+END$$
+
+CREATE TRIGGER trg_employees_before_delete
+BEFORE DELETE ON Employees FOR EACH ROW
+BEGIN
+    CALL RemoveAssignmentAggregates(OLD.EmployeeID, NULL);
+END$$
+
+CREATE TRIGGER trg_projects_before_delete
+BEFORE DELETE ON Projects FOR EACH ROW
+BEGIN
+    CALL RemoveAssignmentAggregates(NULL, OLD.ProjectID);
+END$$
+
+DELIMITER ;
+
+-- =================================================================
+-- 6. CHANGE OUTBOX (change-data-capture, see changefeed.py)
+-- Every write also inserts its typed change event here, in the same
+-- transaction; the relay delivers new rows to in-process subscribers
+-- (query cache, search index, analytics snapshot) in EventID order.
+-- =================================================================
+CREATE TABLE ChangeOutbox (
+    EventID BIGINT PRIMARY KEY AUTO_INCREMENT,
+    EventType VARCHAR(40) NOT NULL,      -- EmployeeUpdated, AssignmentDeleted, ...
+    EntityKey TEXT NOT NULL,             -- JSON: primary key, or the WHERE columns, or {} (whole table)
+    Payload TEXT NOT NULL,               -- JSON: changed column values
+    Origin VARCHAR(32) NOT NULL,         -- writing process (changefeed.ORIGIN)
+    CreatedAt TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
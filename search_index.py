@@ -0,0 +1,253 @@
+# search_index.py
+#
+# In-process name search for type-ahead: prefix and fuzzy (trigram) lookup
+# over Employees.Name and Projects.ProjectName, ranked, top-K in well under
+# a millisecond. A LIKE '%x%' in MySQL would scan the table on every keystroke.
+#
+# The indexes are built from queries.get_employees() / get_projects() on
+# first use (read on the primary: a lagging replica could miss the write
+# that triggered a rebuild) and kept in sync on writes:
+#   - row-level change events from the change feed (changefeed.py: the
+#     services, the unit of work, other processes) update the index in place;
+#   - any other write (raw SQL in main.py, bulk loads) bumps the query cache
+#     version of the table, and the index is rebuilt on the next search.
+
+import bisect
+import heapq
+import threading
+import unicodedata
+from collections import defaultdict
+
+import changefeed
+from connection import read_from_primary
+from query_cache import get_cache
+
+DEFAULT_LIMIT = 10
+TYPEAHEAD_LIMIT = 20      # names offered by a picker (main.py)
+MIN_FUZZY_SCORE = 0.3
+MAX_PREFIX_SCAN = 20000   # bound the work for one- or two-letter queries
+
+
+def normalize(text):
+    """Lower-case and strip accents: 'Nguyễn Đức' -> 'nguyen duc'."""
+    text = str(text).lower().replace("đ", "d")
+    text = unicodedata.normalize("NFKD", text)
+    return "".join(ch for ch in text if not unicodedata.combining(ch)).strip()
+
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex:
+    """
+    Prefix + trigram index over (id, name) pairs.
+
+    - prefix: a sorted list of (token, id) searched with bisect, matching the
+      start of the full name or of any word in it;
+    - fuzzy: trigram posting lists scored by Jaccard similarity, for typos.
+    """
+
+    def __init__(self, pairs=()):
+        self._names = {}                  # id -> (name, normalized, trigram count)
+        self._tokens = []                 # sorted (token, id)
+        self._grams = defaultdict(set)    # trigram -> ids
+        self._lock = threading.RLock()
+        for key, name in pairs:
+            self._insert(key, name, bulk=True)
+        self._tokens.sort()
+
+    def __len__(self):
+        return len(self._names)
+
+    # ---- maintenance ----
+    def _insert(self, key, name, bulk=False):
+        norm = normalize(name)
+        grams = _trigrams(norm)
+        self._names[key] = (name, norm, len(grams))
+        for token in {norm} | set(norm.split()):
+            if bulk:
+                self._tokens.append((token, key))
+            else:
+                bisect.insort(self._tokens, (token, key))
+        for gram in grams:
+            self._grams[gram].add(key)
+
+    def add(self, key, name):
+        """Insert or replace the name of `key`."""
+        with self._lock:
+            self.remove(key)
+            self._insert(key, name)
+
+    def remove(self, key):
+        with self._lock:
+            entry = self._names.pop(key, None)
+            if entry is None:
+                return
+            norm = entry[1]
+            for token in {norm} | set(norm.split()):
+                i = bisect.bisect_left(self._tokens, (token, key))
+                if i < len(self._tokens) and self._tokens[i] == (token, key):
+                    del self._tokens[i]
+            for gram in _trigrams(norm):
+                ids = self._grams.get(gram)
+                if ids is not None:
+                    ids.discard(key)
+                    if not ids:
+                        del self._grams[gram]
+
+    # ---- lookup ----
+    def prefix(self, text, limit=DEFAULT_LIMIT):
+        """[(key, name, score)] whose full name or any word starts with `text`."""
+        query = normalize(text)
+        if not query:
+            return []
+        with self._lock:
+            scores = {}
+            i = bisect.bisect_left(self._tokens, (query,))
+            end = min(len(self._tokens), i + MAX_PREFIX_SCAN)
+            while i < end and self._tokens[i][0].startswith(query):
+                key = self._tokens[i][1]
+                full = self._names[key][1]
+                # whole-name prefix beats word prefix; shorter (closer) names first
+                score = (2.0 if full.startswith(query) else 1.0) + len(query) / len(full)
+                scores[key] = max(scores.get(key, 0.0), score)
+                i += 1
+            return self._top(scores, limit)
+
+    def fuzzy(self, text, limit=DEFAULT_LIMIT, min_score=MIN_FUZZY_SCORE):
+        """[(key, name, score)] ranked by trigram similarity (tolerates typos)."""
+        query = normalize(text)
+        if not query:
+            return []
+        grams = _trigrams(query)
+        with self._lock:
+            common = defaultdict(int)
+            for gram in grams:
+                for key in self._grams.get(gram, ()):
+                    common[key] += 1
+            scores = {}
+            for key, shared in common.items():
+                other = self._names[key][2]
+                score = shared / (len(grams) + other - shared)
+                if score >= min_score:
+                    scores[key] = score
+            return self._top(scores, limit)
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        """Prefix matches first, topped up with fuzzy matches."""
+        results = self.prefix(text, limit)
+        if len(results) < limit:
+            seen = {key for key, _, _ in results}
+            for key, name, score in self.fuzzy(text, limit):
+                if key not in seen:
+                    results.append((key, name, score))
+                    if len(results) >= limit:
+                        break
+        return results
+
+    def _top(self, scores, limit):
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -_order(item[0])))
+        return [(key, self._names[key][0], score) for key, score in best]
+
+
+def _order(key):
+    return key if isinstance(key, (int, float)) else 0
+
+
+# ------------------------------------------
+# Indexes over the database tables
+# ------------------------------------------
+class _TableIndex:
+    """A NameIndex for one table, rebuilt when the table changed behind its back."""
+
+    def __init__(self, table, load, id_col, name_col):
+        self.table = table
+        self._load = load
+        self._id_col = id_col
+        self._name_col = name_col
+        self._index = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        version = get_cache().version(self.table)
+        with self._lock:
+            if self._index is None or self._version != version:
+                df = self._load()
+                pairs = zip(df[self._id_col].tolist(), df[self._name_col].tolist()) if not df.empty else ()
+                self._index = NameIndex(pairs)
+                self._version = version
+            return self._index
+
+    def written(self, apply):
+        """
+        Apply an in-place change for a write that was just committed and
+        invalidated. Only valid if the index was current before that write
+        (or already caught up with another change of the same commit);
+        otherwise it is left stale and rebuilt on the next search.
+        """
+        version = get_cache().version(self.table)
+        with self._lock:
+            if self._index is not None and self._version in (version - 1, version):
+                apply(self._index)
+                self._version = version
+
+    def reset(self):
+        with self._lock:
+            self._index = None
+
+
+def _load_employees():
+    import queries
+    with read_from_primary():
+        return queries.get_employees()
+
+
+def _load_projects():
+    import queries
+    with read_from_primary():
+        return queries.get_projects()
+
+
+employees = _TableIndex("Employees", _load_employees, "EmployeeID", "Name")
+projects = _TableIndex("Projects", _load_projects, "ProjectID", "ProjectName")
+
+
+def search_employees(text, limit=DEFAULT_LIMIT):
+    """Top `limit` (EmployeeID, Name, score) for a type-ahead box."""
+    return employees.get().search(text, limit)
+
+
+def search_projects(text, limit=DEFAULT_LIMIT):
+    return projects.get().search(text, limit)
+
+
+# Change feed subscriber: row-level events are applied in place. An event
+# without a row key (raw SQL, bulk loads) may have changed any row: its table
+# is reset and rebuilt on the next search - also when the same delivery has
+# keyed events, whose in-place update would otherwise mark the index current.
+_NAME_COLUMNS = {"Employees": (employees, "Name"), "Projects": (projects, "ProjectName")}
+
+
+def _apply_changes(events):
+    keyless = {event.table for event in events if event.row_key() is None}
+    for name in keyless:
+        _NAME_COLUMNS[name][0].reset()
+    for event in events:
+        if event.table in keyless:
+            continue
+        table, name_col = _NAME_COLUMNS[event.table]
+        key = event.row_key()
+        if event.action == "deleted":
+            table.written(lambda index: index.remove(key[0]))
+        elif name_col in event.data:
+            table.written(lambda index: index.add(key[0], event.data[name_col]))
+
+
+changefeed.subscribe(
+    _apply_changes,
+    changefeed.EmployeeCreated, changefeed.EmployeeUpdated, changefeed.EmployeeDeleted,
+    changefeed.ProjectCreated, changefeed.ProjectUpdated, changefeed.ProjectDeleted,
+)
@@ -105,6 +105,9 @@ LIMIT 450;
 -- Re-enable foreign key checks
 SET FOREIGN_KEY_CHECKS = 1;
 
+-- TRUNCATE above bypasses triggers: recompute the dashboard aggregates
+CALL RebuildDashboardAggregates();
+
 -- ===============================================
 -- Seed file completed
 -- ===============================================
@@ -0,0 +1,619 @@
+# sqlite_backend.py
+#
+# Embedded SQLite database behind the same connection/cursor surface the data
+# layer uses from mysql.connector (cursor(dictionary=, buffered=, prepared=),
+# commit/rollback, connection_id, column_names, with_rows, lastrowid...).
+# Selected with DB_TYPE="sqlite" (see backends.py). On first use the database
+# is created from schema (1).sql and seed (1).sql, so the app, the tests and
+# benchmark.py run in-process without a MySQL server.
+#
+# MySQL statements are translated on the fly (cached per SQL text):
+#   - %s placeholders -> ?, employee_manager_db.X -> X
+#   - LIKE %s gets ESCAPE '\' (MySQL's default escape character)
+#   - ON DUPLICATE KEY UPDATE c = VALUES(c) -> ON CONFLICT DO UPDATE SET c = excluded.c
+#   - CREATE TABLE: AUTO_INCREMENT, inline INDEX clauses, DECIMAL -> REAL
+#   - SET FOREIGN_KEY_CHECKS / SET @var, TRUNCATE TABLE, KILL QUERY and
+#     CALL RebuildDashboardAggregates() run as connection-level commands
+#   - a SAVEPOINT outside a transaction is preceded by BEGIN (in SQLite it
+#     would open the transaction itself, and its RELEASE would commit)
+#   - start_transaction() (consistent snapshot / read only) is a plain BEGIN
+# Stored procedures and MySQL triggers are skipped; the dashboard aggregates
+# are kept by the native triggers in AGGREGATE_TRIGGERS instead. FLOOR, LEAST,
+# GREATEST and CONCAT are registered as functions. sqlite3 errors are raised
+# as mysql.connector errors with the matching errno, so the services' error
+# handling is unchanged.
+
+import datetime
+import hashlib
+import itertools
+import math
+import os
+import re
+import sqlite3
+import threading
+import weakref
+from decimal import Decimal
+from functools import lru_cache
+
+from mysql.connector import errors
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCHEMA_FILE = os.path.join(HERE, "schema (1).sql")
+SEED_FILE = os.path.join(HERE, "seed (1).sql")
+DEFAULT_PATH = ":memory:"
+BUSY_TIMEOUT = 10.0   # seconds a writer waits for a lock (file databases)
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(datetime.date, lambda d: d.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda d: d.isoformat(" "))
+sqlite3.register_converter("DATE", lambda b: datetime.date.fromisoformat(b.decode()))
+
+_connection_ids = itertools.count(1)
+_live = weakref.WeakValueDictionary()   # connection_id -> SQLiteConnection (for KILL QUERY)
+
+
+# ------------------------------------------
+# Dashboard aggregates (replace the MySQL triggers/procedures)
+# ------------------------------------------
+def _aggregate_delta(row, sign):
+    op = "+" if sign > 0 else "-"
+    # Bucket width must match queries.HISTOGRAM_BUCKET_WIDTH
+    return f"""
+        UPDATE SalaryTotals
+        SET SalarySum = SalarySum {op} {row}.Salary, SalaryCount = SalaryCount {op} 1
+        WHERE TotalsID = 1;
+        INSERT INTO EmployeeSalaryTotals (EmployeeID, SalarySum, SalaryCount)
+        VALUES ({row}.EmployeeID, {sign} * {row}.Salary, {sign})
+        ON CONFLICT (EmployeeID) DO UPDATE SET
+            SalarySum = SalarySum + excluded.SalarySum,
+            SalaryCount = SalaryCount + excluded.SalaryCount;
+        DELETE FROM EmployeeSalaryTotals WHERE EmployeeID = {row}.EmployeeID AND SalaryCount = 0;
+        INSERT INTO RoleCounts (Role, AssignmentCount) VALUES ({row}.Role, {sign})
+        ON CONFLICT (Role) DO UPDATE SET AssignmentCount = AssignmentCount + excluded.AssignmentCount;
+        DELETE FROM RoleCounts WHERE Role = {row}.Role AND AssignmentCount = 0;
+        INSERT INTO SalaryHistogram (Bucket, AssignmentCount) VALUES (FLOOR({row}.Salary / 5000), {sign})
+        ON CONFLICT (Bucket) DO UPDATE SET AssignmentCount = AssignmentCount + excluded.AssignmentCount;
+        DELETE FROM SalaryHistogram WHERE Bucket = FLOOR({row}.Salary / 5000) AND AssignmentCount = 0;"""
+
+
+# FK cascades fire SQLite triggers, so parent deletes need no extra triggers
+AGGREGATE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_assignments_after_insert
+    AFTER INSERT ON Assignments WHEN NOT skip_dashboard_aggregates()
+    BEGIN {_aggregate_delta("NEW", 1)}
+    END""",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_assignments_after_update
+    AFTER UPDATE ON Assignments WHEN NOT skip_dashboard_aggregates()
+    BEGIN {_aggregate_delta("OLD", -1)} {_aggregate_delta("NEW", 1)}
+    END""",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS trg_assignments_after_delete
+    AFTER DELETE ON Assignments WHEN NOT skip_dashboard_aggregates()
+    BEGIN {_aggregate_delta("OLD", -1)}
+    END""",
+]
+
+REBUILD_AGGREGATES = [
+    "DELETE FROM EmployeeSalaryTotals",
+    "DELETE FROM RoleCounts",
+    "DELETE FROM SalaryHistogram",
+    """UPDATE SalaryTotals
+       SET SalarySum = (SELECT COALESCE(SUM(Salary), 0) FROM Assignments),
+           SalaryCount = (SELECT COUNT(*) FROM Assignments)
+       WHERE TotalsID = 1""",
+    """INSERT INTO EmployeeSalaryTotals (EmployeeID, SalarySum, SalaryCount)
+       SELECT EmployeeID, SUM(Salary), COUNT(*) FROM Assignments GROUP BY EmployeeID""",
+    """INSERT INTO RoleCounts (Role, AssignmentCount)
+       SELECT Role, COUNT(*) FROM Assignments GROUP BY Role""",
+    """INSERT INTO SalaryHistogram (Bucket, AssignmentCount)
+       SELECT FLOOR(Salary / 5000), COUNT(*) FROM Assignments GROUP BY FLOOR(Salary / 5000)""",
+]
+
+PROCEDURES = {"rebuilddashboardaggregates": REBUILD_AGGREGATES}
+
+# Seed statements that rely on MySQL-only features (user variables,
+# DATE_ADD ... INTERVAL), keyed by their normalized start
+STATEMENT_OVERRIDES = {
+    "INSERT INTO Employees (EmployeeID, Name, DateOfBirth, DepartmentID) SELECT": """
+        WITH RECURSIVE ids(emp_id) AS (SELECT 11 UNION ALL SELECT emp_id + 1 FROM ids WHERE emp_id < 110)
+        INSERT INTO Employees (EmployeeID, Name, DateOfBirth, DepartmentID)
+        SELECT emp_id,
+               CASE WHEN emp_id % 2 = 0 THEN 'Nguyen' ELSE 'Tran' END || ' ' ||
+               CASE WHEN emp_id % 3 = 0 THEN 'Van' ELSE 'Thi' END || ' ' ||
+               'Employee' || printf('%03d', emp_id),
+               date('1970-01-01', '+' || (abs(random()) % 12000) || ' days'),
+               (emp_id % 6) + 1
+        FROM ids""",
+}
+
+
+# ------------------------------------------
+# SQL functions MySQL has and SQLite lacks
+# ------------------------------------------
+def _floor(x):
+    return None if x is None else math.floor(x)
+
+
+def _least(*args):
+    return None if any(a is None for a in args) else min(args)
+
+
+def _greatest(*args):
+    return None if any(a is None for a in args) else max(args)
+
+
+def _concat(*args):
+    return None if any(a is None for a in args) else "".join(str(a) for a in args)
+
+
+# ------------------------------------------
+# Translation
+# ------------------------------------------
+_SCHEMA_PREFIX_RE = re.compile(r"\bemployee_manager_db\.", re.I)
+_LIKE_PARAM_RE = re.compile(r"\bLIKE\s+\?(?!\s+ESCAPE)", re.I)
+_UPSERT_RE = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.I | re.S)
+_VALUES_FN_RE = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.I)
+_DECIMAL_RE = re.compile(r"\b(?:DECIMAL|NUMERIC)\s*\(\s*\d+\s*,\s*\d+\s*\)", re.I)
+_AUTO_PK_RE = re.compile(r"\b(?:BIG)?INT(?:EGER)?\s+PRIMARY\s+KEY\s+AUTO_INCREMENT\b", re.I)
+_INLINE_INDEX_RE = re.compile(r"^(?:INDEX|KEY)\s+(\w+)\s*\((.+)\)$", re.I | re.S)
+_CREATE_TABLE_RE = re.compile(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s*\(", re.I)
+_SET_RE = re.compile(r"^\s*SET\s+(@?\w+)\s*:?=\s*(.+?)\s*$", re.I | re.S)
+_TRUNCATE_RE = re.compile(r"^\s*TRUNCATE\s+(?:TABLE\s+)?(\w+)\s*$", re.I)
+_CALL_RE = re.compile(r"^\s*CALL\s+(\w+)\s*\(\s*\)\s*$", re.I)
+_KILL_RE = re.compile(r"^\s*KILL\s+QUERY\s+(\S+)\s*$", re.I)
+_SAVEPOINT_RE = re.compile(r"^\s*SAVEPOINT\b", re.I)
+_IGNORED_RE = re.compile(r"^\s*(?:USE\s|CREATE\s+DATABASE\s|DROP\s+PROCEDURE\s|SET\s+NAMES\s)", re.I)
+
+
+def _split_top_level(body):
+    """Split a column list on commas outside parentheses."""
+    items, depth, start = [], 0, 0
+    for i, ch in enumerate(body):
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            items.append(body[start:i].strip())
+            start = i + 1
+    items.append(body[start:].strip())
+    return [item for item in items if item]
+
+
+def _create_table(sql, table):
+    """CREATE TABLE in SQLite syntax, plus CREATE INDEX for inline INDEX clauses."""
+    open_at = sql.index("(")
+    close_at = sql.rindex(")")   # drops table options (ENGINE=..., CHARSET=...)
+    columns, indexes = [], []
+    for item in _split_top_level(sql[open_at + 1:close_at]):
+        match = _INLINE_INDEX_RE.match(item)
+        if match:
+            indexes.append(f"CREATE INDEX IF NOT EXISTS {match.group(1)} ON {table} ({match.group(2)})")
+            continue
+        item = _AUTO_PK_RE.sub("INTEGER PRIMARY KEY AUTOINCREMENT", item)
+        columns.append(_DECIMAL_RE.sub("REAL", item))
+    return [sql[:open_at] + "(\n    " + ",\n    ".join(columns) + "\n)"] + indexes
+
+
+def _upsert(match):
+    assignments = _VALUES_FN_RE.sub(r"excluded.\1", match.group(1))
+    return "ON CONFLICT DO UPDATE SET" + assignments
+
+
+def _literal(text):
+    text = text.strip()
+    if text.upper() == "NULL":
+        return None
+    if text[:1] in "'\"" and text[-1:] == text[:1]:
+        return text[1:-1]
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+@lru_cache(maxsize=512)
+def translate(sql, with_params=True):
+    """
+    MySQL statement -> (SQLite statements, None) or (None, command tuple).
+    Placeholders are only rewritten when parameters are bound, as in
+    mysql.connector (which leaves %% alone otherwise).
+    """
+    sql = _SCHEMA_PREFIX_RE.sub("", sql).strip().rstrip(";").strip()
+
+    if _IGNORED_RE.match(sql):
+        return None, ("ignore",)
+    match = _SET_RE.match(sql)
+    if match:
+        return None, ("set", match.group(1).lower(), _literal(match.group(2)))
+    match = _TRUNCATE_RE.match(sql)
+    if match:
+        return None, ("truncate", match.group(1))
+    match = _CALL_RE.match(sql)
+    if match:
+        return None, ("call", match.group(1).lower())
+    match = _KILL_RE.match(sql)
+    if match:
+        return None, ("kill", match.group(1))
+
+    if with_params:
+        sql = sql.replace("%s", "?").replace("%%", "%")
+        sql = _LIKE_PARAM_RE.sub(r"LIKE ? ESCAPE '\\'", sql)
+    sql = _UPSERT_RE.sub(_upsert, sql)
+
+    match = _CREATE_TABLE_RE.match(sql)
+    if match:
+        return tuple(_create_table(sql, match.group(1))), None
+    return (sql,), None
+
+
+def _sqlite_errno(e, sql):
+    msg = str(e)
+    if isinstance(e, sqlite3.IntegrityError):
+        if "UNIQUE" in msg or "PRIMARY KEY" in msg:
+            return errors.IntegrityError, 1062       # ER_DUP_ENTRY
+        if "FOREIGN KEY" in msg:
+            # parent row still referenced (1451) vs. missing parent (1452)
+            return errors.IntegrityError, 1451 if sql.lstrip()[:6].upper() in ("DELETE", "UPDATE") else 1452
+        if "NOT NULL" in msg:
+            return errors.IntegrityError, 1048       # ER_BAD_NULL_ERROR
+        if "CHECK" in msg:
+            return errors.IntegrityError, 3819       # ER_CHECK_CONSTRAINT_VIOLATED
+        return errors.IntegrityError, None
+    if "interrupted" in msg:
+        return errors.OperationalError, 1317         # ER_QUERY_INTERRUPTED
+    if "no such table" in msg:
+        return errors.ProgrammingError, 1146         # ER_NO_SUCH_TABLE
+    if "no such column" in msg:
+        return errors.ProgrammingError, 1054         # ER_BAD_FIELD_ERROR
+    if "syntax error" in msg:
+        return errors.ProgrammingError, 1064         # ER_PARSE_ERROR
+    if "locked" in msg:
+        return errors.OperationalError, 1205         # ER_LOCK_WAIT_TIMEOUT
+    return errors.DatabaseError, None
+
+
+def _as_mysql_error(e, sql):
+    cls, errno = _sqlite_errno(e, sql)
+    return cls(msg=str(e), errno=errno)
+
+
+# ------------------------------------------
+# Connection / cursor
+# ------------------------------------------
+class SQLiteCursor:
+    """mysql.connector-style cursor over a sqlite3 cursor."""
+
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+        self._sql = ""
+        self._rowcount = -1
+
+    # ---- execution ----
+    def execute(self, operation, params=None):
+        self._sql = operation
+        statements, command = translate(operation, params is not None)
+        try:
+            if command is not None:
+                if params:   # e.g. KILL QUERY %s
+                    values = iter(params)
+                    command = tuple(next(values) if part == "%s" else part for part in command)
+                self._rowcount = self._conn.run_command(command)
+                self._cursor = self._conn.raw.cursor()   # no result set
+                return None
+            params = tuple(params) if params is not None else ()
+            if not self._conn.raw.in_transaction and _SAVEPOINT_RE.match(statements[0]):
+                self._cursor.execute("BEGIN")   # like MySQL: the savepoint lives inside the transaction
+            for sql in statements[:-1]:
+                self._cursor.execute(sql)
+            self._cursor.execute(statements[-1], params)
+            self._rowcount = self._cursor.rowcount
+        except sqlite3.Error as e:
+            raise _as_mysql_error(e, operation) from e
+        return None
+
+    def executemany(self, operation, seq_params):
+        self._sql = operation
+        statements, command = translate(operation, True)
+        if command is not None or len(statements) != 1:
+            raise errors.ProgrammingError(msg=f"executemany() cannot run: {operation}")
+        try:
+            self._cursor.executemany(statements[0], (tuple(p) for p in seq_params))
+            self._rowcount = self._cursor.rowcount
+        except sqlite3.Error as e:
+            raise _as_mysql_error(e, operation) from e
+        return None
+
+    # ---- results ----
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def column_names(self):
+        return tuple(d[0] for d in self._cursor.description or ())
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    @property
+    def rowcount(self):
+        return self._rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def _shape(self, rows):
+        if not self._dictionary:
+            return rows
+        names = self.column_names
+        return [dict(zip(names, row)) for row in rows]
+
+    def fetchall(self):
+        try:
+            return self._shape(self._cursor.fetchall())
+        except sqlite3.Error as e:
+            raise _as_mysql_error(e, self._sql) from e
+
+    def fetchmany(self, size=1):
+        try:
+            return self._shape(self._cursor.fetchmany(size))
+        except sqlite3.Error as e:
+            raise _as_mysql_error(e, self._sql) from e
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def __iter__(self):
+        while True:
+            rows = self.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def close(self):
+        self._cursor.close()
+        return True
+
+
+class SQLiteConnection:
+    """mysql.connector-style connection over a sqlite3 connection."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.connection_id = next(_connection_ids)
+        self.session = {}          # MySQL user variables (SET @name = value)
+        self._open = True
+        session = self.session
+        raw.create_function("skip_dashboard_aggregates", 0,
+                            lambda: 1 if session.get("@skip_dashboard_aggregates") in (1, "1") else 0)
+        _live[self.connection_id] = self
+
+    def cursor(self, dictionary=False, buffered=None, prepared=False, **_options):
+        # sqlite3 keeps its own prepared statement cache; buffering does not apply
+        return SQLiteCursor(self, dictionary=dictionary)
+
+    def start_transaction(self, consistent_snapshot=False, isolation_level=None, readonly=None):
+        # SQLite transactions are serializable: the first read fixes the snapshot
+        if self.raw.in_transaction:
+            raise errors.ProgrammingError(msg="Transaction already in progress")
+        self.raw.execute("BEGIN")
+
+    def commit(self):
+        self.raw.commit()
+
+    def rollback(self):
+        self.raw.rollback()
+
+    def is_connected(self):
+        return self._open
+
+    def interrupt(self):
+        self.raw.interrupt()
+
+    def close(self):
+        if self._open:
+            self._open = False
+            _live.pop(self.connection_id, None)
+            self.raw.close()
+
+    # ---- MySQL statements without a SQLite equivalent ----
+    def run_command(self, command):
+        kind = command[0]
+        if kind == "set":
+            _, name, value = command
+            if name == "foreign_key_checks":
+                if self.raw.in_transaction:
+                    self.raw.commit()   # the pragma is a no-op inside a transaction
+                self.raw.execute(f"PRAGMA foreign_keys = {'ON' if value else 'OFF'}")
+            elif name.startswith("@"):
+                self.session[name] = value
+            return 0
+        if kind == "truncate":
+            # Like MySQL's TRUNCATE: no triggers; callers rebuild the aggregates
+            previous = self.session.get("@skip_dashboard_aggregates")
+            self.session["@skip_dashboard_aggregates"] = 1
+            try:
+                return self.raw.execute(f"DELETE FROM {command[1]}").rowcount
+            finally:
+                self.session["@skip_dashboard_aggregates"] = previous
+        if kind == "call":
+            statements = PROCEDURES.get(command[1])
+            if statements is None:
+                raise errors.ProgrammingError(msg=f"PROCEDURE {command[1]} does not exist", errno=1305)
+            for sql in statements:
+                self.raw.execute(sql)
+            return 0
+        if kind == "kill":
+            target = _live.get(int(command[1]))
+            if target is None:
+                raise errors.DatabaseError(msg=f"Unknown thread id: {command[1]}", errno=1094)
+            target.interrupt()
+            return 0
+        return 0   # ignore
+
+
+def split_script(text):
+    """
+    Yield (statement, routine) from a MySQL script. `routine` is True for
+    statements inside DELIMITER blocks (procedures, triggers). Comments are
+    dropped; quotes are respected.
+    """
+    delimiter = ";"
+    buf = []
+    i, n = 0, len(text)
+    quote = None
+    while i < n:
+        if quote is None and (i == 0 or text[i - 1] == "\n"):
+            line_end = text.find("\n", i)
+            line = text[i:line_end if line_end != -1 else n]
+            if line.strip().upper().startswith("DELIMITER "):
+                delimiter = line.strip().split(None, 1)[1]
+                i = line_end + 1 if line_end != -1 else n
+                continue
+        ch = text[i]
+        if quote is not None:
+            buf.append(ch)
+            if ch == "\\" and i + 1 < n:
+                buf.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+            i += 1
+            continue
+        if ch in "'\"`":
+            quote = ch
+            buf.append(ch)
+            i += 1
+            continue
+        if text.startswith("--", i) or ch == "#":
+            line_end = text.find("\n", i)
+            i = line_end if line_end != -1 else n
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            i = end + 2 if end != -1 else n
+            continue
+        if text.startswith(delimiter, i):
+            statement = "".join(buf).strip()
+            if statement:
+                yield statement, delimiter != ";"
+            buf = []
+            i += len(delimiter)
+            continue
+        buf.append(ch)
+        i += 1
+    statement = "".join(buf).strip()
+    if statement:
+        yield statement, delimiter != ";"
+
+
+def _override(statement):
+    normalized = " ".join(statement.split())
+    for start, replacement in STATEMENT_OVERRIDES.items():
+        if normalized.startswith(start):
+            return replacement
+    return statement
+
+
+def load_script(conn, path):
+    """Run a MySQL script file (schema / seed / migration) on a SQLiteConnection."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    cursor = conn.cursor()
+    try:
+        for statement, routine in split_script(text):
+            if routine:
+                continue   # stored routines: see AGGREGATE_TRIGGERS / PROCEDURES
+            cursor.execute(_override(statement))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+# ------------------------------------------
+# Backend
+# ------------------------------------------
+class SQLiteBackend:
+    """
+    Embedded database: a file (WAL mode) or, with path ":memory:", a shared
+    in-memory database that lives as long as the backend.
+    """
+
+    name = "sqlite"
+    supports_infile = False
+
+    def __init__(self, config=None):
+        config = config or {}
+        self.path = config.get("path") or DEFAULT_PATH
+        self.schema = config.get("schema", SCHEMA_FILE)
+        self.seed = config.get("seed", SEED_FILE)
+        self.memory = self.path == ":memory:"
+        if self.memory:
+            self._uri = f"file:employee_manager_db_{id(self)}?mode=memory&cache=shared"
+        else:
+            self._uri = "file:" + os.path.abspath(self.path)
+        self._keeper = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    @property
+    def database_id(self):
+        """Names a database file in file names; None in memory (nothing outlives the backend)."""
+        if self.memory:
+            return None
+        return "sqlite-" + hashlib.sha1(os.path.abspath(self.path).encode()).hexdigest()[:12]
+
+    def _open(self):
+        raw = sqlite3.connect(self._uri, uri=True, timeout=BUSY_TIMEOUT,
+                              check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES)
+        raw.create_function("FLOOR", 1, _floor, deterministic=True)
+        raw.create_function("LEAST", -1, _least, deterministic=True)
+        raw.create_function("GREATEST", -1, _greatest, deterministic=True)
+        raw.create_function("CONCAT", -1, _concat, deterministic=True)
+        raw.execute("PRAGMA foreign_keys = ON")
+        if not self.memory:
+            raw.execute("PRAGMA journal_mode = WAL")
+        return SQLiteConnection(raw)
+
+    def _bootstrap(self):
+        with self._lock:
+            if self._ready:
+                return
+            conn = self._open()
+            try:
+                exists = conn.raw.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'Employees'").fetchone()
+                if not exists:
+                    load_script(conn, self.schema)
+                    for trigger in AGGREGATE_TRIGGERS:
+                        conn.raw.execute(trigger)
+                    if self.seed:
+                        load_script(conn, self.seed)
+            except Exception:
+                conn.close()
+                raise
+            if self.memory:
+                self._keeper = conn   # the shared in-memory database dies with its last connection
+            else:
+                conn.close()
+            self._ready = True
+
+    def connect(self, **_options):
+        """New connection (mysql.connector options such as allow_local_infile are ignored)."""
+        self._bootstrap()
+        return self._open()
+
+    def close(self):
+        if self._keeper is not None:
+            self._keeper.close()
+            self._keeper = None
+        self._ready = False
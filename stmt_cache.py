@@ -0,0 +1,124 @@
+# stmt_cache.py
+#
+# Per-connection cache of server-side prepared statements.
+#
+# A prepared cursor (connection.cursor(prepared=True)) sends its SQL to the
+# server once (COM_STMT_PREPARE); later executes only send the parameters, so
+# the server skips parsing and planning. Keeping one prepared cursor per SQL
+# text alive on each pooled connection means the hot single-row CRUD paths
+# prepare once per connection instead of once per call.
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_STATEMENTS = 32   # per connection; MySQL caps the server total (max_prepared_stmt_count)
+
+# Server forgot the statement (e.g. DEALLOCATE / restart): prepare it again
+_REPREPARE_ERRNOS = {1243}
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "reprepares": 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats():
+    """Totals over all connections (for the Settings page)."""
+    with _stats_lock:
+        out = dict(_stats)
+    total = out["hits"] + out["misses"]
+    out["hit_ratio"] = out["hits"] / total if total else 0.0
+    return out
+
+
+class StatementCache:
+    """LRU of prepared cursors for one physical connection, keyed by SQL text."""
+
+    def __init__(self, raw, max_statements=DEFAULT_MAX_STATEMENTS):
+        self._raw = raw
+        self.max_statements = max_statements
+        self._cursors = OrderedDict()
+        self._session = self._session_id()
+
+    def _session_id(self):
+        # Changes when the driver reconnects; statements do not survive that
+        return getattr(self._raw, "connection_id", None)
+
+    def cursor(self, sql):
+        if self._session_id() != self._session:
+            # Reconnected: the old statement handles are gone on the server
+            self._cursors.clear()
+            self._session = self._session_id()
+            _count("reprepares")
+
+        cursor = self._cursors.get(sql)
+        if cursor is not None:
+            self._cursors.move_to_end(sql)
+            _count("hits")
+            return cursor
+
+        _count("misses")
+        cursor = self._raw.cursor(prepared=True)
+        self._cursors[sql] = cursor
+        while len(self._cursors) > self.max_statements:
+            _, old = self._cursors.popitem(last=False)
+            _count("evictions")
+            self._close(old)   # DEALLOCATE on the server
+        return cursor
+
+    def discard(self, sql):
+        cursor = self._cursors.pop(sql, None)
+        if cursor is not None:
+            self._close(cursor)
+
+    def clear(self):
+        while self._cursors:
+            self._close(self._cursors.popitem()[1])
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+class CachedStatement:
+    """
+    Cursor handle returned by PooledConnection.prepare(sql). Used like a normal
+    cursor; close() keeps the prepared statement cached for the next call.
+    """
+
+    def __init__(self, cache, sql):
+        self._cache = cache
+        self._sql = sql
+        self._cursor = cache.cursor(sql)
+
+    def execute(self, operation=None, params=()):
+        operation = operation or self._sql
+        try:
+            return self._cursor.execute(operation, params)
+        except Exception as e:
+            if getattr(e, "errno", None) not in _REPREPARE_ERRNOS:
+                raise
+            self._cache.discard(operation)
+            self._cursor = self._cache.cursor(operation)
+            _count("reprepares")
+            return self._cursor.execute(operation, params)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def close(self):
+        # Drain unread rows so the cached cursor can be executed again
+        try:
+            if getattr(self._cursor, "with_rows", False):
+                self._cursor.fetchall()
+        except Exception:
+            self._cache.discard(self._sql)
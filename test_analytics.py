@@ -0,0 +1,134 @@
+import time
+
+import pandas as pd
+
+from analytics import AnalyticsEngine, Snapshot
+from query_cache import invalidate
+
+
+def frames():
+    return {
+        "Departments": pd.DataFrame({"DepartmentID": [1, 2], "DepartmentName": ["R&D", "HR"]}),
+        "Employees": pd.DataFrame({"EmployeeID": [1, 2, 3], "Name": ["An", "Binh", "Chi"],
+                                   "DateOfBirth": ["1990-01-01"] * 3, "DepartmentID": [1, 2, 1]}),
+        "Projects": pd.DataFrame({"ProjectID": [10, 11], "ProjectName": ["Apollo", "Gemini"],
+                                  "ManagerEmployeeID": [1, None]}),
+        "Assignments": pd.DataFrame({"EmployeeID": [2, 1, 1], "ProjectID": [10, 10, 11],
+                                     "Role": ["Dev", "Lead", "Dev"], "Salary": ["300.00", "100.00", "200.00"]}),
+    }
+
+
+def test_snapshot_queries_match_the_sql_semantics():
+    snap = Snapshot(frames(), versions=())
+    inner = snap.inner_join_per_project()
+    assert inner.values.tolist() == [["An", "Apollo", "Lead", 100.0], ["Binh", "Apollo", "Dev", 300.0],
+                                     ["An", "Gemini", "Dev", 200.0]]
+
+    left = snap.left_join_all_employees()
+    assert left["Name"].tolist() == ["An", "An", "Binh", "Chi"]
+    assert left["ProjectName"].isna().tolist() == [False, False, False, True]
+
+    managers = snap.multi_table_join_with_manager()["ManagerName"]
+    assert managers.tolist()[:2] == ["An", "An"] and pd.isna(managers.iloc[2])
+
+    above = snap.above_global_average()   # global avg 200: Binh 300 > 200, An 150
+    assert above.values.tolist() == [[2, "Binh", 300.0]]
+
+
+def test_engine_refreshes_after_writes_and_age():
+    loads = []
+
+    def loader(directory):
+        loads.append(directory)
+        return frames()
+
+    engine = AnalyticsEngine(loader=loader, persist=False, min_interval=0.0, max_age=3600)
+    first = engine.snapshot()
+    assert engine.snapshot() is first and len(loads) == 1
+
+    invalidate("Assignments")
+    assert engine.is_stale()
+    assert engine.snapshot(wait=True) is not first and len(loads) == 2
+
+    engine.max_age = 0.0
+    engine.snapshot()                    # stale: refreshed in the background, old one served
+    deadline = time.time() + 5
+    while engine.status()["refreshing"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert len(loads) == 3
+
+
+def test_export_reads_every_table_in_one_transaction(tmp_path, monkeypatch):
+    import analytics
+    import connection
+    from sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend({"path": str(tmp_path / "db.sqlite")})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    read = analytics._read_table
+    tables = []
+
+    def read_then_write(cursor, sql, chunk_size=analytics.EXPORT_CHUNK_SIZE):
+        yield from read(cursor, sql, chunk_size)
+        tables.append(sql)
+        if len(tables) == 1:
+            # another session deletes an employee (and its assignments) between two tables
+            writer = backend.connect()
+            writer.cursor().execute("DELETE FROM Employees WHERE EmployeeID = 5")
+            writer.commit()
+            writer.close()
+
+    monkeypatch.setattr(analytics, "_read_table", read_then_write)
+    try:
+        frames = analytics.export_tables()
+        assert len(tables) == 4
+        assert 5 in frames["Employees"]["EmployeeID"].tolist()   # as of the start of the export
+        assert set(frames["Assignments"]["EmployeeID"]) <= set(frames["Employees"]["EmployeeID"])
+        assert connection.get_pool().stats()["in_use"] == 0
+        assert len(analytics.export_tables()["Employees"]) == 109
+    finally:
+        connection.get_pool().close_all()
+        backend.close()
+
+
+def test_snapshots_are_kept_per_database(tmp_path):
+    import analytics
+    from backends import MySQLBackend
+    from sqlite_backend import SQLiteBackend
+
+    mysql = [MySQLBackend({"host": "db", "port": 3306, "database": name}) for name in ("a", "b")]
+    files = [SQLiteBackend({"path": str(tmp_path / name)}) for name in ("a.sqlite", "b.sqlite")]
+    dirs = [analytics.snapshot_dir(server) for server in mysql + files]
+    assert len(set(dirs)) == 4 and all(d.startswith(analytics.SNAPSHOT_DIR) for d in dirs)
+    assert analytics.snapshot_dir(SQLiteBackend({"path": ":memory:"})) is None   # not persisted
+
+
+def test_batched_apply_matches_one_event_at_a_time():
+    from changefeed import (AssignmentDeleted, AssignmentUpdated, EmployeeCreated, EmployeeDeleted,
+                            EmployeeUpdated, ProjectUpdated)
+
+    events = [EmployeeUpdated({"EmployeeID": i}, {"DepartmentID": 2}) for i in (1, 3)]
+    events += [EmployeeCreated({"EmployeeID": 4}, {"Name": "Dao", "DateOfBirth": "1991-01-01", "DepartmentID": 1}),
+               EmployeeUpdated({"EmployeeID": 4}, {"Name": "Dao Minh"}),
+               EmployeeUpdated({"EmployeeID": 1}, {"Name": "An Le"}),
+               EmployeeUpdated({"DepartmentID": "1"}, {"DepartmentID": 2}),   # several rows
+               AssignmentUpdated({"EmployeeID": 1, "ProjectID": 11}, {"Salary": "250.50"}),
+               AssignmentUpdated({"EmployeeID": 2, "ProjectID": 10}, {"Role": "Lead"}),
+               AssignmentDeleted({"EmployeeID": 1, "ProjectID": 10}),
+               ProjectUpdated({"ProjectID": 11}, {"ManagerEmployeeID": 2}),
+               EmployeeDeleted({"EmployeeID": 2}), EmployeeDeleted({"EmployeeID": 9})]
+
+    snap = Snapshot(frames(), versions=())
+    batched = snap.apply(events)
+    one_by_one = snap
+    for event in events:
+        one_by_one = one_by_one.apply([event])
+    for name in ("departments", "employees", "projects", "assignments"):
+        pd.testing.assert_frame_equal(getattr(batched, name).reset_index(drop=True),
+                                      getattr(one_by_one, name).reset_index(drop=True))
+    assert batched.employees["Name"].tolist() == ["An Le", "Chi", "Dao Minh"]
+    assert batched.employees["DepartmentID"].tolist() == [2, 2, 2]
+    assert batched.assignments.values.tolist() == [[1, 11, "Dev", 250.5]]
+    assert pd.isna(batched.projects["ManagerEmployeeID"]).tolist() == [False, True]   # 2 was deleted
+    assert snap.apply([EmployeeCreated({"EmployeeID": 5}, {"Name": "Partial"})]) is None
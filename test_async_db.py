@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from async_db import gather_pages
+
+
+async def _slow(value, delay):
+    await asyncio.sleep(delay)
+    return value
+
+
+async def _fail():
+    raise RuntimeError("boom")
+
+
+def test_gather_pages_runs_loads_concurrently():
+    start = time.monotonic()
+    data = gather_pages(a=_slow(1, 0.2), b=_slow(2, 0.2), c=_slow(3, 0.2))
+    elapsed = time.monotonic() - start
+    assert data == {"a": 1, "b": 2, "c": 3}
+    assert elapsed < 0.5
+
+
+def test_failed_load_becomes_empty_dataframe():
+    data = gather_pages(ok=_slow("x", 0), bad=_fail())
+    assert data["ok"] == "x"
+    assert data["bad"].empty
+
+
+def test_run_sync_writes_pin_the_callers_session(monkeypatch):
+    import replicas
+    from async_db import run_sync
+    from query_cache import invalidate
+
+    router = replicas.ReplicaRouter([], {}, pin_seconds=60)
+    try:
+        async def write():
+            invalidate("Employees")     # what async_services._write does after committing
+            return replicas.current_session()
+
+        with replicas.use_session("tab-1"):
+            assert run_sync(write()) == "tab-1"
+            assert router.pinned()
+        assert not router.pinned()
+    finally:
+        router.close()
+
+
+def test_async_bulk_methods_match_the_sync_services(monkeypatch):
+    import connection
+    from async_db import run_sync
+    from async_services import AsyncDepartmentService
+    from department import Department
+    from query_cache import get_cache
+    from sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend({"path": ":memory:", "seed": None})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    get_cache().clear()
+    service = AsyncDepartmentService()
+    try:
+        created = run_sync(service.create_many(["Ops", "R&D", "Ops"]))
+        assert [r.ok for r in created] == [True, True, False]      # duplicate name fails alone
+        assert [r.ok for r in run_sync(service.update_many([Department(1, "Operations")]))] == [True]
+        run_sync(service.delete_many([2]))
+
+        conn = connection.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT DepartmentID, DepartmentName FROM Departments")
+        assert cursor.fetchall() == [(1, "Operations")]
+        conn.close()
+    finally:
+        get_cache().clear()
+        connection.get_pool().close_all()
+        backend.close()
@@ -0,0 +1,85 @@
+import pytest
+from mysql.connector import Error
+
+import connection
+import sqlite_backend
+from batch import execute_batch, execute_keyed_batch
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def db(monkeypatch):
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    yield backend
+    connection.get_pool().close_all()
+    backend.close()
+
+
+@pytest.fixture
+def statements(db, monkeypatch):
+    db.connect().close()   # schema and seed first
+    sent = []
+    execute = sqlite_backend.SQLiteCursor.execute
+
+    def spy(self, operation, params=None):
+        sent.append(" ".join(operation.split()))
+        return execute(self, operation, params)
+
+    monkeypatch.setattr(sqlite_backend.SQLiteCursor, "execute", spy)
+    return sent
+
+
+def rows(backend, sql, params=None):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    out = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return out
+
+
+def test_aborted_batch_reports_every_row(db):
+    def abort(err, name):
+        raise Error(msg="connection lost")
+
+    names = ["A1", "Finance", "A3", "A4", "A5"]   # Finance exists: the chunk is replayed, then aborts
+    results = execute_batch("INSERT INTO Departments (DepartmentName) VALUES (%s)", iter(names),
+                            lambda name: (name,), chunk_size=2, describe_error=abort)
+    assert [(r.index, r.item, r.ok) for r in results] == [(i, name, False) for i, name in enumerate(names)]
+    assert all("connection lost" in r.error for r in results)
+    assert rows(db, "SELECT COUNT(*) FROM Departments WHERE DepartmentName LIKE 'A%'") == [(0,)]
+
+
+def test_keyed_update_sends_one_statement_per_chunk(db, statements):
+    from Employee_service import EmployeeService
+    from employee import Employee
+
+    employees = [Employee(1, "One", "1990-01-01", 2), Employee(9999, "Missing", "1990-01-01", 2),
+                 Employee(2, "Two", "1991-01-01", 3), Employee(1, "One again", "1990-01-01", 2)]
+    results = EmployeeService().update_many(employees, chunk_size=10)
+
+    assert [r.ok for r in results] == [True, False, True, True]
+    assert results[1].error == "No matching row"
+    sent = [sql.split()[0] for sql in statements if "Employees" in sql]
+    assert sent == ["SELECT", "UPDATE"]   # instead of 3 round trips per row
+    assert rows(db, "SELECT EmployeeID, Name, DepartmentID FROM Employees WHERE EmployeeID IN (1, 2) "
+                    "ORDER BY EmployeeID") == [(1, "One again", 2), (2, "Two", 3)]   # last values win
+
+
+def test_keyed_delete_isolates_rows_that_fail(db):
+    from department_service import DepartmentService
+
+    service = DepartmentService()
+    service.create_many(["Empty 1", "Empty 2"])
+    empty = [dept_id for dept_id, in rows(db, "SELECT DepartmentID FROM Departments WHERE DepartmentName "
+                                              "LIKE 'Empty%' ORDER BY DepartmentID")]
+
+    results = service.delete_many([empty[0], 1, 424242, empty[1], empty[0]])   # 1 still has employees
+    assert [r.ok for r in results] == [True, False, False, True, False]
+    assert "1451" in results[1].error
+    assert results[2].error == results[4].error == "No matching row"
+    assert rows(db, "SELECT COUNT(*) FROM Departments WHERE DepartmentName LIKE 'Empty%'") == [(0,)]
+    assert rows(db, "SELECT COUNT(*) FROM Departments WHERE DepartmentID = 1") == [(1,)]
@@ -0,0 +1,28 @@
+from collections import Counter
+
+from benchmark import Dataset
+
+
+def test_dataset_is_deterministic_per_seed():
+    a, b, c = Dataset(500, seed=7), Dataset(500, seed=7), Dataset(500, seed=8)
+    assert list(a.employees()) == list(b.employees())
+    assert list(a.assignments()) == list(b.assignments())
+    assert list(a.assignments()) != list(c.assignments())
+    assert [e[0] for e in a.employees()] == list(range(1, 501))
+
+
+def test_assignments_follow_the_zipf_distribution():
+    ds = Dataset(5000, seed=1, max_assignments=4)
+    rows = list(ds.assignments())
+    per_employee = Counter(emp for emp, _, _, _ in rows)
+    assert set(per_employee) == set(range(1, 5001))
+    assert set(per_employee.values()) <= {1, 2, 3, 4}
+    assert len({(emp, proj) for emp, proj, _, _ in rows}) == len(rows)   # no duplicate pairs
+    assert all(1 <= proj <= ds.n_projects and salary > 0 for _, proj, _, salary in rows)
+
+    counts = Counter(proj for _, proj, _, _ in rows)
+    # rank 1 is the most popular project, and popularity falls off with rank
+    assert counts.most_common(1)[0][0] == 1
+    assert counts[1] > counts[2] > counts[10] > counts[ds.n_projects]
+    expected = (10 ** -ds.zipf_s) / (1 ** -ds.zipf_s)   # frequency of rank 10 relative to rank 1
+    assert abs(counts[10] / counts[1] - expected) < 0.05
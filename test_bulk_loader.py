@@ -0,0 +1,97 @@
+import pytest
+from bulk_loader import TABLES, _check_columns, find_files
+
+
+def test_header_is_matched_case_insensitively():
+    assert _check_columns("Employees", ["employeeid", " Name", "DATEOFBIRTH", "DepartmentID"]) == TABLES["Employees"]
+
+
+def test_header_may_reorder_or_omit_columns():
+    assert _check_columns("Projects", ["ProjectName", "ProjectID"]) == ["ProjectName", "ProjectID"]
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError):
+        _check_columns("Departments", ["DepartmentID", "Budget"])
+
+
+def test_find_files_prefers_parquet(tmp_path):
+    for name in ["employees.csv", "Employees.parquet", "departments.CSV", "notes.txt"]:
+        (tmp_path / name).write_text("")
+    found = find_files(str(tmp_path))
+    assert found["Employees"].endswith("Employees.parquet")
+    assert found["Departments"].endswith("departments.CSV")
+    assert "Projects" not in found
+
+
+@pytest.fixture
+def db(monkeypatch):
+    import bulk_loader
+    import changefeed
+    import connection
+    from sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    monkeypatch.setattr(bulk_loader, "backend", backend)
+    received = []
+    changefeed.subscribe(received.extend)
+    subscriber = changefeed.relay._subscribers[-1][0]
+    yield backend, received
+    changefeed.unsubscribe(subscriber)
+    connection.get_pool().close_all()
+    backend.close()
+
+
+def rows(backend, sql):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute(sql)
+    out = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return out
+
+
+DEPARTMENTS = [(1, "R&D"), (2, "HR")]
+EMPLOYEES = [(1, "An", "1990-01-01", 1), (2, "Binh", "1991-02-02", 2)]
+PROJECTS = [(10, "Apollo", 1)]
+ASSIGNMENTS = [(1, 10, "Lead", 300.0), (2, 10, "Dev", 100.0)]
+
+
+def test_replace_load_rebuilds_aggregates_and_reports_events(db):
+    from bulk_loader import BulkLoadSession
+
+    backend, received = db
+    with BulkLoadSession(replace=True, chunk_size=1) as loader:
+        for table, data in zip(TABLES, (DEPARTMENTS, EMPLOYEES, PROJECTS, ASSIGNMENTS)):
+            loader.load_rows(table, TABLES[table], data)
+
+    assert loader.committed == list(TABLES) and loader.truncated == list(reversed(list(TABLES)))
+    assert rows(backend, "SELECT COUNT(*) FROM Employees") == [(2,)]
+    assert rows(backend, "SELECT SalarySum, SalaryCount FROM SalaryTotals") == [(400.0, 2)]
+    assert set(loader.orphans.values()) == {0}
+    assert {(e.table, e.action) for e in received} == {(t, a) for t in TABLES for a in ("deleted", "created")}
+    assert all(e.key == {} for e in received)
+
+
+def test_failed_load_keeps_committed_tables_and_still_finishes(db, capsys):
+    from mysql.connector import Error
+    from bulk_loader import BulkLoadSession
+
+    backend, received = db
+    with pytest.raises(Error):
+        with BulkLoadSession(replace=True) as loader:
+            loader.load_rows("Departments", TABLES["Departments"], DEPARTMENTS)
+            loader.load_rows("Employees", TABLES["Employees"], EMPLOYEES + [(3, "Chi", "1992-03-03", 9)])
+            loader.load_rows("Assignments", TABLES["Assignments"], ASSIGNMENTS + ASSIGNMENTS[:1])   # duplicate key
+
+    assert loader.committed == ["Departments", "Employees"]
+    assert rows(backend, "SELECT COUNT(*) FROM Employees") == [(3,)]
+    assert rows(backend, "SELECT COUNT(*) FROM Assignments") == [(0,)]       # the failed table rolled back
+    assert rows(backend, "SELECT SalarySum, SalaryCount FROM SalaryTotals") == [(0, 0)]   # rebuilt, not seed values
+    assert loader.orphans["Employees.DepartmentID"] == 1                     # still validated
+    created = {e.table for e in received if e.action == "created"}
+    assert created == {"Departments", "Employees"}
+    assert "partial load" in capsys.readouterr().out
@@ -0,0 +1,74 @@
+import pandas as pd
+import pytest
+
+import changefeed
+import connection
+from analytics import Snapshot
+from query_cache import get_cache
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def db(monkeypatch):
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    monkeypatch.setattr(changefeed.relay, "last_id", None)   # new database: start from its outbox
+    received = []
+    changefeed.subscribe(received.extend, changefeed.EmployeeUpdated, changefeed.EmployeeDeleted)
+    subscriber = changefeed.relay._subscribers[-1][0]
+    yield received
+    changefeed.unsubscribe(subscriber)
+    connection.get_pool().close_all()
+    backend.close()
+
+
+def test_service_write_is_delivered_as_a_typed_event(db, monkeypatch):
+    from Employee_service import EmployeeService
+    from employee import Employee
+
+    # the writer's own events are delivered from memory: no outbox read after the commit
+    get_db_connection = changefeed.get_db_connection
+    monkeypatch.setattr(changefeed, "get_db_connection", lambda *a, **k: pytest.fail("outbox polled"))
+    assert EmployeeService().update_employee(1, Employee(1, "Renamed", "1990-01-01", 1))
+    assert [type(e) for e in db] == [changefeed.EmployeeUpdated]
+    assert db[0].row_key() == (1,) and db[0].data["Name"] == "Renamed" and db[0].local
+
+    monkeypatch.setattr(changefeed, "get_db_connection", get_db_connection)
+    assert changefeed.relay.poll() == 0 and len(db) == 1   # the poller skips them
+    assert changefeed.relay.stats()["last_event_id"] > 0
+
+
+def test_rolled_back_write_records_no_event(db):
+    from unit_of_work import UnitOfWork
+
+    uow = UnitOfWork()
+    uow.update("Employees", {"Name": "Moved"}, {"EmployeeID": 1})
+    uow.delete("Departments", {"DepartmentID": 1})   # still referenced: the whole unit fails
+    assert not uow.flush()[0]
+    assert changefeed.relay.poll() == 0 and db == []
+
+
+def test_remote_events_invalidate_and_patch_the_snapshot(db):
+    version = get_cache().version("Employees")
+    conn = connection.get_db_connection()
+    changefeed.record(conn, changefeed.EmployeeDeleted({"EmployeeID": 2}, origin="other-process"))
+    conn.commit()
+    conn.close()
+
+    assert changefeed.relay.poll() == 1 and not db[0].local
+    assert get_cache().version("Employees") > version
+
+    snap = Snapshot({
+        "Departments": pd.DataFrame({"DepartmentID": [1], "DepartmentName": ["R&D"]}),
+        "Employees": pd.DataFrame({"EmployeeID": [1, 2], "Name": ["An", "Binh"],
+                                   "DateOfBirth": ["1990-01-01"] * 2, "DepartmentID": [1, 1]}),
+        "Projects": pd.DataFrame({"ProjectID": [10], "ProjectName": ["Apollo"], "ManagerEmployeeID": [2]}),
+        "Assignments": pd.DataFrame({"EmployeeID": [1, 2], "ProjectID": [10, 10],
+                                     "Role": ["Dev", "Lead"], "Salary": [100.0, 200.0]}),
+    }, versions=())
+    patched = snap.apply(db + [changefeed.EmployeeUpdated({"EmployeeID": 1}, {"Name": "An Nguyen"})])
+    assert patched.employees["Name"].tolist() == ["An Nguyen"]
+    assert patched.assignments["EmployeeID"].tolist() == [1]
+    assert pd.isna(patched.projects["ManagerEmployeeID"].iloc[0])
+    assert snap.apply([changefeed.EmployeeUpdated()]) is None   # keyless: needs a refresh
@@ -0,0 +1,62 @@
+import datetime
+import sys
+from decimal import Decimal
+
+import pytest
+
+from assignment import Assignment, AssignmentTable
+from employee import Employee, EmployeeTable
+
+
+def _employees(n):
+    return [(i, f"Nguyễn Văn {i}", datetime.date(1990, 1, 1 + i % 28), i % 7) for i in range(1, n + 1)]
+
+
+def test_row_views_keep_the_model_attributes():
+    table = EmployeeTable.from_rows(_employees(3))
+    assert len(table) == 3
+    row = table[1]
+    assert (row.employee_id, row.name, row.date_of_birth, row.department_id) == \
+        (2, "Nguyễn Văn 2", datetime.date(1990, 1, 3), 2)
+    assert repr(table[-1]) == "Employee(3, Nguyễn Văn 3)"
+    assert [e.employee_id for e in table] == [1, 2, 3]
+    assert [e.name for e in table[:2]] == ["Nguyễn Văn 1", "Nguyễn Văn 2"]
+    with pytest.raises(IndexError):
+        table[3]
+    with pytest.raises(AttributeError):
+        row.name = "x"
+
+    model = row.to_model()
+    assert isinstance(model, Employee) and model.name == row.name
+    assert row == model
+
+
+def test_nulls_and_decimals_round_trip():
+    table = AssignmentTable.from_rows([
+        (1, 101, "Developer", Decimal("1234.56")),
+        (2, 101, "Tester", Decimal("0.10")),
+    ])
+    assert table[0].salary == Decimal("1234.56")
+    assert table[1].salary == Decimal("0.10")
+    assert list(table.column("employee_id")) == [1, 2]
+
+    floats = AssignmentTable.from_rows([(1, 101, "Dev", 0.29), (1, 102, "Dev", 1234.56), (1, 103, "Dev", 70000.15)])
+    assert [row.salary for row in floats] == [Decimal("0.29"), Decimal("1234.56"), Decimal("70000.15")]
+
+    emps = EmployeeTable.from_rows([(1, "A", "2000-01-01", None), (2, "B", "2000-01-02", 3)])
+    assert emps[0].department_id is None
+    assert emps[1].department_id == 3
+    assert emps.column("department_id") == [None, 3]
+
+
+def test_slotted_models_have_no_instance_dict():
+    assert not hasattr(Employee(1, "A", None, 1), "__dict__")
+    assert not hasattr(Assignment(1, 1, "Dev", 1), "__dict__")
+
+
+def test_table_is_smaller_than_one_object_per_row():
+    rows = _employees(10_000)
+    table = EmployeeTable.from_rows(rows)
+    objects = [Employee(*r) for r in rows]
+    per_object = sys.getsizeof(objects[0]) + sys.getsizeof(objects[0].name)
+    assert table.nbytes() < len(objects) * per_object / 2
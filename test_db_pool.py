@@ -0,0 +1,135 @@
+import threading
+import time
+
+import pytest
+from db_pool import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def is_connected(self):
+        return self.connected
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+        self.connected = False
+
+
+def make_pool(**kwargs):
+    created = []
+
+    def factory():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    return ConnectionPool(factory, **kwargs), created
+
+
+def test_connections_are_reused():
+    pool, created = make_pool(pool_size=2, max_overflow=0)
+    conn = pool.acquire()
+    conn.close()
+    conn = pool.acquire()
+    conn.close()
+    assert len(created) == 1
+    assert created[0].rollbacks == 2
+    assert pool.stats()["idle"] == 1
+
+
+def test_unhealthy_connection_is_replaced_on_checkout():
+    pool, created = make_pool(pool_size=1, max_overflow=0)
+    with pool.connection():
+        pass
+    created[0].connected = False
+    with pool.connection() as conn:
+        assert conn.is_connected()
+    assert len(created) == 2
+    assert pool.stats()["failed_health_checks"] == 1
+
+
+def test_expired_connection_is_recycled():
+    pool, created = make_pool(pool_size=1, max_overflow=0, max_lifetime=0.01)
+    with pool.connection():
+        pass
+    time.sleep(0.02)
+    with pool.connection():
+        pass
+    assert len(created) == 2
+    assert created[0].closed
+
+
+def test_stale_connections_are_closed_outside_the_pool_lock():
+    pool, created = make_pool(pool_size=1, max_overflow=0, max_lifetime=0.01)
+    with pool.connection():
+        pass
+    time.sleep(0.02)
+
+    unblocked = []
+
+    def slow_close():
+        # another thread must still get at the pool while this close() runs
+        other = threading.Thread(target=pool.stats)
+        other.start()
+        other.join(0.5)
+        unblocked.append(not other.is_alive())
+
+    created[0].close = slow_close
+    with pool.connection():
+        pass
+    assert unblocked == [True]
+
+
+def test_overflow_connections_are_closed_on_release():
+    pool, created = make_pool(pool_size=1, max_overflow=1)
+    first = pool.acquire()
+    second = pool.acquire()
+    second.close()
+    first.close()
+    assert created[1].closed
+    assert not created[0].closed
+    assert pool.stats()["in_use"] == 0
+
+
+def test_acquire_times_out_when_exhausted():
+    pool, _ = make_pool(pool_size=1, max_overflow=0, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    conn.close()
+    assert pool.stats()["timeouts"] == 1
+
+
+def test_waiter_gets_released_connection():
+    pool, created = make_pool(pool_size=1, max_overflow=0, timeout=2)
+    conn = pool.acquire()
+    got = []
+
+    def worker():
+        with pool.connection() as c:
+            got.append(c.is_connected())
+
+    t = threading.Thread(target=worker)
+    t.start()
+    time.sleep(0.05)
+    conn.close()
+    t.join()
+    assert got == [True]
+    assert len(created) == 1
+
+
+def test_closed_handle_cannot_be_used():
+    pool, _ = make_pool()
+    conn = pool.acquire()
+    conn.close()
+    conn.close()  # double close is harmless
+    with pytest.raises(AttributeError):
+        conn.cursor()
+    assert pool.stats()["in_use"] == 0
@@ -0,0 +1,46 @@
+import pandas as pd
+
+from df_utils import clear_index_cache, fk_map, label_column, row_index
+
+ASSIGNMENTS = pd.DataFrame({
+    "EmployeeID": [1, 2, 2],
+    "EmployeeName": ["An", "Bình", "Bình"],
+    "ProjectID": [10, 10, 11],
+    "ProjectName": ["Apollo", "Apollo", None],
+    "Salary": [1.5, 2.0, 3.25],
+})
+TEMPLATE = "{EmployeeID} — {EmployeeName} — Project {ProjectID} — {ProjectName}"
+
+
+def test_fk_map_and_labels_match_the_row_loops():
+    expected = {row["EmployeeName"]: row["EmployeeID"] for _, row in ASSIGNMENTS.iterrows()}
+    assert fk_map(ASSIGNMENTS, "EmployeeName", "EmployeeID") == expected
+    assert fk_map(ASSIGNMENTS.iloc[0:0], "EmployeeName", "EmployeeID") == {}
+
+    expected = ASSIGNMENTS.apply(
+        lambda r: f"{r['EmployeeID']} — {r['EmployeeName']} — Project {r['ProjectID']} — {r['ProjectName']}",
+        axis=1)
+    assert label_column(ASSIGNMENTS, TEMPLATE).tolist() == expected.tolist()
+    assert label_column(ASSIGNMENTS, "{Salary}").tolist() == ["1.5", "2.0", "3.25"]
+
+
+def test_row_index_single_and_composite_keys():
+    index = row_index(ASSIGNMENTS, "EmployeeID")
+    assert index.row(2)["ProjectID"] == 10      # first row wins
+    assert index.row(99) is None
+    assert index.row([2]) is None               # unhashable key
+
+    pairs = row_index(ASSIGNMENTS, ["EmployeeID", "ProjectID"])
+    assert pairs.row((2, 11))["Salary"] == 3.25
+    assert (1, 11) not in pairs and len(pairs) == 3
+
+
+def test_row_index_reuses_positions_for_the_same_token():
+    clear_index_cache()
+    first = row_index(ASSIGNMENTS, "EmployeeID", token=("Assignments", 1))
+    copy = ASSIGNMENTS.copy()
+    copy["Salary"] = [9.0, 8.0, 7.0]
+    again = row_index(copy, "EmployeeID", token=("Assignments", 1))
+    assert again._positions is first._positions
+    assert again.row(1)["Salary"] == 9.0        # rows come from the frame passed in
+    assert row_index(copy, "EmployeeID", token=("Assignments", 2))._positions is not first._positions
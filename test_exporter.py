@@ -0,0 +1,26 @@
+import gzip
+
+import pandas as pd
+from exporter import export_to_file, write_chunks
+
+
+def chunks():
+    yield pd.DataFrame({"EmployeeID": [1, 2], "Name": ["A", "B, Jr."]})
+    yield pd.DataFrame({"EmployeeID": [3], "Name": ["C"]})
+
+
+def test_csv_is_written_chunk_by_chunk_with_one_header(tmp_path):
+    seen = []
+    path = tmp_path / "out.csv"
+    rows = write_chunks(chunks(), str(path), fmt="csv", progress=seen.append)
+    assert rows == 3
+    assert seen == [2, 3]
+    assert path.read_text().splitlines() == ["EmployeeID,Name", "1,A", '2,"B, Jr."', "3,C"]
+
+
+def test_gzip_export_round_trips(tmp_path, monkeypatch):
+    monkeypatch.setattr("exporter.EXPORT_DIR", str(tmp_path))
+    path, name, mime, rows = export_to_file(chunks(), "left_join.csv", fmt="csv.gz")
+    assert (name, mime, rows) == ("left_join.csv.gz", "application/gzip", 3)
+    with gzip.open(path, "rt") as f:
+        assert pd.read_csv(f)["EmployeeID"].tolist() == [1, 2, 3]
@@ -0,0 +1,36 @@
+import pytest
+
+from index_advisor import find_issues, regressions
+
+PLAN_CASES = [
+    # (plan rows, expected issues)
+    ([{"table": "e", "type": "ref", "key": "idx_employees_department", "Extra": "Using index"}], []),
+    ([{"table": "a", "type": "ALL", "Extra": None}], ["full scan on a"]),
+    ([{"table": "p", "type": "index", "Extra": "Using where; Using temporary; Using filesort"}],
+     ["filesort on p", "temporary table on p"]),
+    ([{"table": "<derived2>", "type": "ALL", "Extra": "Using filesort"},
+      {"table": "e", "type": "eq_ref", "Extra": ""}], []),   # derived tables are scanned by design
+    ([{"table": "a", "type": "ALL", "Extra": "Using filesort"},
+      {"table": "a", "type": "ALL", "Extra": "Using filesort"}], ["filesort on a", "full scan on a"]),
+    ([{"table": None, "type": None, "Extra": "No tables used"}], []),
+]
+
+
+@pytest.mark.parametrize("plan, expected", PLAN_CASES)
+def test_find_issues(plan, expected):
+    assert find_issues(plan) == expected
+
+
+REGRESSION_CASES = [
+    # (current issues per query, baseline, expected regressions)
+    ({"q": ["full scan on a"]}, {"q": ["full scan on a"]}, {}),
+    ({"q": ["full scan on a", "filesort on a"]}, {"q": ["full scan on a"]}, {"q": ["filesort on a"]}),
+    ({"q": []}, {"q": ["full scan on a"]}, {}),                          # fixed issues are not regressions
+    ({"new": ["full scan on e"]}, {}, {"new": ["full scan on e"]}),     # query missing from the baseline
+]
+
+
+@pytest.mark.parametrize("issues, baseline, expected", REGRESSION_CASES)
+def test_regressions(issues, baseline, expected):
+    report = {name: {"issues": found} for name, found in issues.items()}
+    assert regressions(report, baseline) == expected
@@ -0,0 +1,134 @@
+import threading
+import time
+
+import parallel
+from parallel import Task, fetch_parallel
+
+
+def _slow(value, delay):
+    time.sleep(delay)
+    return value
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def test_results_keep_order_and_run_concurrently():
+    start = time.monotonic()
+    data = fetch_parallel({
+        "b": Task(_slow, "B", 0.2),
+        "a": Task(_slow, "A", 0.2),
+        "c": Task(_slow, "C", 0.2),
+    })
+    assert list(data.items()) == [("b", "B"), ("a", "A"), ("c", "C")]
+    assert time.monotonic() - start < 0.5
+    assert data.errors == {}
+
+
+def test_timeout_and_failure_become_empty_results():
+    data = fetch_parallel({
+        "fast": Task(_slow, 1, 0),
+        "slow": Task(_slow, 2, 1.0, timeout=0.1),
+        "bad": _fail,
+    })
+    assert data["fast"] == 1
+    assert data["slow"].empty and data.errors["slow"] == "timed out"
+    assert data["bad"].empty and "boom" in data.errors["bad"]
+
+
+def test_timed_out_query_is_killed(monkeypatch):
+    killed = []
+    monkeypatch.setattr(parallel, "kill_query", lambda connection_id, server=None: killed.append(connection_id))
+
+    class Conn:
+        checked_out = True
+
+        def __init__(self, connection_id):
+            self.connection_id = connection_id
+
+        def while_checked_out(self, fn):
+            if self.checked_out:
+                fn()
+
+    def query():
+        # what get_db_connection() does inside track_connections()
+        from connection import _checkout_listener
+        done, running = Conn(41), Conn(42)
+        _checkout_listener.get()(done)
+        done.checked_out = False   # closed: back in the pool, possibly reused by another request
+        _checkout_listener.get()(running)
+        time.sleep(0.5)
+
+    fetch_parallel({"q": query}, timeout=0.05)
+    assert killed == [42]
+
+
+def test_timed_out_workers_are_replaced(monkeypatch):
+    monkeypatch.setattr(parallel, "MAX_WORKERS", 1)
+    monkeypatch.setattr(parallel, "_executor", None)
+    release = threading.Event()
+    try:
+        data = fetch_parallel({"hung": Task(release.wait, 5, timeout=0.05)})
+        assert data.errors == {"hung": "timed out"}
+
+        # the only worker is still stuck in the hung task
+        start = time.monotonic()
+        assert fetch_parallel({"next": Task(_slow, 1, 0)}, timeout=1)["next"] == 1
+        assert time.monotonic() - start < 0.5
+    finally:
+        release.set()
+
+
+def test_cancel_event_cancels_pending_tasks():
+    cancel = threading.Event()
+    threading.Timer(0.05, cancel.set).start()
+    data = fetch_parallel({"slow": Task(_slow, 1, 1.0)}, timeout=None, cancel_event=cancel)
+    assert data.errors == {"slow": "cancelled"}
+
+
+def test_pooled_connection_reports_when_it_is_returned():
+    from db_pool import ConnectionPool
+
+    class Raw:
+        def is_connected(self):
+            return True
+
+        def close(self):
+            pass
+
+    pool = ConnectionPool(Raw, pool_size=1)
+    conn = pool.acquire()
+    assert conn.checked_out
+    conn.close()
+    assert not conn.checked_out
+    pool.close_all()
+
+
+def test_close_waits_for_a_kill_in_progress():
+    from db_pool import ConnectionPool
+
+    class Raw:
+        def is_connected(self):
+            return True
+
+        def close(self):
+            pass
+
+    pool = ConnectionPool(Raw, pool_size=1)
+    conn = pool.acquire()
+    killing, closed = threading.Event(), []
+
+    def kill():
+        killing.set()
+        time.sleep(0.1)
+        closed.append(not conn.checked_out)
+
+    killer = threading.Thread(target=conn.while_checked_out, args=(kill,))
+    killer.start()
+    killing.wait()
+    conn.close()          # the task finishing its query
+    killer.join()
+    assert closed == [False]
+    assert not conn.while_checked_out(lambda: None)
+    pool.close_all()
@@ -0,0 +1,77 @@
+import json
+import time
+
+import profiling
+from profiling import InstrumentedCursor, QueryStats, SlowQueryLog, SlowestQueries, data_helper
+
+
+class FakeCursor:
+    rowcount = -1
+    with_rows = True
+
+    def execute(self, sql, params=None):
+        time.sleep(0.01)
+
+    def fetchall(self):
+        return [(1, "Alice"), (2, "Bob")]
+
+    def close(self):
+        pass
+
+
+def _capture():
+    events = []
+    profiling.add_sink(events.append)
+    return events
+
+
+@data_helper
+def _run(sql):
+    cursor = InstrumentedCursor(FakeCursor())
+    cursor.execute(sql)
+    rows = cursor.fetchall()
+    cursor.close()
+    return rows
+
+
+def load_people():
+    return _run("SELECT   id,\n  name FROM People")
+
+
+def test_statement_is_timed_and_attributed_to_the_caller():
+    events = _capture()
+    try:
+        load_people()
+    finally:
+        profiling.remove_sink(events.append)
+    assert len(events) == 1
+    event = events[0]
+    assert event.caller == "test_profiling.load_people"
+    assert event.rows == 2 and event.bytes == 2 * (8 + 4)
+    assert event.wall_ms >= 10
+    assert event.sql == "SELECT id, name FROM People"
+
+
+def test_rolling_histogram_and_top_n():
+    stats, slowest = QueryStats(history=3), SlowestQueries(n=2)
+    for ms in (1, 30, 700, 4):
+        event = profiling.QueryEvent("SELECT 1", "q.f")
+        event.wall_ms = ms
+        stats(event)
+        slowest(event)
+    summary = stats.summary()[0]
+    assert summary["calls"] == 4 and summary["max_ms"] == 700   # window holds 30, 700, 4
+    assert sum(count for _, count in stats.histogram("q.f")) == 3
+    assert [e["wall_ms"] for e in slowest.top()] == [700, 30]
+
+
+def test_slow_query_log_writes_json_lines(tmp_path):
+    log = SlowQueryLog(path=str(tmp_path / "slow.log"), threshold_ms=100)
+    for ms in (50, 150):
+        event = profiling.QueryEvent("SELECT * FROM Employees", "queries.get_employees")
+        event.wall_ms = ms
+        log(event)
+    entries = log.tail()
+    assert len(entries) == 1
+    assert entries[0]["wall_ms"] == 150 and entries[0]["caller"] == "queries.get_employees"
+    json.dumps(entries[0])
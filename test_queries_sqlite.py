@@ -0,0 +1,209 @@
+import pytest
+
+import connection
+import queries
+from query_cache import get_cache
+from sqlite_backend import SQLiteBackend
+
+
+@pytest.fixture
+def db(monkeypatch):
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    get_cache().clear()   # results cached against another test's database
+    yield backend
+    get_cache().clear()
+    connection.get_pool().close_all()
+    backend.close()
+
+
+def test_query_functions_run_on_the_embedded_backend(db):
+    assert len(queries.get_employees()) == 110
+    assert len(queries.get_departments()) == 6
+    assert not queries.get_projects().empty
+    assert len(queries.get_assignments()) == 450
+    assert queries.count_all_tables().iloc[0].to_dict() == {
+        "Employees": 110, "Departments": 6, "Projects": len(queries.get_projects()), "Assignments": 450}
+    assert len(queries.inner_join_per_project()) == 450
+    assert len(queries.multi_table_join_with_manager()) == 450
+    assert len(queries.left_join_all_employees()) >= 110
+    assert not queries.above_global_average().empty
+    assert len(queries.search_employees(limit=10)) == 10
+    assert queries.get_employee_name(1)["EmployeeID"].tolist() == [1]
+
+
+def test_keyset_seek_predicate_and_escaped_prefix():
+    sql, params = queries.capture_sql(queries.get_assignments_page, after=(3, 101), limit=25, role="Dev")
+    assert "a.Role = %s" in sql and "(a.EmployeeID, a.ProjectID) > (%s, %s)" in sql
+    assert sql.rstrip().endswith("ORDER BY a.EmployeeID ASC, a.ProjectID ASC\n        LIMIT %s")
+    assert params == ("Dev", 3, 101, 25)
+
+    _, params = queries.capture_sql(queries.get_employees_page, name_prefix="50%_off")
+    assert params == ("50\\%\\_off%", queries.DEFAULT_PAGE_SIZE)
+
+
+def test_keyset_pages_forward_and_back(db):
+    first = queries.get_assignments_page(limit=20)
+    assert len(first) == 20
+    keys = ["EmployeeID", "ProjectID"]
+    _, last = queries.page_bounds(first, keys)
+    assert all(isinstance(v, int) for v in last)
+
+    second = queries.get_assignments_page(after=last, limit=20)
+    start, _ = queries.page_bounds(second, keys)
+    assert start > last
+    assert len(first.merge(second, on=keys)) == 0
+
+    back = queries.get_assignments_page(before=start, limit=20)   # fetched descending, returned ascending
+    assert back[keys].values.tolist() == first[keys].values.tolist()
+    assert queries.page_bounds(back.iloc[0:0], keys) == (None, None)
+    assert queries.get_employees_page(name_prefix="%").empty   # a literal %, not a wildcard
+
+
+def test_search_builds_one_parameterized_statement():
+    base = queries.Search().department(1, 2)
+    devs = base.role("Dev").salary_between(3000, None).name("an_").order_by("Salary", desc=True).limit(10**6)
+    sql, params = devs.to_sql()
+    where = sql.split("WHERE", 1)[1]
+    assert where.split("ORDER BY")[0].split() == [
+        "e.DepartmentID", "IN", "(%s,", "%s)", "AND", "a.Role", "=", "%s",
+        "AND", "a.Salary", ">=", "%s", "AND", "e.Name", "LIKE", "%s"]
+    assert "ORDER BY a.Salary DESC, e.EmployeeID, a.ProjectID" in sql
+    assert params == (1, 2, "Dev", 3000, "an\\_%", queries.SEARCH_MAX_LIMIT)
+
+    # builders are immutable: the base is unchanged and empty filters add nothing
+    assert base.to_sql()[1] == (1, 2, queries.SEARCH_DEFAULT_LIMIT)
+    assert queries.Search().role().name("").salary_between().to_sql() == queries.Search().to_sql()
+    assert "WHERE" not in queries.Search().to_sql()[0]
+    assert queries.Search().name("a%", contains=True).to_sql()[1][0] == "%a\\%%"
+
+    with pytest.raises(ValueError):
+        queries.Search().order_by("Salary; DROP TABLE Employees")
+
+
+def test_stream_query_chunks_and_discards_abandoned_connections(db, monkeypatch):
+    import db_pool
+
+    invalidated = []
+    original = db_pool.PooledConnection.invalidate
+    monkeypatch.setattr(db_pool.PooledConnection, "invalidate",
+                        lambda self: invalidated.append(1) or original(self))
+    sql = "SELECT EmployeeID, ProjectID FROM Assignments ORDER BY EmployeeID, ProjectID"
+
+    chunks = list(queries.stream_query(sql, chunk_size=200))
+    assert [len(c) for c in chunks] == [200, 200, 50]
+    assert list(chunks[0].columns) == ["EmployeeID", "ProjectID"] and invalidated == []
+
+    stream = queries.stream_query(sql, chunk_size=100)
+    next(stream)
+    stream.close()   # consumer stopped early: the connection is not reused
+    assert invalidated == [1]
+    assert connection.get_pool().stats()["in_use"] == 0
+
+
+def test_stream_query_as_arrow(db):
+    pytest.importorskip("pyarrow")
+    batches = list(queries.stream_query("SELECT EmployeeID, Name FROM Employees", chunk_size=64, as_arrow=True))
+    assert [b.num_rows for b in batches] == [64, 46]
+    assert batches[0].schema.names == ["EmployeeID", "Name"]
+
+
+def _write_assignments():
+    from assignment import Assignment
+    from assignment_service import AssignmentService
+    from project_service import ProjectService
+
+    service = AssignmentService()
+    assert service.create_assignment(Assignment(100, 102, "Auditor", 123456.78))
+    assert service.update_assignment(2, 101, Assignment(None, None, "Auditor", 7000.10))
+    assert service.delete_assignment(3, 101)
+    assert ProjectService().delete_project(103)   # cascades to its assignments
+
+
+def _raw_assignments():
+    df = queries.run_query("SELECT EmployeeID, Role, Salary FROM Assignments")
+    df["Salary"] = df["Salary"].astype(float)
+    return df
+
+
+def test_trigger_maintained_aggregates_follow_writes(db):
+    _write_assignments()
+    raw = _raw_assignments()
+
+    totals = queries.get_salary_totals().iloc[0]
+    assert totals["AssignmentCount"] == len(raw)
+    assert float(totals["AverageSalary"]) == pytest.approx(raw["Salary"].mean())
+
+    hist = queries.get_salary_histogram()
+    buckets = (raw["Salary"] // queries.HISTOGRAM_BUCKET_WIDTH * queries.HISTOGRAM_BUCKET_WIDTH).value_counts()
+    assert dict(zip(hist["SalaryFrom"].astype(float), hist["AssignmentCount"])) == buckets.to_dict()
+
+    roles = queries.get_role_counts()
+    assert dict(zip(roles["Role"], roles["AssignmentCount"])) == raw["Role"].value_counts().to_dict()
+    assert roles["Role"].iloc[0] == raw["Role"].value_counts().idxmax()
+
+    top = queries.get_top_employees_by_avg_salary(5)
+    expected = raw.groupby("EmployeeID")["Salary"].mean().sort_values(ascending=False).head(5)
+    assert top["EmployeeID"].tolist() == expected.index.tolist()
+    assert top["Salary"].astype(float).tolist() == pytest.approx(expected.tolist())
+
+
+def test_missing_aggregate_tables_are_detected_once(db, monkeypatch, capsys):
+    assert queries.has_dashboard_aggregates()
+
+    bare = SQLiteBackend({"path": ":memory:", "seed": None})
+    conn = bare.connect()
+    conn.cursor().execute("DROP TABLE SalaryTotals")
+    conn.commit()
+    conn.close()
+    connection.get_pool().close_all()
+    connection.backend, connection._pool = bare, None
+    try:
+        assert not queries.has_dashboard_aggregates()
+        monkeypatch.setattr(queries, "get_db_connection", lambda: pytest.fail("checked again"))
+        assert not queries.has_dashboard_aggregates()
+        assert "Query error" not in capsys.readouterr().out
+    finally:
+        connection.get_pool().close_all()
+        connection.backend, connection._pool = db, None
+        bare.close()
+
+
+def test_sql_side_summaries_match_the_raw_rows(db):
+    import numpy as np
+
+    _write_assignments()
+    raw = _raw_assignments()
+
+    summary = queries.salary_summary().iloc[0]
+    assert summary["AssignmentCount"] == len(raw)
+    assert [float(summary[c]) for c in ("AverageSalary", "MinSalary", "MaxSalary")] == pytest.approx(
+        [raw["Salary"].mean(), raw["Salary"].min(), raw["Salary"].max()])
+
+    hist = queries.salary_histogram(bins=10)
+    counts, edges = np.histogram(raw["Salary"], bins=10)
+    assert hist["AssignmentCount"].tolist() == [int(c) for c in counts if c]
+    assert hist["SalaryFrom"].astype(float).tolist() == pytest.approx([e for e, c in zip(edges, counts) if c])
+
+    roles = queries.role_distribution()
+    assert dict(zip(roles["Role"], roles["AssignmentCount"])) == raw["Role"].value_counts().to_dict()
+
+    top = queries.top_employees_by_avg_salary(5)
+    expected = raw.groupby("EmployeeID")["Salary"].mean().sort_values(ascending=False).head(5)
+    assert top["EmployeeID"].tolist() == expected.index.tolist()
+
+
+def test_salary_histogram_of_equal_salaries_has_a_real_width(db):
+    conn = connection.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE Assignments SET Salary = %s", (50000,))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    hist = queries.salary_histogram(bins=10)
+    assert hist["AssignmentCount"].tolist() == [450]
+    row = hist.iloc[0]
+    assert float(row["SalaryFrom"]) <= 50000 < float(row["SalaryTo"])
+    assert float(row["SalaryTo"]) - float(row["SalaryFrom"]) == pytest.approx(0.1)   # as np.histogram
@@ -0,0 +1,66 @@
+import time
+
+import pandas as pd
+from query_cache import QueryCache, invalidate_for_sql, get_cache
+
+
+def test_hit_until_table_is_written():
+    cache = QueryCache()
+    calls = []
+
+    def load():
+        calls.append(1)
+        return pd.DataFrame({"EmployeeID": [1, 2]})
+
+    cache.get_or_load("emps", ["Employees"], load)
+    cache.get_or_load("emps", ["Employees"], load)
+    assert len(calls) == 1
+
+    cache.invalidate("Departments")
+    cache.get_or_load("emps", ["Employees"], load)
+    assert len(calls) == 1
+
+    cache.invalidate("Employees")
+    cache.get_or_load("emps", ["Employees"], load)
+    assert len(calls) == 2
+
+
+def test_cascading_tables_are_invalidated():
+    cache = QueryCache()
+    before = cache.versions(["Assignments", "Projects"])
+    cache.invalidate("employee_manager_db.Employees")
+    after = cache.versions(["Assignments", "Projects"])
+    assert all(a > b for a, b in zip(after, before))
+
+
+def test_ttl_and_lru_eviction():
+    cache = QueryCache(max_entries=2, ttl=0.05)
+    cache.get_or_load("a", [], lambda: [1])
+    cache.get_or_load("b", [], lambda: [2])
+    cache.get_or_load("a", [], lambda: [1])   # "a" is now most recent
+    cache.get_or_load("c", [], lambda: [3])   # evicts "b"
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_load("b", [], lambda: ["reloaded"]) == ["reloaded"]
+
+    time.sleep(0.06)
+    assert cache.get_or_load("a", [], lambda: ["expired"]) == ["expired"]
+
+
+def test_empty_results_are_not_cached():
+    cache = QueryCache()
+    cache.get_or_load("x", ["Projects"], pd.DataFrame)
+    assert cache.stats()["entries"] == 0
+
+
+def test_invalidate_for_sql_parses_write_statements():
+    cache = get_cache()
+    v = cache.version("Assignments")
+    invalidate_for_sql("SELECT * FROM Assignments")
+    assert cache.version("Assignments") == v
+    invalidate_for_sql("""
+        INSERT INTO employee_manager_db.Assignments
+        (EmployeeID, ProjectID, Role, Salary) VALUES (%s, %s, %s, %s)
+    """)
+    assert cache.version("Assignments") == v + 1
+    invalidate_for_sql("DELETE FROM Assignments WHERE EmployeeID=%s")
+    assert cache.version("Assignments") == v + 2
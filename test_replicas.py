@@ -0,0 +1,149 @@
+import time
+
+import pytest
+
+import connection
+import replicas
+from sqlite_backend import SQLiteBackend
+
+
+def server(name):
+    backend = SQLiteBackend({"path": ":memory:", "seed": None})
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO Departments (DepartmentName) VALUES (%s)", (name,))
+    conn.commit()
+    conn.close()
+    return backend
+
+
+def served_by(read_only=True):
+    conn = connection.get_db_connection(read_only=read_only)
+    cursor = conn.cursor()
+    cursor.execute("SELECT DepartmentName FROM Departments ORDER BY DepartmentID")
+    name = cursor.fetchall()[0][0]
+    cursor.close()
+    conn.close()
+    return name
+
+
+@pytest.fixture
+def cluster(monkeypatch):
+    primary, a, b = server("primary"), server("a"), server("b")
+    monkeypatch.setattr(connection, "backend", primary)
+    monkeypatch.setattr(connection, "_pool", None)
+    router = connection.configure_replicas([("a", a), ("b", b)], pin_seconds=0.2)
+    yield router
+    connection.configure_replicas([])
+    connection.get_pool().close_all()
+    monkeypatch.setattr(connection, "_router_ready", False)
+    for backend in (primary, a, b):
+        backend.close()
+
+
+def test_reads_rotate_over_replicas_and_writes_stay_on_primary(cluster):
+    assert sorted(served_by() for _ in range(4)) == ["a", "a", "b", "b"]
+    assert served_by(read_only=False) == "primary"
+    assert [r["reads"] for r in connection.pool_stats()["replicas"]["replicas"]] == [2, 2]
+
+
+def test_session_reads_its_writes_until_the_pin_expires(cluster):
+    from Employee_service import EmployeeService
+    from employee import Employee
+
+    with replicas.use_session("writer"):
+        assert EmployeeService().create_employee(Employee(None, "Pinned", "1990-01-01", 1))
+        assert served_by() == "primary"
+        assert [e.name for e in EmployeeService().get_all_employees()] == ["Pinned"]
+    with replicas.use_session("other"):
+        assert served_by() in ("a", "b")
+    time.sleep(0.25)
+    with replicas.use_session("writer"):
+        assert served_by() in ("a", "b")
+
+
+def test_failed_replica_is_skipped_and_reads_fall_back(cluster):
+    for replica in cluster.replicas:
+        replica.pool._factory = lambda: None   # cannot connect
+        replica._probed_at = time.monotonic()
+    assert served_by() == "primary"
+    assert cluster.stats()["fallback_reads"] == 1
+    assert all(not r["up"] for r in cluster.stats()["replicas"])
+
+
+def test_least_latency_prefers_the_fastest_replica():
+    router = replicas.ReplicaRouter([("slow", server("slow")), ("fast", server("fast"))], {},
+                                    strategy=replicas.LEAST_LATENCY)
+    try:
+        first = router.acquire()   # both unmeasured: probed on first use
+        first.close()
+        router.replicas[0].latency_ms, router.replicas[1].latency_ms = 5.0, 1.0
+        conn = router.acquire()
+        assert conn.backend is router.replicas[1].backend
+        conn.close()
+    finally:
+        router.close()
+        for replica in router.replicas:
+            replica.backend.close()
+
+
+@pytest.fixture
+def lagging(monkeypatch):
+    """Seeded primary plus one replica that never receives its writes."""
+    from query_cache import get_cache
+
+    primary, replica = SQLiteBackend({"path": ":memory:"}), SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", primary)
+    monkeypatch.setattr(connection, "_pool", None)
+    get_cache().clear()
+    router = connection.configure_replicas([("lagging", replica)], pin_seconds=60)
+    yield router
+    get_cache().clear()
+    connection.configure_replicas([])
+    connection.get_pool().close_all()
+    monkeypatch.setattr(connection, "_router_ready", False)
+    primary.close()
+    replica.close()
+
+
+def test_lagging_replica_results_are_not_cached_for_other_sessions(lagging):
+    import queries
+    import search_index
+    from Employee_service import EmployeeService
+    from employee import Employee
+    from query_cache import get_cache
+
+    def name_of_1():
+        df = queries.get_employees()
+        return df.loc[df["EmployeeID"] == 1, "Name"].iloc[0]
+
+    original = name_of_1()   # cached before the write, from the replica
+    with replicas.use_session("A"):
+        assert EmployeeService().update_employee(1, Employee(1, "Renamed", "1990-01-01", 1))
+    with replicas.use_session("B"):
+        assert name_of_1() == original   # B may see the lag, but must not cache it
+    with replicas.use_session("A"):
+        assert name_of_1() == "Renamed"
+        assert lagging.stats()["pinned_reads"] >= 1
+        # the index rebuild after the write reads the primary, whichever session triggers it
+        search_index.employees.reset()
+    get_cache().clear()
+    with replicas.use_session("B"):
+        assert [name for _, name, _ in search_index.search_employees("Renamed", 1)] == ["Renamed"]
+    search_index.employees.reset()
+
+
+def test_pinned_session_bypasses_cached_results(lagging):
+    import pandas as pd
+    import queries
+    from query_cache import cache_key, get_cache
+
+    stale = pd.DataFrame({"DepartmentID": [1], "DepartmentName": ["Stale"]})
+    get_cache().store(cache_key(queries.get_departments, (), {}), ["Departments"], stale)
+    with replicas.use_session("C"):
+        assert queries.get_departments()["DepartmentName"].tolist() == ["Stale"]
+    with replicas.use_session("A"):
+        lagging.pin()   # A just wrote
+        assert len(queries.get_departments()) == 6
+    with replicas.use_session("C"):
+        assert len(queries.get_departments()) == 6   # A's primary read refreshed the entry
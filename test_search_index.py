@@ -0,0 +1,140 @@
+import pandas as pd
+
+from query_cache import invalidate
+from search_index import NameIndex, _TableIndex, normalize
+
+NAMES = [(1, "Nguyễn Văn An"), (2, "Trần Thị Bình"), (3, "Nguyễn Đức Anh"), (4, "Lê An"), (5, "Anna Smith")]
+
+
+def test_normalize_strips_vietnamese_accents():
+    assert normalize("  Nguyễn Đức Anh ") == "nguyen duc anh"
+
+
+def test_prefix_ranks_whole_name_matches_first():
+    index = NameIndex(NAMES)
+    assert [key for key, _, _ in index.prefix("ngu")] == [1, 3]
+    # "an": whole-name prefix (Anna) before word prefixes, shorter names first
+    assert [key for key, _, _ in index.prefix("an", limit=3)] == [5, 4, 1]
+
+
+def test_fuzzy_tolerates_typos_and_updates_apply_in_place():
+    index = NameIndex(NAMES)
+    assert index.search("nguyen duc ahn")[0][0] == 3
+
+    index.add(6, "Bình Minh")
+    index.add(2, "Trần Thị Hoa")        # rename
+    index.remove(4)
+    assert [key for key, _, _ in index.search("binh")] == [6]
+    assert index.prefix("le") == []
+    assert len(index) == 5
+
+
+def test_table_index_rebuilds_after_untracked_writes():
+    loads = []
+
+    def load():
+        loads.append(1)
+        return pd.DataFrame({"ID": [1, 2], "Name": ["Alice", "Bob"]})
+
+    table = _TableIndex("SearchTestTable", load, "ID", "Name")
+    assert table.get().prefix("al")[0][0] == 1
+
+    # a tracked write is applied in place
+    invalidate("SearchTestTable")
+    table.written(lambda index: index.add(3, "Alicia"))
+    assert len(table.get()) == 3 and len(loads) == 1
+
+    # an untracked write (raw SQL, bulk load) forces a rebuild
+    invalidate("SearchTestTable")
+    assert len(table.get()) == 2 and len(loads) == 2
+
+
+def test_picker_searches_follow_service_writes(monkeypatch):
+    import connection
+    import search_index
+    from project import Project
+    from project_service import ProjectService
+    from query_cache import get_cache
+    from sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    get_cache().clear()
+    search_index.employees.reset()
+    search_index.projects.reset()
+    try:
+        assert search_index.search_projects("market", 1)[0][:2] == (103, "APAC Market Expansion")
+        assert search_index.search_projects("apac markte expansion", 1)[0][0] == 103   # typo
+        assert len(search_index.search_employees("nguyen", 20)) == 20
+
+        assert ProjectService().update_project(103, Project(103, "EMEA Launch", 3))
+        assert search_index.search_projects("emea", 1)[0][:2] == (103, "EMEA Launch")
+        assert all(key != 103 for key, _, _ in search_index.search_projects("market"))
+    finally:
+        search_index.employees.reset()
+        search_index.projects.reset()
+        get_cache().clear()
+        connection.get_pool().close_all()
+        backend.close()
+
+
+def test_keyless_event_in_a_delivery_forces_a_rebuild(monkeypatch):
+    import changefeed
+    import search_index
+
+    loads = []
+
+    def load():
+        loads.append(1)
+        return pd.DataFrame({"EmployeeID": [1, 2], "Name": ["Alice", "Bob"]})
+
+    table = _TableIndex("Employees", load, "EmployeeID", "Name")
+    monkeypatch.setitem(search_index._NAME_COLUMNS, "Employees", (table, "Name"))
+    table.get()
+
+    # another process renamed one row and ran raw SQL: one version bump, one delivery
+    invalidate("Employees")
+    search_index._apply_changes([changefeed.EmployeeUpdated({"EmployeeID": 1}, {"Name": "Alicia"}, origin="x"),
+                                 changefeed.EmployeeUpdated(origin="x")])
+    table.get()
+    assert len(loads) == 2
+
+
+def test_raw_sql_write_with_keyed_events_updates_in_place(monkeypatch):
+    # the pattern main.db_execute follows when a page passes events=
+    import changefeed
+    import connection
+    import search_index
+    from query_cache import get_cache, invalidate_for_sql
+    from sqlite_backend import SQLiteBackend
+
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    get_cache().clear()
+    search_index.employees.reset()
+    loads = []
+    load = search_index.employees._load
+    monkeypatch.setattr(search_index.employees, "_load", lambda: loads.append(1) or load())
+    try:
+        assert search_index.search_employees("nguyen", 1)
+        sql = "UPDATE Employees SET Name=%s WHERE EmployeeID=%s"
+        conn = connection.get_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(sql, ("Zed Keyed", 1))
+            events = changefeed.record(conn, changefeed.EmployeeUpdated({"EmployeeID": 1}, {"Name": "Zed Keyed"}))
+            conn.commit()
+        finally:
+            conn.close()
+        invalidate_for_sql(sql)
+        changefeed.publish(events)
+
+        assert search_index.search_employees("zed keyed", 1)[0][:2] == (1, "Zed Keyed")
+        assert len(loads) == 1
+    finally:
+        search_index.employees.reset()
+        get_cache().clear()
+        connection.get_pool().close_all()
+        backend.close()
@@ -0,0 +1,110 @@
+import datetime
+
+import pytest
+from mysql.connector import Error
+
+import connection
+from sqlite_backend import SQLiteBackend, split_script, translate
+
+
+@pytest.fixture
+def backend():
+    backend = SQLiteBackend({"path": ":memory:"})
+    yield backend
+    backend.close()
+
+
+def scalar(conn, sql, params=None):
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    value = cursor.fetchall()[0][0]
+    cursor.close()
+    return value
+
+
+def test_translation_of_mysql_statements():
+    assert translate("SELECT * FROM employee_manager_db.Employees WHERE Name LIKE %s") == (
+        ("SELECT * FROM Employees WHERE Name LIKE ? ESCAPE '\\'",), None)
+    (sql,), _ = translate("INSERT INTO T (a, b) VALUES (%s, %s) ON DUPLICATE KEY UPDATE b = VALUES(b);")
+    assert sql == "INSERT INTO T (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = excluded.b"
+    assert translate("SET @skip_dashboard_aggregates = 1", False) == (None, ("set", "@skip_dashboard_aggregates", 1))
+    assert translate("TRUNCATE TABLE Assignments", False) == (None, ("truncate", "Assignments"))
+
+    table, index = translate("CREATE TABLE E (\n  Id INT PRIMARY KEY AUTO_INCREMENT,\n  Pay DECIMAL(10, 2),\n"
+                             "  INDEX idx_pay (Pay, Id)\n)", False)[0]
+    assert "Id INTEGER PRIMARY KEY AUTOINCREMENT" in table and "Pay REAL" in table and "INDEX" not in table
+    assert index == "CREATE INDEX IF NOT EXISTS idx_pay ON E (Pay, Id)"
+
+    script = "-- c\nSELECT ';';\nDELIMITER $$\nCREATE PROCEDURE p() BEGIN SELECT 1; END$$\nDELIMITER ;\nSELECT 2;"
+    assert list(split_script(script)) == [("SELECT ';'", False), ("CREATE PROCEDURE p() BEGIN SELECT 1; END", True),
+                                          ("SELECT 2", False)]
+
+
+def test_seed_loads_and_triggers_keep_aggregates(backend):
+    conn = backend.connect()
+    assert scalar(conn, "SELECT COUNT(*) FROM employee_manager_db.Employees") == 110
+    assert scalar(conn, "SELECT COUNT(*) FROM Assignments") == 450
+
+    cursor = conn.cursor(dictionary=True)
+    cursor.execute("SELECT * FROM Employees WHERE EmployeeID = %s", (1,))
+    assert cursor.fetchall()[0]["DateOfBirth"] == datetime.date(1980, 1, 1)
+
+    cursor.execute("INSERT INTO Assignments (EmployeeID, ProjectID, Role, Salary) VALUES (%s, %s, %s, %s) "
+                   "ON DUPLICATE KEY UPDATE Role = VALUES(Role), Salary = VALUES(Salary)", (1, 101, "Lead", 99999))
+    cursor.execute("DELETE FROM Projects WHERE ProjectID = %s", (102,))   # cascades to Assignments
+    conn.commit()
+    totals = "SELECT SalarySum, SalaryCount FROM SalaryTotals"
+    actual = "SELECT SUM(Salary), COUNT(*) FROM Assignments"
+    assert scalar(conn, totals) == scalar(conn, actual)
+    assert scalar(conn, "SELECT SalaryCount FROM SalaryTotals") == scalar(conn, "SELECT COUNT(*) FROM Assignments")
+    assert scalar(conn, "SELECT SUM(AssignmentCount) FROM RoleCounts") == scalar(conn, "SELECT COUNT(*) FROM Assignments")
+    conn.close()
+
+
+def test_errors_are_mysql_errors(backend):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    with pytest.raises(Error) as dup:
+        cursor.execute("INSERT INTO Departments (DepartmentName) VALUES (%s)", ("Finance",))
+    assert dup.value.errno == 1062
+    with pytest.raises(Error) as referenced:
+        cursor.execute("DELETE FROM Departments WHERE DepartmentID = %s", (1,))
+    assert referenced.value.errno == 1451
+    with pytest.raises(Error) as unknown:
+        cursor.execute("KILL QUERY %s", (424242,))
+    assert unknown.value.errno == 1094
+    conn.close()
+
+
+def test_savepoints_stay_inside_the_transaction(backend, monkeypatch):
+    from batch import execute_batch
+
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+
+    def abort(name):
+        raise Error(msg="abort before commit")
+
+    results = execute_batch("INSERT INTO Departments (DepartmentName) VALUES (%s)", ["X1", "X2"],
+                            lambda name: (name,), events=abort)
+    assert [r.ok for r in results] == [False, False]
+    assert results[0].error.startswith("Rolled back")
+    conn = backend.connect()
+    assert scalar(conn, "SELECT COUNT(*) FROM Departments WHERE DepartmentName IN ('X1', 'X2')") == 0
+    conn.close()
+    connection.get_pool().close_all()
+
+
+def test_services_run_on_the_embedded_backend(backend, monkeypatch):
+    from Employee_service import EmployeeService
+    from employee import Employee
+
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    service = EmployeeService()
+    assert service.create_employee(Employee(None, "Embedded Test", "1990-01-01", 1))
+    employees = service.get_all_employees()
+    assert len(employees) == 111 and employees[-1].name == "Embedded Test"
+    assert service.delete_employee(employees[-1].employee_id)
+    assert not service.create_employee(Employee(None, "No Department", "1990-01-01", 99))
+    connection.get_pool().close_all()
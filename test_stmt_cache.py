@@ -0,0 +1,87 @@
+from mysql.connector import Error
+
+from db_pool import ConnectionPool
+from stmt_cache import StatementCache
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.prepared = None
+        self.closed = False
+        self.with_rows = False
+        self.fail_next = None
+
+    def execute(self, sql, params=()):
+        if self.fail_next:
+            errno, self.fail_next = self.fail_next, None
+            raise Error(msg="Unknown prepared statement handler", errno=errno)
+        if self.prepared != sql:
+            self.prepared = sql
+            self.conn.prepares += 1
+        self.conn.executed.append((sql, params))
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connection_id = 1
+        self.prepares = 0
+        self.executed = []
+        self.cursors = []
+
+    def cursor(self, prepared=False):
+        assert prepared
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def is_connected(self):
+        return True
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_statement_is_prepared_once_per_connection():
+    raw = FakeConnection()
+    pool = ConnectionPool(lambda: raw, pool_size=1, max_overflow=0)
+    for i in range(3):
+        with pool.connection() as conn:
+            cursor = conn.prepare("DELETE FROM Employees WHERE EmployeeID = %s")
+            cursor.execute("DELETE FROM Employees WHERE EmployeeID = %s", (i,))
+            cursor.close()
+    assert raw.prepares == 1
+    assert len(raw.executed) == 3
+
+
+def test_lru_eviction_closes_the_oldest_statement():
+    raw = FakeConnection()
+    cache = StatementCache(raw, max_statements=2)
+    a = cache.cursor("A")
+    cache.cursor("B")
+    cache.cursor("A")          # A is now most recent
+    cache.cursor("C")          # evicts B
+    assert len(cache) == 2
+    assert raw.cursors[1].closed and not a.closed
+
+
+def test_reconnect_and_lost_statement_are_reprepared():
+    raw = FakeConnection()
+    pool = ConnectionPool(lambda: raw, pool_size=1, max_overflow=0)
+    sql = "UPDATE Projects SET ProjectName=%s WHERE ProjectID=%s"
+    with pool.connection() as conn:
+        conn.prepare(sql).execute(sql, ("a", 1))
+
+    raw.connection_id = 2      # driver reconnected under us
+    with pool.connection() as conn:
+        cursor = conn.prepare(sql)
+        raw.cursors[-1].fail_next = 1243
+        cursor.execute(sql, ("b", 1))
+    assert len(raw.cursors) == 3   # original, after reconnect, after 1243
+    assert raw.executed[-1] == (sql, ("b", 1))
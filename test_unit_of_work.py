@@ -0,0 +1,74 @@
+import pytest
+
+import connection
+from query_cache import get_cache
+from sqlite_backend import SQLiteBackend
+from unit_of_work import UnitOfWork
+
+
+@pytest.fixture
+def db(monkeypatch):
+    backend = SQLiteBackend({"path": ":memory:"})
+    monkeypatch.setattr(connection, "backend", backend)
+    monkeypatch.setattr(connection, "_pool", None)
+    yield backend
+    connection.get_pool().close_all()
+    backend.close()
+
+
+def rows(backend, sql, params=None):
+    conn = backend.connect()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    out = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return out
+
+
+def test_changes_are_grouped_into_one_statement_per_kind():
+    uow = UnitOfWork()
+    for emp_id in (1, 2, 3):
+        uow.update("Employees", {"DepartmentID": 2}, {"EmployeeID": emp_id})
+    uow.upsert("Assignments", {"EmployeeID": 1, "ProjectID": 101, "Role": "Lead", "Salary": 1}, ["EmployeeID", "ProjectID"])
+    uow.update("Employees", {"DepartmentID": 3}, {"EmployeeID": 4})   # Assignments is related: new group
+    uow.delete("Departments", {"DepartmentID": 1})
+    uow.delete("Departments", {"DepartmentID": 5})
+
+    statements = [sql for group in uow._groups for sql, _ in group.statements(500)]
+    assert statements == [
+        "UPDATE Employees SET DepartmentID = %s WHERE EmployeeID IN (%s, %s, %s)",
+        "INSERT INTO Assignments (EmployeeID, ProjectID, Role, Salary) VALUES (%s, %s, %s, %s) "
+        "ON DUPLICATE KEY UPDATE Role = VALUES(Role), Salary = VALUES(Salary)",
+        "UPDATE Employees SET DepartmentID = %s WHERE EmployeeID IN (%s)",
+        "DELETE FROM Departments WHERE DepartmentID IN (%s, %s)",
+    ]
+    with pytest.raises(ValueError):
+        uow.delete("Departments; DROP TABLE Employees", {"DepartmentID": 1})
+
+
+def test_flush_applies_everything_in_one_transaction(db):
+    uow = UnitOfWork(chunk_size=2)
+    uow.update("Assignments", {"Role": "A", "Salary": 10}, {"EmployeeID": 1, "ProjectID": 101})
+    uow.update("Assignments", {"Role": "B", "Salary": 20}, {"EmployeeID": 2, "ProjectID": 101})
+    uow.update("Assignments", {"Role": "C", "Salary": 30}, {"EmployeeID": 1, "ProjectID": 101})   # last wins
+    uow.delete("Assignments", {"ProjectID": 102})
+    version = get_cache().version("Assignments")
+
+    assert len(uow) == 3
+    assert uow.flush() == (True, None)
+    assert uow.statements == 2 and len(uow) == 0
+    assert rows(db, "SELECT EmployeeID, Role, Salary FROM Assignments WHERE ProjectID = 101 AND EmployeeID < 3 "
+                    "ORDER BY EmployeeID") == [(1, "C", 30), (2, "B", 20)]
+    assert rows(db, "SELECT COUNT(*) FROM Assignments WHERE ProjectID = 102") == [(0,)]
+    assert get_cache().version("Assignments") > version
+
+
+def test_failed_statement_rolls_back_the_whole_unit(db):
+    uow = UnitOfWork()
+    uow.update("Employees", {"Name": "Moved"}, {"EmployeeID": 1})
+    uow.delete("Departments", {"DepartmentID": 1})   # still referenced by employees
+
+    ok, err = uow.flush()
+    assert not ok and "1451" in err
+    assert rows(db, "SELECT Name FROM Employees WHERE EmployeeID = 1") != [("Moved",)]
@@ -0,0 +1,212 @@
+# unit_of_work.py
+#
+# Several entity changes from one user action saved in ONE transaction, with
+# one statement per kind of change instead of one statement (and one commit)
+# per row. Changes are queued in memory; flush() groups them and sends
+#
+#   insert / upsert -> one multi-row INSERT [... ON DUPLICATE KEY UPDATE]
+#   update          -> one UPDATE ... SET c = CASE ... END WHERE key IN (...)
+#   delete          -> one DELETE ... WHERE key IN (...)
+#
+# per group (and per chunk of chunk_size rows):
+#
+#   uow = UnitOfWork()
+#   for emp_id in moved:
+#       uow.update("Employees", {"DepartmentID": 3}, {"EmployeeID": emp_id})
+#   uow.delete("Departments", {"DepartmentID": 5})
+#   ok, err = uow.flush()     # two statements, one commit
+#
+# Changes of the same kind to the same table and columns share a group. A
+# change only joins an earlier group when nothing queued after that group
+# touches its table or a table linked to it by a foreign key, so moving it
+# forward cannot break a constraint the original order satisfied.
+#
+# Each queued change is also recorded as a change event (changefeed.py) in
+# the same transaction.
+
+import re
+
+from mysql.connector import Error
+
+import changefeed
+from batch import DEFAULT_CHUNK_SIZE, delete_sql, update_sql
+from connection import get_db_connection
+from profiling import data_helper
+from query_cache import invalidate
+
+_ACTIONS = {"insert": "created", "upsert": "updated", "update": "updated", "delete": "deleted"}
+
+# table -> tables it references (schema (1).sql)
+FOREIGN_KEYS = {
+    "departments": (),
+    "employees": ("departments",),
+    "projects": ("employees",),
+    "assignments": ("employees", "projects"),
+}
+
+_IDENT_RE = re.compile(r"^\w+$")
+
+
+def _ident(name):
+    if not _IDENT_RE.match(name):
+        raise ValueError(f"Invalid table or column name: {name!r}")
+    return name
+
+
+def _related(a, b):
+    a, b = a.lower(), b.lower()
+    return a == b or b in FOREIGN_KEYS.get(a, ()) or a in FOREIGN_KEYS.get(b, ())
+
+
+def _placeholders(n):
+    return ", ".join(["%s"] * n)
+
+
+def _chunks(items, size):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class _Group:
+    """Queued changes that become one statement per chunk."""
+
+    def __init__(self, kind, table, columns, key_cols):
+        self.kind = kind
+        self.table = table
+        self.columns = columns
+        self.key_cols = key_cols
+        self.rows = {}   # key values -> column values (last change wins); insert: position -> values
+
+    @property
+    def signature(self):
+        return (self.kind, self.table.lower(), self.columns, self.key_cols)
+
+    def add(self, key, values):
+        self.rows[key if key is not None else len(self.rows)] = values
+
+    def events(self):
+        """One change event per queued row; upserts are reported as updates."""
+        cls = changefeed.event_type(self.table, _ACTIONS[self.kind])
+        if cls is None:
+            return []
+        out = []
+        for key, values in self.rows.items():
+            data = dict(zip(self.columns, values))
+            if self.kind == "insert":
+                primary = changefeed.PRIMARY_KEYS.get(cls.table, ())
+                where = {col: data.pop(col) for col in primary if col in data} if set(primary) <= set(data) else {}
+            else:
+                where = dict(zip(self.key_cols, key))
+                for col in self.key_cols:
+                    data.pop(col, None)
+            out.append(cls(where, data))
+        return out
+
+    def statements(self, chunk_size):
+        for chunk in _chunks(self.rows.items(), chunk_size):
+            yield getattr(self, f"_{self.kind}_sql")(chunk)
+
+    def _insert_sql(self, chunk):
+        row = f"({_placeholders(len(self.columns))})"
+        sql = f"INSERT INTO {self.table} ({', '.join(self.columns)}) VALUES {', '.join([row] * len(chunk))}"
+        return sql, [v for _, values in chunk for v in values]
+
+    def _upsert_sql(self, chunk):
+        sql, params = self._insert_sql(chunk)
+        updates = [col for col in self.columns if col not in self.key_cols]
+        return sql + " ON DUPLICATE KEY UPDATE " + ", ".join(f"{c} = VALUES({c})" for c in updates), params
+
+    def _update_sql(self, chunk):
+        return update_sql(self.table, self.columns, self.key_cols, chunk)
+
+    def _delete_sql(self, chunk):
+        return delete_sql(self.table, self.key_cols, [key for key, _ in chunk])
+
+
+class UnitOfWork:
+    """
+    Queue of inserts, upserts, updates and deletes flushed in one transaction.
+
+    Keys and values are dicts of column -> value; `where` in update/delete is
+    matched on equality and may select several rows (e.g. {"ProjectID": 7}).
+    """
+
+    def __init__(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        self._groups = []
+        self.statements = 0   # statements sent by the last flush()
+        self.rowcount = 0     # rows they affected
+
+    def __len__(self):
+        return sum(len(group.rows) for group in self._groups)
+
+    def insert(self, table, values):
+        self._queue("insert", table, values, None)
+
+    def upsert(self, table, values, key_cols):
+        """INSERT ... ON DUPLICATE KEY UPDATE of the columns not in key_cols."""
+        key_cols = (key_cols,) if isinstance(key_cols, str) else tuple(key_cols)
+        if not set(values) - set(key_cols):
+            raise ValueError("upsert needs at least one column besides the key")
+        self._queue("upsert", table, values, {col: values[col] for col in key_cols})
+
+    def update(self, table, values, where):
+        self._queue("update", table, values, where)
+
+    def delete(self, table, where):
+        self._queue("delete", table, {}, where)
+
+    def _queue(self, kind, table, values, where):
+        table = _ident(table)
+        columns = tuple(_ident(col) for col in values)
+        key_cols = tuple(_ident(col) for col in where) if where else ()
+        group = self._group_for(_Group(kind, table, columns, key_cols))
+        group.add(tuple(where.values()) if where else None, tuple(values.values()))
+
+    def _group_for(self, new):
+        # Latest group with the same signature, unless a later group touches a related table
+        for group in reversed(self._groups):
+            if group.signature == new.signature:
+                return group
+            if _related(group.table, new.table):
+                break
+        self._groups.append(new)
+        return new
+
+    @data_helper
+    def flush(self):
+        """
+        Run every queued change in one transaction and commit once. Returns
+        (True, None), or (False, error) after rolling all of it back. The
+        queue is emptied either way.
+        """
+        groups, self._groups = self._groups, []
+        self.statements = self.rowcount = 0
+        if not groups:
+            return True, None
+
+        conn = get_db_connection()
+        if conn is None:
+            return False, "Cannot connect to MySQL"
+
+        cursor = conn.cursor()
+        try:
+            for group in groups:
+                for sql, params in group.statements(self.chunk_size):
+                    cursor.execute(sql, params)
+                    self.statements += 1
+                    self.rowcount += max(cursor.rowcount, 0)
+            events = changefeed.record(conn, *(event for group in groups for event in group.events()))
+            conn.commit()
+        except Error as e:
+            conn.rollback()
+            print(f"❌ Unit of work rolled back: {e}")
+            return False, str(e)
+        finally:
+            cursor.close()
+            conn.close()
+
+        invalidate(*dict.fromkeys(group.table for group in groups))
+        changefeed.publish(events)
+        return True, None